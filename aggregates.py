@@ -0,0 +1,292 @@
+from dataclasses import dataclass, fields
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from medal_matrix import MedalMatrix, build_medal_matrix
+from ranks import RankIndex, build_rank_index, update_rank_index
+
+MEDAL_COLUMNS = ['gold', 'silver', 'bronze', 'total']
+# Season partitions: every row, or only the Summer or Winter Games
+ALL_SEASONS = 'All'
+SEASONS = ['Summer', 'Winter']
+
+
+@dataclass(frozen=True)
+class MedalAggregates:
+    """Precomputed medal aggregates shared by every dashboard section and report"""
+
+    # Per-country gold/silver/bronze/total sums, sorted by total medals
+    country_medals: pd.DataFrame
+    # Per-country total medals, sorted descending
+    country_totals: pd.Series
+    # Year x country total medals (NaN where a country won nothing that year)
+    country_year: pd.DataFrame
+    # The same year x country layout as dense arrays per medal type, for column-gather selections
+    medal_matrix: MedalMatrix
+    # Per-year gold/silver/bronze/total sums
+    yearly_medals: pd.DataFrame
+    # describe() summary of the medal columns
+    medal_stats: pd.DataFrame
+    # Medal column -> number of tally rows with each count (indexed by the count), for updating medal_stats
+    medal_values: dict
+    # Per-country number of distinct Olympic years with medals
+    country_years_count: pd.Series
+    # Per-country number of editions (tally rows) with medals
+    country_editions: pd.Series
+    # Per-country first and last medal year
+    country_first_year: pd.Series
+    country_last_year: pd.Series
+    # Tally rows sorted by country and year, with each country's (start, stop) row range
+    rows_by_country: pd.DataFrame
+    country_rows: dict
+    # NOC code -> country name
+    noc_countries: dict
+    # Per-edition medal-table ranks, gold-first and by total
+    edition_ranks: RankIndex
+    # Dataset-wide headline numbers
+    n_countries: int
+    total_medals: int
+    year_min: int
+    year_max: int
+    n_years: int
+
+    def top_countries(self, n):
+        """Top n countries by total medals"""
+        return self.country_totals.head(n)
+
+    def resolve_country(self, name_or_noc):
+        """Country name for a country name or NOC code, None if unknown"""
+        if name_or_noc in self.country_rows:
+            return name_or_noc
+        return self.noc_countries.get(str(name_or_noc).upper())
+
+    def country_frame(self, country):
+        """Tally rows of one country (name or NOC), sliced from the per-country index"""
+        start, stop = self.country_rows.get(self.resolve_country(country), (0, 0))
+        return self.rows_by_country.iloc[start:stop]
+
+    def country_yearly(self, country):
+        """Per-year gold/silver/bronze/total for one country (name or NOC)"""
+        return self.country_frame(country).groupby('year')[MEDAL_COLUMNS].sum().astype('int64').reset_index()
+
+    def country_year_wide(self, countries, medal='total'):
+        """Year x country medals of the given countries (NaN where one won nothing), gathered from the matrix"""
+        return self.medal_matrix.select(countries, medal)
+
+
+def _plain_labels(index):
+    """Replace categorical labels (from the compact loader dtypes) with plain ones"""
+    if isinstance(index, pd.CategoricalIndex):
+        return index.astype(index.categories.dtype)
+    return index
+
+
+def _row_index(rows_by_country):
+    """Each country's contiguous (start, stop) row range, plus the NOC -> country map"""
+    codes, _ = pd.factorize(rows_by_country['country'])
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    stops = np.r_[starts[1:], len(codes)]
+    names = rows_by_country['country'].iloc[starts].astype(str)
+    country_rows = {name: (int(start), int(stop)) for name, start, stop in zip(names, starts, stops)}
+    # Last row wins when a NOC code has been used under several names
+    nocs = rows_by_country[['country_noc', 'country']].drop_duplicates('country_noc', keep='last').astype(str)
+    noc_countries = dict(zip(nocs['country_noc'], nocs['country']))
+    return country_rows, noc_countries
+
+
+def _describe(medal_values):
+    """describe() of the medal columns, computed from each column's value counts"""
+    stats = {}
+    for column, counts in medal_values.items():
+        values = np.arange(len(counts))
+        n = int(counts.sum())
+        mean = (values * counts).sum() / n if n else np.nan
+        std = np.sqrt((counts * (values - mean) ** 2).sum() / (n - 1)) if n > 1 else np.nan
+        # Value at each sorted position, interpolated linearly between neighbours like DataFrame.quantile
+        cumulative = np.cumsum(counts)
+        positions = np.array([0.25, 0.5, 0.75]) * (n - 1)
+        low = np.searchsorted(cumulative, np.floor(positions), side='right')
+        high = np.searchsorted(cumulative, np.ceil(positions), side='right')
+        quartiles = low + (high - low) * (positions - np.floor(positions)) if n else [np.nan] * 3
+        occurring = np.flatnonzero(counts)
+        stats[column] = [n, mean, std, occurring[0] if n else np.nan, *quartiles, occurring[-1] if n else np.nan]
+    return pd.DataFrame(stats, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'], dtype='float64')
+
+
+def _add_counts(a, b):
+    """Sum of two value-count arrays of possibly different lengths"""
+    if len(a) < len(b):
+        a, b = b, a
+    total = a.copy()
+    total[:len(b)] += b
+    return total
+
+
+def _country_year_order(rows):
+    """Row order of a stable sort by country then year, as one integer key per row
+
+    Argsort's stable sort is a timsort on integer keys, so rows that are already in
+    order plus a short tail are merged in linear time rather than fully re-sorted.
+    """
+    country = rows['country']
+    if isinstance(country.dtype, pd.CategoricalDtype):
+        codes = country.cat.codes.to_numpy(dtype='int64')
+    else:
+        codes = pd.factorize(country, sort=True)[0].astype('int64')
+    return np.argsort(codes * 65536 + rows['year'].to_numpy(dtype='int64'), kind='stable')
+
+
+def _assemble(country_medals, medal_matrix, yearly_medals, country_years, medal_values, rows_by_country,
+              edition_ranks):
+    country_rows, noc_countries = _row_index(rows_by_country)
+    return MedalAggregates(
+        country_medals=country_medals,
+        country_totals=country_medals['total'],
+        country_year=medal_matrix.frame(),
+        medal_matrix=medal_matrix,
+        yearly_medals=yearly_medals,
+        medal_stats=_describe(medal_values),
+        medal_values=medal_values,
+        country_years_count=country_years['nunique'],
+        country_editions=country_years['size'],
+        country_first_year=country_years['min'],
+        country_last_year=country_years['max'],
+        rows_by_country=rows_by_country,
+        country_rows=country_rows,
+        noc_countries=noc_countries,
+        edition_ranks=edition_ranks,
+        n_countries=len(country_medals),
+        total_medals=int(yearly_medals['total'].sum()),
+        year_min=int(yearly_medals.index.min()),
+        year_max=int(yearly_medals.index.max()),
+        n_years=len(yearly_medals),
+    )
+
+
+def _partial_sums(df):
+    """Country, year and year x country sums of a set of tally rows"""
+    # Widen the compact medal counts so sums cannot overflow
+    medals = df[MEDAL_COLUMNS].astype('int64')
+    medals['country'] = df['country']
+    medals['year'] = df['year'].astype('int64')
+
+    country_medals = medals.groupby('country', observed=True)[MEDAL_COLUMNS].sum().sort_values('total', ascending=False)
+    country_medals.index = _plain_labels(country_medals.index)
+    medal_matrix = build_medal_matrix(df)
+    yearly_medals = medals.groupby('year')[MEDAL_COLUMNS].sum()
+    country_years = medals.groupby('country', observed=True)['year'].agg(['nunique', 'size', 'min', 'max'])
+    country_years.index = _plain_labels(country_years.index)
+    medal_values = {column: np.bincount(medals[column].to_numpy()) for column in MEDAL_COLUMNS}
+    return country_medals, medal_matrix, yearly_medals, country_years, medal_values
+
+
+def build_aggregates(df):
+    """Compute all shared aggregates in one pass over the tally"""
+    country_medals, medal_matrix, yearly_medals, country_years, medal_values = _partial_sums(df)
+    # Per-country row index: one sort, then each selection is a contiguous slice
+    rows_by_country = df.sort_values(['country', 'year'], kind='stable', ignore_index=True)
+    return _assemble(country_medals, medal_matrix, yearly_medals, country_years, medal_values, rows_by_country,
+                     build_rank_index(df))
+
+
+def append_rows(aggregates, rows):
+    """Fold newly appended tally rows (e.g. a new edition) into existing aggregates
+
+    Only the new rows are aggregated; the results are added to the existing
+    sums, matrix, value counts and per-country counts instead of re-reading the
+    whole tally. The new rows are merged into the per-country row order, which is
+    then re-sliced, and only the editions the new rows belong to are re-ranked.
+    """
+    if len(rows) == 0:
+        return aggregates
+    new_medals, new_matrix, new_yearly, new_years, new_values = _partial_sums(rows)
+
+    country_medals = (aggregates.country_medals.add(new_medals, fill_value=0)
+                      .astype('int64').sort_values('total', ascending=False))
+    medal_matrix = aggregates.medal_matrix.add(new_matrix)
+    yearly_medals = aggregates.yearly_medals.add(new_yearly, fill_value=0).astype('int64')
+    first_years = pd.concat([aggregates.country_first_year, new_years['min']], axis=1).min(axis=1)
+    last_years = pd.concat([aggregates.country_last_year, new_years['max']], axis=1).max(axis=1)
+    country_years = pd.DataFrame({
+        'nunique': pd.Series(medal_matrix.won.sum(axis=0), index=medal_matrix.countries),
+        'size': aggregates.country_editions.add(new_years['size'], fill_value=0),
+        'min': first_years,
+        'max': last_years,
+    }).astype('int64')
+
+    medal_values = {column: _add_counts(aggregates.medal_values[column], new_values[column])
+                    for column in MEDAL_COLUMNS}
+
+    # Already sorted old rows plus a short tail: merged, not re-sorted
+    rows_by_country = concat_rows(aggregates.rows_by_country, rows)
+    rows_by_country = rows_by_country.take(_country_year_order(rows_by_country)).reset_index(drop=True)
+    return _assemble(country_medals, medal_matrix, yearly_medals, country_years, medal_values, rows_by_country,
+                     update_rank_index(aggregates.edition_ranks, rows))
+
+
+def season_rows(df):
+    """Row positions of each season's Games in the tally"""
+    seasons = df['season'].to_numpy()
+    return {season: np.flatnonzero(seasons == season) for season in SEASONS}
+
+
+def build_partitions(df, rows=None):
+    """Aggregates over every row ('All') and over each season present in the tally"""
+    rows = season_rows(df) if rows is None else rows
+    partitions = {ALL_SEASONS: build_aggregates(df)}
+    for season, positions in rows.items():
+        if len(positions):
+            partitions[season] = build_aggregates(df.iloc[positions])
+    return partitions
+
+
+def append_partitions(partitions, rows):
+    """Fold appended tally rows into the 'All' partition and into their season's"""
+    updated = {ALL_SEASONS: append_rows(partitions[ALL_SEASONS], rows)}
+    for season in SEASONS:
+        new = rows[rows['season'] == season]
+        if season in partitions:
+            updated[season] = append_rows(partitions[season], new)
+        elif len(new):
+            # First Games of this season in the tally
+            updated[season] = build_aggregates(new)
+    return updated
+
+
+def concat_rows(*frames):
+    """Concatenate tally frames, keeping categorical columns categorical"""
+    frames = [f for f in frames if len(f)]
+    combined = pd.concat(frames, ignore_index=True)
+    for col in frames[0].columns:
+        if all(isinstance(f[col].dtype, pd.CategoricalDtype) for f in frames):
+            combined[col] = union_categoricals([f[col] for f in frames], sort_categories=True)
+    return combined
+
+
+def check_consistency(aggregates, df):
+    """Names of the aggregates that differ from a full rebuild over df (empty when consistent)"""
+    expected = build_aggregates(df)
+    mismatches = []
+    for field in fields(MedalAggregates):
+        got, want = getattr(aggregates, field.name), getattr(expected, field.name)
+        if isinstance(want, (pd.DataFrame, pd.Series)):
+            got, want = got.sort_index(), want.sort_index()
+            if field.name == 'rows_by_country':
+                got, want = (f.astype(str).sort_values(list(f.columns), ignore_index=True) for f in (got, want))
+            same = got.shape == want.shape and np.array_equal(got.to_numpy(dtype=object), want.to_numpy(dtype=object))
+            if not same and field.name in ('country_year', 'medal_stats'):
+                same = got.shape == want.shape and np.allclose(got.to_numpy(dtype=float), want.to_numpy(dtype=float),
+                                                               equal_nan=True)
+        elif field.name == 'medal_values':
+            same = all(np.array_equal(np.trim_zeros(got[c], 'b'), np.trim_zeros(want[c], 'b')) for c in want)
+        elif field.name in ('edition_ranks', 'medal_matrix'):
+            same = got.equals(want)
+        elif field.name == 'country_rows':
+            same = {c: b - a for c, (a, b) in got.items()} == {c: b - a for c, (a, b) in want.items()}
+        else:
+            same = got == want
+        if not same:
+            mismatches.append(field.name)
+    return mismatches
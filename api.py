@@ -0,0 +1,352 @@
+"""Read-only JSON API over the dashboard's medal aggregates, for tools that want the same numbers.
+
+Examples:
+    python api.py --port 8502
+    curl -s 'localhost:8502/api/countries?limit=10'
+    curl -s --compressed 'localhost:8502/api/countries/IND?season=Summer'
+
+Endpoints (GET or HEAD; all take ?season=All|Summer|Winter):
+    /api                          dataset version, seasons and endpoints
+    /api/countries                gold/silver/bronze/total per country, largest total first (paged)
+    /api/countries/<name or NOC>  one country's medals per Olympic year and medal-table rank per Games
+    /api/years                    gold/silver/bronze/total per Olympic year (?min_year, ?max_year)
+    /api/improvers, /api/decliners
+                                  countries whose medals rose or fell around a split year
+                                  (?split_year, ?window, ?ratio, ?normalize; paged)
+    /api/forecasts                expected medals per country at the next Games (paged)
+
+Every response has an ETag made from the dataset hash and the request, so a client
+that sends it back in If-None-Match gets 304 Not Modified until the tally changes.
+Bodies are gzipped for clients that accept it. Paged endpoints take ?limit (default
+100, at most 1000) and ?offset, and return the total count and the next page's path.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import sys
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlencode, urlsplit
+
+from aggregates import ALL_SEASONS, SEASONS, append_partitions, build_partitions, season_rows
+from data_loader import CACHE_DIR, DATA_FILE, DataBundle, appended_rows, dataset_version, load_tally
+from forecasts import next_games_forecast
+from trends import improvement_scores
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+# Encoded responses kept in memory, least recently used dropped first
+MAX_CACHED_RESPONSES = 256
+# Smaller bodies are not worth compressing
+GZIP_MIN_BYTES = 512
+
+
+class ApiError(Exception):
+    """A request that cannot be answered, with the HTTP status to answer it with"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class DatasetCache:
+    """The tally's season partitions, reloaded when the CSV changes (folding in appended rows when possible)
+
+    Also memoizes forecasts and improvement scores per dataset version, and the encoded
+    response bodies, so repeated requests for the same data are served from memory.
+    """
+
+    def __init__(self, csv_path=DATA_FILE, cache_dir=CACHE_DIR):
+        self.csv_path = csv_path
+        self.cache_dir = cache_dir
+        self.bundle = None
+        self._lock = threading.Lock()
+        self._derived = {}
+        self._responses = OrderedDict()
+
+    def version(self):
+        """Content hash of the tally, cheap while the file is unchanged"""
+        return dataset_version(self.csv_path, self.cache_dir)
+
+    def current(self, version):
+        """Bundle for the given dataset version, loading it if it is not the one held"""
+        with self._lock:
+            if self.bundle is None or self.bundle.version != version:
+                df = load_tally(self.csv_path, self.cache_dir)
+                # Never label data with a version it was not loaded from (the CSV may change in between)
+                if dataset_version(self.csv_path, self.cache_dir) != version:
+                    raise ApiError(HTTPStatus.SERVICE_UNAVAILABLE, "The dataset changed while loading; retry")
+                rows = season_rows(df)
+                appended = appended_rows(df, self.bundle.version, self.csv_path, self.cache_dir) if self.bundle else None
+                if appended is not None:
+                    partitions = append_partitions(self.bundle.partitions, appended)
+                else:
+                    partitions = build_partitions(df, rows)
+                self.bundle = DataBundle(version=version, tally=df, partitions=partitions, season_rows=rows)
+                self._derived.clear()
+                self._responses.clear()
+            return self.bundle
+
+    def derived(self, key, compute):
+        """compute() memoized under key (which should include the dataset version) until the tally changes"""
+        with self._lock:
+            if key in self._derived:
+                return self._derived[key]
+        value = compute()
+        with self._lock:
+            return self._derived.setdefault(key, value)
+
+    def response(self, key, encode):
+        """(body, gzipped body or None) for a request, encoded once while the dataset is unchanged"""
+        with self._lock:
+            if key in self._responses:
+                self._responses.move_to_end(key)
+                return self._responses[key]
+        body = encode()
+        encoded = (body, gzip.compress(body, 6) if len(body) >= GZIP_MIN_BYTES else None)
+        with self._lock:
+            self._responses[key] = encoded
+            while len(self._responses) > MAX_CACHED_RESPONSES:
+                self._responses.popitem(last=False)
+        return encoded
+
+
+def _native(value):
+    if isinstance(value, float):
+        return round(value, 4) if math.isfinite(value) else None
+    return value
+
+
+def records(frame):
+    """JSON-ready list of row dicts, with NaN and infinities as null"""
+    return [{key: _native(value) for key, value in row.items()} for row in frame.to_dict('records')]
+
+
+def _int(params, name, default, minimum=None, maximum=None):
+    value = params.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be an integer")
+    if minimum is not None and value < minimum:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be at least {minimum}")
+    return min(value, maximum) if maximum is not None else value
+
+
+def _float(params, name, default):
+    try:
+        return float(params.get(name, default))
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be a number")
+
+
+def _bool(params, name):
+    return params.get(name, 'false').lower() in ('1', 'true', 'yes')
+
+
+def page(items, path, params):
+    """One page of a list, with the total count and the path of the next page"""
+    limit = _int(params, 'limit', DEFAULT_LIMIT, 1, MAX_LIMIT)
+    offset = _int(params, 'offset', 0, 0)
+    next_offset = offset + limit
+    following = None
+    if next_offset < len(items):
+        following = f"{path}?{urlencode(dict(params, limit=limit, offset=next_offset))}"
+    return {'total': len(items), 'offset': offset, 'limit': limit, 'next': following,
+            'items': records(items.iloc[offset:next_offset])}
+
+
+def index_payload(cache, bundle, season, path, params):
+    return {'seasons': list(bundle.partitions),
+            'endpoints': ['/api/countries', '/api/countries/<name or NOC>', '/api/years', '/api/improvers',
+                          '/api/decliners', '/api/forecasts']}
+
+
+def countries_payload(cache, bundle, season, path, params):
+    medals = bundle.partitions[season].country_medals.rename_axis('country').reset_index()
+    return page(medals, path, params)
+
+
+def country_payload(cache, bundle, season, path, params, name):
+    aggregates = bundle.partitions[season]
+    country = aggregates.resolve_country(name)
+    if country is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, f"No medals for {name!r} in {season} Games")
+    ranks = aggregates.edition_ranks
+    best = {by: ranks.best_rank(country, by) for by in ('gold', 'total')}
+    return {
+        'country': country,
+        'noc': aggregates.country_frame(country)['country_noc'].iloc[0],
+        'medals': records(aggregates.country_medals.loc[[country]])[0],
+        'years': records(aggregates.country_yearly(country)),
+        'ranks': records(ranks.trajectory(country)[['edition', 'year', 'gold', 'silver', 'bronze', 'total',
+                                                    'gold_rank', 'total_rank']]),
+        'best_rank': {by: {'rank': rank, 'edition': ranks.edition_name(edition_id)}
+                      for by, (rank, edition_id) in best.items()},
+    }
+
+
+def years_payload(cache, bundle, season, path, params):
+    min_year = _int(params, 'min_year', None)
+    max_year = _int(params, 'max_year', None)
+    yearly = bundle.partitions[season].yearly_medals.loc[min_year:max_year]
+    return {'items': records(yearly.rename_axis('year').reset_index())}
+
+
+def _improvement(cache, bundle, season, params):
+    settings = (_int(params, 'split_year', 2000), _int(params, 'window', 0, 0), _float(params, 'ratio', 2.0),
+                _bool(params, 'normalize'))
+    if settings[2] <= 1:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "ratio must be greater than 1")
+    split_year, window, ratio, normalize = settings
+    return cache.derived(('improvement', bundle.version, season) + settings, lambda: improvement_scores(
+        bundle.partitions[season], split_year, window or None, ratio, normalize))
+
+
+def improvers_payload(cache, bundle, season, path, params):
+    scores = _improvement(cache, bundle, season, params).improvers
+    return page(scores.rename_axis('country').reset_index(), path, params)
+
+
+def decliners_payload(cache, bundle, season, path, params):
+    scores = _improvement(cache, bundle, season, params).decliners
+    return page(scores.rename_axis('country').reset_index(), path, params)
+
+
+def forecasts_payload(cache, bundle, season, path, params):
+    forecast = cache.derived(('forecast', bundle.version, season), lambda: next_games_forecast(bundle.partitions, season))
+    payload = page(forecast.forecasts.rename_axis('country').reset_index(), path, params)
+    return dict(payload, games=forecast.games, next_year=forecast.next_year, fitted_years=list(forecast.years))
+
+
+ROUTES = {
+    '/api': index_payload,
+    '/api/countries': countries_payload,
+    '/api/years': years_payload,
+    '/api/improvers': improvers_payload,
+    '/api/decliners': decliners_payload,
+    '/api/forecasts': forecasts_payload,
+}
+
+
+def _etag_matches(header, etag):
+    """Whether an If-None-Match header lists etag, comparing weakly and ignoring the gzip variant suffix"""
+    if header.strip() == '*':
+        return True
+    base = etag.strip('"')
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag.endswith('-gzip'):
+            tag = tag[:-len('-gzip')]
+        if tag == base:
+            return True
+    return False
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """Serves ROUTES as JSON with ETags, conditional GET and gzip"""
+
+    server_version = 'OlympicsAPI/1.0'
+    cache = None
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _respond(self, send_body):
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/') or '/'
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            handler, args = self._route(path)
+            season = params.get('season', ALL_SEASONS)
+            if season not in [ALL_SEASONS] + SEASONS:
+                raise ApiError(HTTPStatus.BAD_REQUEST, f"season must be one of {', '.join([ALL_SEASONS] + SEASONS)}")
+            version = self.cache.version()
+            # Same data, same query (in any parameter order) -> same tag, until the tally changes
+            request = json.dumps([path, sorted(params.items())])
+            etag = f'"{version[:16]}-{hashlib.sha256(request.encode()).hexdigest()[:16]}"'
+            if _etag_matches(self.headers.get('If-None-Match', ''), etag):
+                self._send(HTTPStatus.NOT_MODIFIED, etag)
+                return
+
+            def encode():
+                bundle = self.cache.current(version)
+                if season not in bundle.partitions:
+                    raise ApiError(HTTPStatus.NOT_FOUND, f"No {season} Games in the dataset")
+                payload = handler(self.cache, bundle, season, path, params, *args)
+                return json.dumps(dict(payload, version=version, season=season), ensure_ascii=False,
+                                  separators=(',', ':')).encode('utf-8')
+
+            body, gzipped = self.cache.response((version, request), encode)
+        except ApiError as e:
+            self._send(e.status, None, json.dumps({'error': str(e)}).encode('utf-8'), send_body)
+            return
+        if gzipped is not None and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            self._send(HTTPStatus.OK, f'{etag[:-1]}-gzip"', gzipped, send_body, encoding='gzip')
+        else:
+            self._send(HTTPStatus.OK, etag, body, send_body)
+
+    def _route(self, path):
+        if path in ROUTES:
+            return ROUTES[path], ()
+        if path.startswith('/api/countries/'):
+            return country_payload, (unquote(path[len('/api/countries/'):]),)
+        raise ApiError(HTTPStatus.NOT_FOUND, f"Unknown endpoint {path}")
+
+    def _send(self, status, etag, body=b'', send_body=True, encoding=None):
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Vary', 'Accept-Encoding')
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        if send_body and status != HTTPStatus.NOT_MODIFIED:
+            self.wfile.write(body)
+
+
+def make_server(host='127.0.0.1', port=8502, cache=None):
+    """HTTP server answering API requests from cache (a new DatasetCache by default) on its own threads"""
+    handler = type('Handler', (ApiHandler,), {'cache': cache or DatasetCache()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the medal aggregates as a JSON API")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on")
+    parser.add_argument('--port', type=int, default=8502, help="port to listen on")
+    parser.add_argument('--data', default=DATA_FILE, help="tally CSV to serve")
+    args = parser.parse_args(argv)
+
+    cache = DatasetCache(args.data)
+    # Load before accepting requests, so the first client does not wait for it
+    cache.current(cache.version())
+    server = make_server(args.host, args.port, cache)
+    print(f"Serving the Olympics API on http://{args.host}:{server.server_port}/api")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,19 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import numpy as np
+import os
+from datetime import date
+
+from aggregates import ALL_SEASONS, append_partitions, build_partitions, check_consistency, season_rows
+from data_loader import DataBundle, StaleVersionError, appended_rows, dataset_version, load_tally
+from report_generator import (COUNTRY_FLAGS, compute_report_stats, format_size, render_html,
+                              render_markdown, render_pdf, report_bytes)
+from report_jobs import ReportQueue
+from query_backend import BACKEND, make_backend
+from trends import improvement_scores
+from forecasts import next_games_forecast
+from instrumentation import (Timed, debug_panel, download_button, finish_rerun, fragment_trace, image, plotly_chart,
+                             record_span, set_section, start_rerun, track_cache, METRICS_FILE)
+from warmup import WARMUP, WarmUp
 
 # Set page config
 st.set_page_config(
@@ -15,6 +23,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Time this rerun; figure payload sizes are only measured when someone will look at them
+show_debug_panel = st.session_state.get('debug_panel', False)
+start_rerun(measure_payloads=show_debug_panel or bool(METRICS_FILE))
+
 # Custom CSS for better aesthetics
 st.markdown("""
 <style>
@@ -65,21 +77,142 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Set OLYMPICS_CHECK_APPENDS=1 to verify every incremental update against a full rebuild
+CHECK_APPENDS = os.environ.get("OLYMPICS_CHECK_APPENDS") == "1"
+
+# Default selections, shared by the sections and the warm-up that precomputes them
+DEFAULT_COUNTRY = 'India'
+COMPARE_DEFAULTS = ['Japan']
+EXPLORE_DEFAULTS = ['United States', 'China', 'Germany', 'India']
+
 # Load and prepare data
-@st.cache_data
-def load_data():
-    df = pd.read_csv("Olympic_Games_Medal_Tally.csv")
-    return df
+@st.cache_resource
+def get_latest_bundle():
+    """Most recently loaded bundle, the starting point for folding in appended rows"""
+    return {}
+
+@track_cache(st.cache_resource(max_entries=4))
+def get_bundle(version):
+    """Tally and per-season aggregates for one dataset version, held once per process and shared by every session
+
+    Only the CSV currently on disk can be loaded, so asking for any other version
+    (e.g. an evicted older one) raises StaleVersionError instead of caching the
+    current data under the old version's key.
+    """
+    df = load_tally()
+    loaded = dataset_version()
+    if loaded != version:
+        raise StaleVersionError(f"Dataset version {version[:12]} is no longer on disk (found {loaded[:12]})")
+    rows = season_rows(df)
+    latest = get_latest_bundle().get('bundle')
+    appended = appended_rows(df, latest.version) if latest else None
+    if appended is not None:
+        # A new edition was appended: fold in its rows instead of rebuilding
+        partitions = append_partitions(latest.partitions, appended)
+        if CHECK_APPENDS and any(check_consistency(aggregates, df if name == ALL_SEASONS else df.iloc[rows[name]])
+                                 for name, aggregates in partitions.items()):
+            st.warning("Incrementally updated aggregates differ from a full rebuild; rebuilding.")
+            partitions = build_partitions(df, rows)
+    else:
+        partitions = build_partitions(df, rows)
+    bundle = DataBundle(version=version, tally=df, partitions=partitions, season_rows=rows)
+    get_latest_bundle()['bundle'] = bundle
+    return bundle
+
+def default_split_year(split_years):
+    """Chapter 3's default split: the first Olympic year from 2000 on"""
+    return next((y for y in split_years if y >= 2000), split_years[-1])
+
+# Results below are immutable, so they are shared like the bundle instead of copied per call
+@track_cache(st.cache_resource(max_entries=64))
+def get_improvement(version, season, split_year, window, ratio, normalize):
+    """Improvers and decliners for one season and set of Chapter 3 settings"""
+    return improvement_scores(get_bundle(version).partitions[season], split_year, window or None, ratio, normalize)
+
+@track_cache(st.cache_resource(max_entries=8))
+def get_forecast(version, season):
+    """Next-Games medal forecasts for every country, fitted in one batch per dataset version and season"""
+    return next_games_forecast(get_bundle(version).partitions, season)
+
+@track_cache(st.cache_resource(max_entries=4))
+def get_truncated_axis_png(version, season):
+    """The matplotlib truncated-axis example, rasterized once per dataset version and season"""
+    import charts as chart_builders
+    recent_years = get_backend(version, BACKEND, season).yearly_medals(2000)[['total']].reset_index()
+    return chart_builders.figure_png(chart_builders.truncated_axis_bar(recent_years))
+
+@track_cache(st.cache_resource)
+def get_backend(version, name, season):
+    """Query backend the sections read from for one season, switchable with OLYMPICS_BACKEND"""
+    bundle = get_bundle(version)
+    return make_backend(name, bundle.tally, bundle.partitions[season], version, season)
+
+version = dataset_version()
+try:
+    bundle = get_bundle(version)
+except StaleVersionError:
+    # The CSV changed between hashing and loading it: start over with the new version
+    st.rerun()
+# Plotly is imported by the first chart drawn, after the page header has been sent
+charts = Timed('charts', 'figure')
+
+# The comparison widgets rerun on their own, so changing a selection only redraws that chart
+@st.fragment
+def compare_with_others(journey_country, country_options):
+    """Journey country vs a multiselect of other countries"""
+    with fragment_trace("🌏 Country comparison"):
+        available_countries = [c for c in country_options if c != journey_country]
+        
+        selected_other_countries = st.multiselect(
+            f"Select countries to compare with {journey_country}:",
+            options=available_countries,
+            default=[c for c in COMPARE_DEFAULTS if c in available_countries]
+        )
+        
+        comparison_countries = [journey_country] + selected_other_countries
+        other_comparison = backend.country_year(comparison_countries)
+        
+        if not other_comparison.columns.empty:
+            fig = charts.comparison_line(other_comparison,
+                                         f"Medal Performance: {journey_country} vs {', '.join(selected_other_countries)}")
+            plotly_chart(fig, use_container_width=True)
 
-df = load_data()
+@st.fragment
+def explore_countries(all_countries):
+    """Stacked yearly totals of a multiselect of countries"""
+    with fragment_trace("🎪 Interactive exploration"):
+        default_countries = [c for c in EXPLORE_DEFAULTS if c in all_countries]
+        
+        selected_countries = st.multiselect(
+            "Select countries to compare their Olympic journey:",
+            options=all_countries,
+            default=default_countries
+        )
+        
+        if selected_countries:
+            comparison_yearly = backend.country_year(selected_countries)
+            
+            fig = charts.comparison_area(comparison_yearly, selected_countries)
+            plotly_chart(fig, use_container_width=True)
 
 # Sidebar for navigation
 st.sidebar.title("📊 Navigation")
 analysis_type = st.sidebar.selectbox(
     "Choose Analysis Type:",
-    ["📈 Overview & Key Metrics", "🌍 Global Medal Analysis", "🇮🇳 India's Olympic Journey", 
-     "⚠️ Misleading vs Corrected Visualizations", "📖 Data Storytelling"]
+    ["📈 Overview & Key Metrics", "🌍 Global Medal Analysis", "🗺️ Country Olympic Journey", 
+     "⚠️ Misleading vs Corrected Visualizations", "📖 Data Storytelling", "🔮 Medal Forecasts"]
+)
+# Every section and the report read from the chosen season's precomputed partition
+season = st.sidebar.radio(
+    "Olympic Season:",
+    list(bundle.partitions),
+    horizontal=True,
+    key="season",
+    help="Show all Games, or only the Summer or Winter Olympics"
 )
+agg = bundle.partitions[season]
+backend = Timed(get_backend(version, BACKEND, season), 'query')
+set_section(analysis_type)
 
 # Overview Section
 if analysis_type == "📈 Overview & Key Metrics":
@@ -88,13 +221,13 @@ if analysis_type == "📈 Overview & Key Metrics":
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Countries", df['country'].nunique(), "Participating Nations")
+        st.metric("Total Countries", agg.n_countries, "Participating Nations")
     with col2:
-        st.metric("Years Covered", f"{df['year'].min()}-{df['year'].max()}", "Time Span")
+        st.metric("Years Covered", f"{agg.year_min}-{agg.year_max}", "Time Span")
     with col3:
-        st.metric("Total Medals", f"{df['total'].sum():,}", "All Time")
+        st.metric("Total Medals", f"{agg.total_medals:,}", "All Time")
     with col4:
-        st.metric("Olympic Games", df['year'].nunique(), "Editions")
+        st.metric("Olympic Games", agg.n_years, "Editions")
     
     st.markdown("""
     <div class="insight-box">
@@ -110,25 +243,21 @@ if analysis_type == "📈 Overview & Key Metrics":
     
     # Interactive dataset preview
     st.subheader("📋 Dataset Preview")
-    st.dataframe(df.head(10), use_container_width=True)
+    st.dataframe(bundle.season_tally(season, 10), use_container_width=True)
     
     # Basic statistics
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("📊 Medal Distribution Statistics")
-        stats_df = df[['gold', 'silver', 'bronze', 'total']].describe()
+        stats_df = agg.medal_stats
         st.dataframe(stats_df, use_container_width=True)
     
     with col2:
         st.subheader("🏆 Top Medal Winners")
-        top_countries = df.groupby('country')['total'].sum().sort_values(ascending=False).head(10)
-        fig = px.bar(x=top_countries.values, y=top_countries.index, orientation='h',
-                    title="Top 10 Countries by Total Medals",
-                    color=top_countries.values,
-                    color_continuous_scale='Viridis')
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        top_countries = backend.country_totals(10)
+        fig = charts.top_countries_bar(top_countries)
+        plotly_chart(fig, use_container_width=True)
 
 # Global Analysis Section
 elif analysis_type == "🌍 Global Medal Analysis":
@@ -137,19 +266,10 @@ elif analysis_type == "🌍 Global Medal Analysis":
     # Medal distribution over time
     st.subheader("📈 Global Medal Trends Over Time")
     
-    yearly_medals = df.groupby('year')[['gold', 'silver', 'bronze']].sum().reset_index()
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=yearly_medals['year'], y=yearly_medals['gold'], 
-                            mode='lines+markers', name='Gold', line=dict(color='gold', width=3)))
-    fig.add_trace(go.Scatter(x=yearly_medals['year'], y=yearly_medals['silver'], 
-                            mode='lines+markers', name='Silver', line=dict(color='silver', width=3)))
-    fig.add_trace(go.Scatter(x=yearly_medals['year'], y=yearly_medals['bronze'], 
-                            mode='lines+markers', name='Bronze', line=dict(color='#CD7F32', width=3)))
+    yearly_medals = backend.yearly_medals().reset_index()
     
-    fig.update_layout(title="Global Medal Distribution Trends", xaxis_title="Year", 
-                     yaxis_title="Number of Medals", height=500)
-    st.plotly_chart(fig, use_container_width=True)
+    fig = charts.medal_trends_line(yearly_medals)
+    plotly_chart(fig, use_container_width=True)
     
     st.markdown("""
     <div class="insight-box">
@@ -165,20 +285,12 @@ elif analysis_type == "🌍 Global Medal Analysis":
     # Top performing countries analysis
     st.subheader("🏆 Elite Olympic Nations Analysis")
     
-    country_totals = df.groupby('country')['total'].sum().sort_values(ascending=False)
-    top_10_countries = country_totals.head(10)
+    top_10_countries = backend.country_totals(10)
     
-    # Create detailed breakdown for top countries
-    top_countries_detailed = df[df['country'].isin(top_10_countries.index)].groupby('country')[['gold', 'silver', 'bronze']].sum()
+    top_countries_detailed = backend.country_medals(list(top_10_countries.index))
     
-    fig = go.Figure()
-    fig.add_trace(go.Bar(name='Gold', x=top_countries_detailed.index, y=top_countries_detailed['gold'], marker_color='gold'))
-    fig.add_trace(go.Bar(name='Silver', x=top_countries_detailed.index, y=top_countries_detailed['silver'], marker_color='silver'))
-    fig.add_trace(go.Bar(name='Bronze', x=top_countries_detailed.index, y=top_countries_detailed['bronze'], marker_color='#CD7F32'))
-    
-    fig.update_layout(barmode='stack', title="Medal Composition of Top 10 Olympic Nations",
-                     xaxis_title="Country", yaxis_title="Number of Medals", height=500)
-    st.plotly_chart(fig, use_container_width=True)
+    fig = charts.medal_composition_bar(top_countries_detailed)
+    plotly_chart(fig, use_container_width=True)
     
     # Performance consistency analysis
     st.subheader("📊 Performance Consistency Analysis")
@@ -187,108 +299,101 @@ elif analysis_type == "🌍 Global Medal Analysis":
     
     with col1:
         # Medal efficiency (Gold/Total ratio)
-        top_countries_efficiency = df[df['country'].isin(top_10_countries.index)].groupby('country').agg({
-            'gold': 'sum', 'total': 'sum'
-        })
-        top_countries_efficiency['efficiency'] = (top_countries_efficiency['gold'] / top_countries_efficiency['total'] * 100).round(2)
-        
-        fig = px.bar(x=top_countries_efficiency.index, y=top_countries_efficiency['efficiency'],
-                    title="Gold Medal Efficiency (Gold/Total %)",
-                    color=top_countries_efficiency['efficiency'],
-                    color_continuous_scale='RdYlGn')
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        fig = charts.gold_efficiency_bar(top_countries_detailed)
+        plotly_chart(fig, use_container_width=True)
     
     with col2:
         # Participation span
-        participation_span = df[df['country'].isin(top_10_countries.index)].groupby('country')['year'].agg(['min', 'max', 'count'])
-        participation_span['span'] = participation_span['max'] - participation_span['min']
-        
-        fig = px.scatter(x=participation_span['span'], y=participation_span['count'],
-                        hover_name=participation_span.index,
-                        title="Olympic Participation: Years Span vs Games Count",
-                        labels={'x': 'Years Span', 'y': 'Games Participated'})
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
-
-# India Analysis Section
-elif analysis_type == "🇮🇳 India's Olympic Journey":
-    st.header("🇮🇳 India's Olympic Journey: A Detailed Analysis")
-    
-    india_data = df[df['country'] == 'India']
-    
-    if len(india_data) > 0:
-        # India's medal timeline
-        st.subheader("🏅 India's Medal Timeline")
-        
-        india_yearly = india_data.groupby('year')[['gold', 'silver', 'bronze', 'total']].sum().reset_index()
-        
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        
-        fig.add_trace(go.Bar(x=india_yearly['year'], y=india_yearly['gold'], name='Gold', marker_color='gold'))
-        fig.add_trace(go.Bar(x=india_yearly['year'], y=india_yearly['silver'], name='Silver', marker_color='silver'))
-        fig.add_trace(go.Bar(x=india_yearly['year'], y=india_yearly['bronze'], name='Bronze', marker_color='#CD7F32'))
-        
-        fig.add_trace(go.Scatter(x=india_yearly['year'], y=india_yearly['total'], 
-                                mode='lines+markers', name='Total Medals', 
-                                line=dict(color='red', width=3)), secondary_y=True)
+        fig = charts.participation_scatter(agg, top_10_countries.index)
+        plotly_chart(fig, use_container_width=True)
+
+# Country Journey Section
+elif analysis_type == "🗺️ Country Olympic Journey":
+    country_options = sorted(agg.country_rows)
+    remembered = st.session_state.get('report_country', DEFAULT_COUNTRY)
+    journey_country = st.selectbox(
+        "Choose a country:",
+        options=country_options,
+        index=country_options.index(remembered) if remembered in country_options else 0,
+        format_func=lambda c: f"{COUNTRY_FLAGS.get(c, '🏳️')} {c} ({agg.country_frame(c)['country_noc'].iloc[0]})",
+        key="journey_country"
+    )
+    # Remembered outside the widget so the report keeps this focus on other pages
+    st.session_state['report_country'] = journey_country
+    flag = COUNTRY_FLAGS.get(journey_country, '🏳️')
+    st.header(f"{flag} {journey_country}'s Olympic Journey: A Detailed Analysis")
+    
+    country_yearly = agg.country_yearly(journey_country)
+    
+    if len(country_yearly) > 0:
+        # Medal timeline
+        st.subheader(f"🏅 {journey_country}'s Medal Timeline")
         
-        fig.update_layout(title="India's Olympic Medal Journey", barmode='stack', height=500)
-        fig.update_xaxes(title_text="Year")
-        fig.update_yaxes(title_text="Individual Medals", secondary_y=False)
-        fig.update_yaxes(title_text="Total Medals", secondary_y=True)
+        fig = charts.country_timeline(journey_country, country_yearly)
         
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
         
-        # India's performance metrics
+        # Performance metrics
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Medals", india_data['total'].sum())
+            st.metric("Total Medals", agg.country_medals.loc[journey_country, 'total'])
         with col2:
-            st.metric("Gold Medals", india_data['gold'].sum())
+            st.metric("Gold Medals", agg.country_medals.loc[journey_country, 'gold'])
         with col3:
-            st.metric("Best Year", india_yearly.loc[india_yearly['total'].idxmax(), 'year'])
+            st.metric("Best Year", country_yearly.loc[country_yearly['total'].idxmax(), 'year'])
         with col4:
-            st.metric("Games Participated", len(india_yearly))
-        
-        st.markdown("""
+            st.metric("Games Participated", len(country_yearly))
+        
+        if journey_country == 'India':
+            insights = [
+                "India's Olympic journey shows gradual improvement over the decades",
+                "Recent years have seen better medal tallies compared to earlier participation",
+                "The country has shown consistent participation in Olympic Games",
+                "Performance peaks align with increased investment in sports infrastructure",
+            ]
+        else:
+            best = country_yearly.loc[country_yearly['total'].idxmax()]
+            insights = [
+                f"{journey_country} won its first Olympic medals in {country_yearly['year'].iloc[0]}",
+                f"Its best year was {best['year']} with {best['total']} medals",
+                f"Gold medals make up {agg.country_medals.loc[journey_country, 'gold'] / agg.country_medals.loc[journey_country, 'total'] * 100:.1f}% of its medals",
+                f"It has won medals at {len(country_yearly)} different Olympic years",
+            ]
+        items = "\n".join(f"        <li>{item}</li>" for item in insights)
+        st.markdown(f"""
         <div class="insight-box">
-        <h4 style="color: #FFD700;">🔍 India's Olympic Insights:</h4>
+        <h4 style="color: #FFD700;">🔍 {journey_country}'s Olympic Insights:</h4>
         <ul style="color: white;">
-        <li>India's Olympic journey shows gradual improvement over the decades</li>
-        <li>Recent years have seen better medal tallies compared to earlier participation</li>
-        <li>The country has shown consistent participation in Olympic Games</li>
-        <li>Performance peaks align with increased investment in sports infrastructure</li>
+{items}
         </ul>
         </div>
         """, unsafe_allow_html=True)
         
-        # Comparison with other nations
-        st.subheader("🌏 India vs Other Asian Nations")
-        
-        available_countries = sorted([c for c in df['country'].unique() if c != 'India'])
+        # Medal-table rank at every edition, from the precomputed rank index
+        st.subheader(f"📈 {journey_country}'s Medal Table Rank Over Time")
+        ranks = agg.edition_ranks
+        trajectory = ranks.trajectory(journey_country)
+        plotly_chart(charts.rank_trajectory_line(journey_country, trajectory), use_container_width=True)
         
-        selected_asian_countries = st.multiselect(
-            "Select countries to compare with India:",
-            options=available_countries,
-            default=['Japan'] if 'Japan' in available_countries else []
-        )
+        best_gold, best_gold_edition = ranks.best_rank(journey_country, 'gold')
+        best_total, best_total_edition = ranks.best_rank(journey_country, 'total')
+        latest = trajectory.iloc[-1]
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Best Rank (gold-first)", f"#{best_gold}", ranks.edition_name(best_gold_edition), delta_color="off")
+        with col2:
+            st.metric("Best Rank (by total)", f"#{best_total}", ranks.edition_name(best_total_edition), delta_color="off")
+        with col3:
+            st.metric("Latest Rank (gold-first)", f"#{latest['gold_rank']}", latest['edition'], delta_color="off")
         
-        comparison_countries = ['India'] + selected_asian_countries
-        asian_data = df[df['country'].isin(comparison_countries)]
+        # Comparison with other nations
+        st.subheader(f"🌏 {journey_country} vs Other Nations")
         
-        if len(asian_data) > 0:
-            asian_comparison = asian_data.groupby(['year', 'country'])['total'].sum().reset_index()
-            
-            fig = px.line(asian_comparison, x='year', y='total', color='country',
-                         title=f"Medal Performance: India vs {', '.join(selected_asian_countries)}",
-                         markers=True, line_shape='spline')
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
+        compare_with_others(journey_country, country_options)
     
     else:
-        st.warning("No data found for India in the dataset.")
+        st.warning(f"No data found for {journey_country} in the dataset.")
 
 # Misleading vs Corrected Visualizations
 elif analysis_type == "⚠️ Misleading vs Corrected Visualizations":
@@ -304,27 +409,14 @@ elif analysis_type == "⚠️ Misleading vs Corrected Visualizations":
     # Misleading Pie Chart
     st.subheader("❌ Misleading Visualization: Pie Chart for Medal Distribution")
     
-    top_15_countries = df.groupby('country')['total'].sum().sort_values(ascending=False).head(15)
+    top_15_countries = backend.country_totals(15)
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("**❌ Problematic: Pie Chart**")
-        fig = go.Figure(data=[go.Pie(
-            labels=top_15_countries.index,
-            values=top_15_countries.values,
-            hole=0.3,
-            marker_colors=px.colors.qualitative.Set3,
-            textinfo='label+percent',
-            textfont_size=10,
-            marker=dict(line=dict(color='#FFFFFF', width=2))
-        )])
-        fig.update_layout(
-            title="Medal Distribution (Misleading Pie Chart)",
-            height=500,
-            showlegend=False
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        fig = charts.medal_share_pie(top_15_countries)
+        plotly_chart(fig, use_container_width=True)
         
         st.markdown("""
         **🚫 Problems with this visualization:**
@@ -338,12 +430,8 @@ elif analysis_type == "⚠️ Misleading vs Corrected Visualizations":
     with col2:
         st.markdown("**✅ Corrected: Horizontal Bar Chart**")
         
-        fig = px.bar(x=top_15_countries.values, y=top_15_countries.index, 
-                    orientation='h', title="Medal Distribution Among Top 15 Countries\n(Corrected Visualization)",
-                    color=top_15_countries.values, color_continuous_scale='viridis')
-        fig.update_layout(height=600, yaxis={'categoryorder':'total ascending'})
-        fig.update_traces(texttemplate='%{x}', textposition='outside')
-        st.plotly_chart(fig, use_container_width=True)
+        fig = charts.ranked_bar(top_15_countries)
+        plotly_chart(fig, use_container_width=True)
         
         st.markdown("""
         **✅ Improvements in this visualization:**
@@ -359,18 +447,12 @@ elif analysis_type == "⚠️ Misleading vs Corrected Visualizations":
     
     col1, col2 = st.columns(2)
     
-    recent_years = df[df['year'] >= 2000].groupby('year')['total'].sum().reset_index()
+    recent_years = backend.yearly_medals(2000)[['total']].reset_index()
     
     with col1:
         st.markdown("**❌ Problematic: Truncated Y-Axis**")
         
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.bar(recent_years['year'], recent_years['total'], color='lightcoral')
-        ax.set_ylim(recent_years['total'].min() - 50, recent_years['total'].max() + 50)  # Truncated
-        ax.set_title("Total Medals by Year (Misleading - Truncated Y-Axis)")
-        ax.set_xlabel("Year")
-        ax.set_ylabel("Total Medals")
-        st.pyplot(fig)
+        image(get_truncated_axis_png(version, season), "truncated_axis_bar", use_container_width=True)
         
         st.markdown("""
         **🚫 Problems:**
@@ -382,11 +464,8 @@ elif analysis_type == "⚠️ Misleading vs Corrected Visualizations":
     with col2:
         st.markdown("**✅ Corrected: Full Y-Axis Scale**")
         
-        fig = px.bar(recent_years, x='year', y='total', 
-                    title="Total Medals by Year (Corrected - Full Scale)",
-                    color='total', color_continuous_scale='blues')
-        fig.update_layout(yaxis=dict(range=[0, recent_years['total'].max() * 1.1]))
-        st.plotly_chart(fig, use_container_width=True)
+        fig = charts.full_scale_bar(recent_years)
+        plotly_chart(fig, use_container_width=True)
         
         st.markdown("""
         **✅ Improvements:**
@@ -395,6 +474,56 @@ elif analysis_type == "⚠️ Misleading vs Corrected Visualizations":
         - Honest visualization of differences
         """)
 
+# Medal Forecasts Section
+elif analysis_type == "🔮 Medal Forecasts":
+    forecast = get_forecast(version, season)
+    st.header(f"🔮 Medal Forecasts for the {forecast.games}")
+    
+    st.markdown(f"""
+    <div class="insight-box">
+    <h4 style="color: #FFD700;">📐 How These Forecasts Are Made:</h4>
+    <ul style="color: white;">
+    <li>Every country's medals at the last {len(forecast.years)} Games ({forecast.years[0]}-{forecast.years[-1]}) are fitted with a straight trend line and with exponential smoothing</li>
+    <li>The forecast is the average of the two, and the likely range covers about 95% of outcomes if recent ups and downs continue</li>
+    <li>Forecasts cannot know about boycotts, host-country boosts or new sports</li>
+    </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    fig = charts.forecast_bar(forecast)
+    plotly_chart(fig, use_container_width=True)
+    
+    st.subheader("🔍 One Country's Forecast")
+    forecast_countries = list(forecast.forecasts.index)
+    remembered = st.session_state.get('report_country', DEFAULT_COUNTRY)
+    forecast_country = st.selectbox(
+        "Choose a country:",
+        options=forecast_countries,
+        index=forecast_countries.index(remembered) if remembered in forecast_countries else 0,
+        format_func=lambda c: f"{COUNTRY_FLAGS.get(c, '🏳️')} {c}",
+        key="forecast_country"
+    )
+    row = forecast.country(forecast_country)
+    # History from the partition the forecast was fitted on (for All, the next Games' season)
+    history = bundle.partitions[forecast.season or season].country_year[forecast_country].fillna(0)
+    
+    fig = charts.forecast_line(forecast_country, history, forecast, row)
+    plotly_chart(fig, use_container_width=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Forecast", f"{row['forecast']:.0f} medals")
+    with col2:
+        st.metric("Likely Range", f"{row['low']:.0f}-{row['high']:.0f}")
+    with col3:
+        st.metric(f"Won in {forecast.years[-1]}", int(row['last_total']))
+    
+    st.subheader("📋 Forecasts by Country")
+    table = forecast.forecasts.head(50)[['last_total', 'trend', 'smoothed', 'forecast', 'low', 'high']]
+    table.columns = [f'Won in {forecast.years[-1]}', 'Trend line', 'Exponential smoothing', 'Forecast', 'Low', 'High']
+    st.dataframe(table.round(1), use_container_width=True)
+    st.caption(f"Top 50 of {len(forecast.forecasts)} countries with medals at the last {len(forecast.years)} Games.")
+
 # Data Storytelling Section
 else:  # "📖 Data Storytelling"
     st.header("📖 Olympic Games: A Data-Driven Story")
@@ -410,16 +539,12 @@ else:  # "📖 Data Storytelling"
     st.subheader("📚 Chapter 1: The Rise of Olympic Superpowers")
     
     # Interactive timeline
-    country_yearly = df.groupby(['year', 'country'])['total'].sum().reset_index()
-    top_countries = df.groupby('country')['total'].sum().sort_values(ascending=False).head(8).index
+    top_countries = list(backend.country_totals(8).index)
     
-    story_data = country_yearly[country_yearly['country'].isin(top_countries)]
+    story_data = backend.country_year(top_countries)
     
-    fig = px.line(story_data, x='year', y='total', color='country',
-                 title="The Evolution of Olympic Dominance (1896-Present)",
-                 markers=True, line_shape='spline')
-    fig.update_layout(height=600)
-    st.plotly_chart(fig, use_container_width=True)
+    fig = charts.comparison_line(story_data, "The Evolution of Olympic Dominance (1896-Present)", height=600)
+    plotly_chart(fig, use_container_width=True)
     
     st.markdown("""
     **📊 Story Insights:**
@@ -432,51 +557,33 @@ else:  # "📖 Data Storytelling"
     # Story Chapter 2: The Medal Efficiency Story
     st.subheader("📚 Chapter 2: Quality vs Quantity - The Medal Efficiency Tale")
     
-    # Calculate medal efficiency metrics
-    country_stats = df.groupby('country').agg({
-        'total': 'sum',
-        'gold': 'sum',
-        'year': 'nunique'
-    }).reset_index()
-    
-    country_stats['medals_per_game'] = (country_stats['total'] / country_stats['year']).round(2)
-    country_stats['gold_ratio'] = (country_stats['gold'] / country_stats['total'] * 100).round(2)
-    
-    # Filter for countries with significant participation
-    significant_countries = country_stats[country_stats['total'] >= 50]
-    
-    fig = px.scatter(significant_countries, x='medals_per_game', y='gold_ratio',
-                    size='total', hover_name='country',
-                    title="Olympic Efficiency: Medals per Game vs Gold Medal Ratio",
-                    labels={'medals_per_game': 'Average Medals per Olympic Game',
-                           'gold_ratio': 'Gold Medal Percentage (%)'})
-    fig.update_layout(height=600)
-    st.plotly_chart(fig, use_container_width=True)
+    fig = charts.efficiency_scatter(agg)
+    plotly_chart(fig, use_container_width=True)
     
     # Story Chapter 3: Small Countries That Did Great
     st.subheader("📚 Chapter 3: Small Countries That Surprised Everyone")
     
     # Find countries with significant improvement
-    recent_performance = df[df['year'] >= 2000].groupby('country')['total'].sum()
-    historical_performance = df[df['year'] < 2000].groupby('country')['total'].sum()
+    with st.expander("⚙️ Improvement settings"):
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            split_years = list(agg.yearly_medals.index[1:])
+            split_year = st.select_slider("Split year", options=split_years, value=default_split_year(split_years))
+        with col2:
+            window = st.slider("Olympic years per period (0 = all)", 0, 20, 0)
+        with col3:
+            ratio_threshold = st.slider("Improvement ratio", 1.1, 5.0, 2.0, 0.1)
+        with col4:
+            normalize = st.checkbox("Share of medals per edition", value=False)
     
-    improvement_countries = []
-    for country in recent_performance.index:
-        if country in historical_performance.index:
-            recent_avg = recent_performance[country] / len(df[df['year'] >= 2000]['year'].unique())
-            historical_avg = historical_performance[country] / len(df[df['year'] < 2000]['year'].unique())
-            if recent_avg > historical_avg * 2:  # Significant improvement
-                improvement_countries.append(country)
+    improvement = get_improvement(version, season, split_year, window, ratio_threshold, normalize)
+    improvement_countries = list(improvement.improvers.index)
     
     if improvement_countries:
-        improvement_data = df[df['country'].isin(improvement_countries[:5])]
-        improvement_yearly = improvement_data.groupby(['year', 'country'])['total'].sum().reset_index()
+        improvement_yearly = backend.country_year(improvement_countries[:5])
         
-        fig = px.bar(improvement_yearly, x='year', y='total', color='country',
-                    title="Countries That Got Much Better at Olympics",
-                    barmode='group')
-        fig.update_layout(height=500)
-        st.plotly_chart(fig, use_container_width=True)
+        fig = charts.improvement_bar(improvement_yearly)
+        plotly_chart(fig, use_container_width=True)
         
         st.markdown("""
         **📊 What This Shows:**
@@ -485,6 +592,10 @@ else:  # "📖 Data Storytelling"
         - Small countries can also win medals if they try hard
         - It shows that any country can improve with proper planning
         """)
+        
+        if len(improvement.decliners) > 0:
+            st.markdown("**📉 Biggest declines over the same periods:**")
+            st.dataframe(improvement.decliners.head(5).round(2), use_container_width=True)
     
     # Final Story Summary
     st.subheader("🎯 Story Conclusion: Key Takeaways")
@@ -518,25 +629,10 @@ else:  # "📖 Data Storytelling"
     # Interactive conclusion
     st.subheader("🎪 Interactive Exploration")
     
-    all_countries = sorted(df['country'].unique())
-    default_countries = [c for c in ['United States', 'China', 'Germany', 'India'] if c in all_countries]
-    
-    selected_countries = st.multiselect(
-        "Select countries to compare their Olympic journey:",
-        options=all_countries,
-        default=default_countries
-    )
-    
-    if selected_countries:
-        comparison_data = df[df['country'].isin(selected_countries)]
-        comparison_yearly = comparison_data.groupby(['year', 'country'])['total'].sum().reset_index()
-        
-        fig = px.area(comparison_yearly, x='year', y='total', color='country',
-                     title=f"Olympic Medal Journey: {', '.join(selected_countries)}")
-        fig.update_layout(height=500)
-        st.plotly_chart(fig, use_container_width=True)
+    explore_countries(sorted(agg.country_totals.index))
 
 # Download Report Section
+set_section("📄 Report")
 st.markdown("---")
 st.markdown("""
 <div style="background: linear-gradient(90deg, #0085C3 0%, #00A651 100%); padding: 1rem; border-radius: 15px; color: white; text-align: center; margin: 1rem 0; font-size: 1.3rem; font-weight: bold;">
@@ -544,407 +640,160 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Generate report function
-def generate_report():
-    from datetime import datetime
-    
-    # Country flags mapping
-    country_flags = {
-        'United States': '🇺🇸', 'China': '🇨🇳', 'Germany': '🇩🇪', 'India': '🇮🇳',
-        'Japan': '🇯🇵', 'Great Britain': '🇬🇧', 'France': '🇫🇷', 'Italy': '🇮🇹',
-        'Australia': '🇦🇺', 'South Korea': '🇰🇷', 'Russia': '🇷🇺', 'Canada': '🇨🇦'
-    }
-    
-    report_content = f"""
-# 🏅 Olympic Games Data Analysis Report
-
-**Student Name:** Aryan Gupta  
-**Roll Number:** 2415800019  
-**Subject:** Data Visualization and Storytelling  
-**Teacher:** Dr. Saurabh Tewari  
-**Date:** {datetime.now().strftime('%B %d, %Y')}
-
----
-
-## 📊 Executive Summary
-
-This report shows the analysis of Olympic Games medal data. We have studied how different countries perform in Olympics and what patterns we can see over the years.
-
-### Key Numbers:
-- **Total Countries:** {df['country'].nunique()} countries have participated
-- **Total Medals:** {df['total'].sum():,} medals given in all Olympics
-- **Time Period:** From {df['year'].min()} to {df['year'].max()}
-- **Olympic Games:** {df['year'].nunique()} different Olympic games
-
----
-
-## 🏆 Top Performing Countries
-
-These are the countries that won most medals in Olympics:
-
-"""
-    
-    # Add top 10 countries
-    top_10 = df.groupby('country')['total'].sum().sort_values(ascending=False).head(10)
-    for i, (country, medals) in enumerate(top_10.items(), 1):
-        flag = country_flags.get(country, '🏳️')
-        report_content += f"{i}. {flag} **{country}** - {medals:,} medals\n"
-    
-    report_content += f"""
-
-### What This Tells Us:
-- USA is the clear winner with most medals
-- Big countries like China, Germany, and Russia also perform very well
-- These countries invest a lot of money in sports training
-- They have good facilities and coaches for athletes
-
----
-
-## 🇮🇳 India's Olympic Performance
-
-"""
-    
-    india_data = df[df['country'] == 'India']
-    if len(india_data) > 0:
-        india_total = india_data['total'].sum()
-        india_gold = india_data['gold'].sum()
-        india_games = len(india_data)
-        
-        report_content += f"""
-### India's Numbers:
-- **Total Medals:** {india_total} medals
-- **Gold Medals:** {india_gold} gold medals  
-- **Games Played:** {india_games} Olympic games
-- **Average per Game:** {india_total/india_games:.1f} medals per Olympics
-
-### India's Story:
-- India has been participating in Olympics for many years
-- Our performance is slowly getting better
-- We need more investment in sports to compete with top countries
-- Recent Olympics show improvement in India's medal count
-"""
-    else:
-        report_content += "No data available for India in this dataset.\n"
-    
-    report_content += f"""
-
----
-
-## 📈 Important Trends We Found
-
-### 1. Medal Distribution Over Time
-- Number of medals given has increased over years
-- This is because more sports and events are added to Olympics
-- More countries participate now than before
-
-### 2. Country Performance Patterns
-- **Consistent Winners:** USA, Germany, and Great Britain always perform well
-- **Rising Powers:** China has improved a lot in recent Olympics
-- **Political Impact:** When Soviet Union broke up, it affected their medal count
-
-### 3. Medal Types
-- Gold, Silver, and Bronze medals are almost equally distributed
-- This shows fair competition in Olympics
-- No single country dominates all medal types
-
----
-
-## ⚠️ Common Mistakes in Data Visualization
-
-We also learned about wrong ways to show data:
-
-### Pie Charts Problems:
-- **Bad:** Using pie charts with too many countries
-- **Why Bad:** Hard to compare small slices
-- **Better:** Use bar charts to show rankings clearly
-
-### Y-Axis Tricks:
-- **Bad:** Starting Y-axis from middle instead of zero
-- **Why Bad:** Makes small differences look very big
-- **Better:** Always start from zero to show true picture
-
----
-
-## 🎯 Key Learnings
-
-### For Countries:
-1. **Investment Matters:** Countries that spend more on sports get more medals
-2. **Long-term Planning:** Success comes from years of preparation
-3. **Infrastructure:** Good training facilities are very important
-
-### For Data Analysis:
-1. **Choose Right Charts:** Bar charts are better than pie charts for rankings
-2. **Be Honest:** Don't manipulate scales to mislead people
-3. **Tell Stories:** Data should tell a clear story that everyone can understand
-
----
-
-## 🔮 Future Predictions
-
-Based on current trends:
-- **Asian Countries** will likely win more medals in future Olympics
-- **India** has potential to improve if we invest more in sports
-- **Medal Distribution** will become more spread across countries
-- **New Sports** will be added, giving more opportunities to different countries
-
----
+@track_cache(st.cache_resource(max_entries=64))
+def get_report_stats(version, day, country, season):
+    """Report statistics, computed once per dataset version, day, focus country and season"""
+    scope = None if season == ALL_SEASONS else f"{season} Olympics Only"
+    return compute_report_stats(get_bundle(version).partitions[season], focus_country=country, scope=scope,
+                                forecast=get_forecast(version, season))
 
-## 📝 Conclusion
+@track_cache(st.cache_resource(max_entries=64))
+def get_markdown_report(version, day, country, season):
+    """Markdown report text, generated once per dataset version, day, focus country and season"""
+    return render_markdown(get_report_stats(version, day, country, season))
 
-This analysis of Olympic data teaches us many things:
+@track_cache(st.cache_resource(max_entries=64))
+def get_markdown_bytes(version, day, country, season, compress):
+    """Encoded (optionally gzipped) Markdown report, memoized per variant"""
+    return report_bytes(get_markdown_report(version, day, country, season), compress)
 
-1. **Sports Success Needs Investment:** Countries that spend money on sports training get better results
-
-2. **Consistency Wins:** Countries like USA succeed because they consistently support their athletes
-
-3. **Data Tells Stories:** When we analyze data properly, we can understand patterns and make predictions
-
-4. **Visualization Matters:** How we show data is very important - it should be clear and honest
-
-5. **India's Opportunity:** Our country has potential to do much better in Olympics with proper planning
-
-### Final Thoughts:
-Olympics is not just about winning medals. It brings countries together and shows the power of human achievement. Through data analysis, we can understand these patterns and help our country perform better in future Olympics.
-
----
-
-**Report Prepared By:** Aryan Gupta (Roll No: 2415800019)  
-**Course:** Data Visualization and Storytelling  
-**Instructor:** Dr. Saurabh Tewari  
-**Tools Used:** Python, Streamlit, Plotly, Matplotlib, Seaborn
-
-*This report uses simple English to explain complex data patterns so everyone can understand the Olympic Games analysis.*
-"""
-    
-    return report_content
+@track_cache(st.cache_resource(max_entries=64))
+def get_html_bytes(version, day, country, season):
+    """Standalone HTML report, memoized per dataset version, day, focus country and season"""
+    return report_bytes(render_html(get_report_stats(version, day, country, season)))
 
 # Download button
+@track_cache(st.cache_resource)
+def get_report_queue():
+    """Process-wide background report builder shared by all sessions"""
+    return ReportQueue()
+
+@st.fragment(run_every=1)
+def poll_report_job(job_id):
+    """Show build progress, then rerun the page once the job has finished"""
+    job = get_report_queue().get(job_id)
+    if job.done:
+        st.rerun()
+    st.info(f"⏳ Building PDF report (job {job.job_id}): {job.status}, "
+            f"{job.pages} page(s) so far, {job.elapsed:.1f}s elapsed")
+
+def warmup_steps(version, day, season=ALL_SEASONS):
+    """(name, step) pairs computing what each section and the report show before anything is selected"""
+    agg = get_bundle(version).partitions[season]
+    backend = get_backend(version, BACKEND, season)
+    country = DEFAULT_COUNTRY if DEFAULT_COUNTRY in agg.country_rows else sorted(agg.country_rows)[0]
+
+    def overview():
+        charts.top_countries_bar(backend.country_totals(10))
+
+    def global_analysis():
+        charts.medal_trends_line(backend.yearly_medals().reset_index())
+        top_10_countries = backend.country_totals(10)
+        detailed = backend.country_medals(list(top_10_countries.index))
+        charts.medal_composition_bar(detailed)
+        charts.gold_efficiency_bar(detailed)
+        charts.participation_scatter(agg, top_10_countries.index)
+
+    def journey():
+        charts.country_timeline(country, agg.country_yearly(country))
+        charts.rank_trajectory_line(country, agg.edition_ranks.trajectory(country))
+        others = [c for c in COMPARE_DEFAULTS if c != country and c in agg.country_rows]
+        charts.comparison_line(backend.country_year([country] + others),
+                               f"Medal Performance: {country} vs {', '.join(others)}")
+
+    def misleading():
+        top_15_countries = backend.country_totals(15)
+        charts.medal_share_pie(top_15_countries)
+        charts.ranked_bar(top_15_countries)
+        get_truncated_axis_png(version, season)
+        charts.full_scale_bar(backend.yearly_medals(2000)[['total']].reset_index())
+
+    def forecasts():
+        forecast = get_forecast(version, season)
+        charts.forecast_bar(forecast)
+        focus = country if forecast.country(country) is not None else forecast.forecasts.index[0]
+        history = get_bundle(version).partitions[forecast.season or season].country_year[focus].fillna(0)
+        charts.forecast_line(focus, history, forecast, forecast.country(focus))
+
+    def storytelling():
+        charts.comparison_line(backend.country_year(list(backend.country_totals(8).index)),
+                               "The Evolution of Olympic Dominance (1896-Present)", height=600)
+        charts.efficiency_scatter(agg)
+        improvement = get_improvement(version, season, default_split_year(list(agg.yearly_medals.index[1:])),
+                                      0, 2.0, False)
+        if len(improvement.improvers):
+            charts.improvement_bar(backend.country_year(list(improvement.improvers.index[:5])))
+        explore = [c for c in EXPLORE_DEFAULTS if c in agg.country_totals.index]
+        if explore:
+            charts.comparison_area(backend.country_year(explore), explore)
+
+    def report():
+        report_args = (version, day, country, season)
+        get_markdown_bytes(*report_args, False)
+        get_html_bytes(*report_args)
+        # Queued under the same key as the download button, so the first click finds it built
+        queue = get_report_queue()
+        queue.wait(queue.submit(('pdf',) + report_args, render_pdf, get_report_stats(*report_args)))
+
+    return [("📈 Overview & Key Metrics", overview), ("🌍 Global Medal Analysis", global_analysis),
+            ("🗺️ Country Olympic Journey", journey), ("⚠️ Misleading vs Corrected Visualizations", misleading),
+            ("🔮 Medal Forecasts", forecasts), ("📖 Data Storytelling", storytelling), ("📄 Report", report)]
+
+@st.cache_resource
+def get_warmup(version):
+    """Background warm-up of every section's default view and the default report, once per process and dataset version"""
+    return WarmUp(warmup_steps(version, date.today().isoformat())).start()
+
+# The first run in a process (and after a new dataset version) starts filling the other sections' caches
+if WARMUP:
+    get_warmup(version)
+
+# The report focuses on the country picked in the journey section
+report_country = st.session_state.get('report_country', DEFAULT_COUNTRY)
+
 col1, col2, col3 = st.columns([1, 2, 1])
 with col2:
     if st.button("📥 Download Olympic Analysis Report", key="download_report"):
-        report_text = generate_report()
-        
-        # Create PDF download
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from io import BytesIO
-        import base64
-        
-        # Create PDF with enhanced styling
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch)
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle('CustomTitle', 
-                                   parent=styles['Heading1'], 
-                                   fontSize=20, 
-                                   spaceAfter=30, 
-                                   alignment=1,  # Center alignment
-                                   textColor='darkblue')
-        
-        heading_style = ParagraphStyle('CustomHeading', 
-                                     parent=styles['Heading2'], 
-                                     fontSize=14, 
-                                     spaceAfter=12, 
-                                     spaceBefore=12,
-                                     textColor='darkgreen')
-        
-        normal_style = ParagraphStyle('CustomNormal', 
-                                    parent=styles['Normal'], 
-                                    fontSize=11, 
-                                    spaceAfter=6,
-                                    leftIndent=0.2*inch)
-        
-        story = []
-        
-        # Title with Olympic theme
-        story.append(Paragraph("🏅 OLYMPIC GAMES DATA ANALYSIS REPORT 🏅", title_style))
-        story.append(Spacer(1, 20))
-        
-        # Student info box
-        from reportlab.lib.colors import lightblue, darkblue
-        info_style = ParagraphStyle('InfoStyle', 
-                                  parent=styles['Normal'], 
-                                  fontSize=12, 
-                                  spaceAfter=4,
-                                  leftIndent=0.5*inch,
-                                  textColor=darkblue)
-        
-        story.append(Paragraph("📚 <b>ASSIGNMENT DETAILS</b>", heading_style))
-        story.append(Paragraph("👤 <b>Student Name:</b> Aryan Gupta", info_style))
-        story.append(Paragraph("🎓 <b>Roll Number:</b> 2415800019", info_style))
-        story.append(Paragraph("📖 <b>Subject:</b> Data Visualization and Storytelling", info_style))
-        story.append(Paragraph("👨🏫 <b>Teacher:</b> Dr. Saurabh Tewari", info_style))
-        from datetime import datetime
-        story.append(Paragraph(f"📅 <b>Date:</b> {datetime.now().strftime('%B %d, %Y')}", info_style))
-        story.append(Spacer(1, 25))
-        
-        # Executive Summary with enhanced formatting
-        story.append(Paragraph("📊 EXECUTIVE SUMMARY", heading_style))
-        story.append(Paragraph("This report shows the analysis of Olympic Games medal data. We have studied how different countries perform in Olympics and what patterns we can see over the years.", normal_style))
-        
-        # Key numbers in a formatted box
-        key_numbers = f"""<b>🔢 KEY NUMBERS:</b><br/>
-        • Total Countries: <b>{df['country'].nunique()}</b> countries have participated<br/>
-        • Total Medals: <b>{df['total'].sum():,}</b> medals given in all Olympics<br/>
-        • Time Period: From <b>{df['year'].min()}</b> to <b>{df['year'].max()}</b><br/>
-        • Olympic Games: <b>{df['year'].nunique()}</b> different Olympic games"""
-        
-        story.append(Paragraph(key_numbers, normal_style))
-        story.append(Spacer(1, 15))
-        
-        # Top countries with better formatting
-        story.append(Paragraph("🏆 TOP PERFORMING COUNTRIES", heading_style))
-        story.append(Paragraph("These are the countries that won most medals in Olympics:", normal_style))
-        
-        top_10 = df.groupby('country')['total'].sum().sort_values(ascending=False).head(10)
-        countries_list = ""
-        for i, (country, medals) in enumerate(top_10.items(), 1):
-            if i <= 3:
-                medal_emoji = "🥇" if i == 1 else "🥈" if i == 2 else "🥉"
-            else:
-                medal_emoji = "🏅"
-            countries_list += f"{medal_emoji} <b>{i}. {country}</b> - {medals:,} medals<br/>"
-        
-        story.append(Paragraph(countries_list, normal_style))
-        story.append(Paragraph("<b>💡 What This Tells Us:</b> USA is the clear winner with most medals. Big countries like China, Germany, and Russia also perform very well. These countries invest a lot of money in sports training and have good facilities and coaches for athletes.", normal_style))
-        story.append(Spacer(1, 15))
-        
-        # India's performance with enhanced formatting
-        story.append(Paragraph("🇮🇳 INDIA'S OLYMPIC PERFORMANCE", heading_style))
-        india_data = df[df['country'] == 'India']
-        if len(india_data) > 0:
-            india_total = india_data['total'].sum()
-            india_gold = india_data['gold'].sum()
-            india_games = len(india_data)
-            
-            india_stats = f"""<b>🏅 INDIA'S NUMBERS:</b><br/>
-            • Total Medals: <b>{india_total}</b> medals<br/>
-            • Gold Medals: <b>{india_gold}</b> gold medals<br/>
-            • Games Played: <b>{india_games}</b> Olympic games<br/>
-            • Average per Game: <b>{india_total/india_games:.1f}</b> medals per Olympics"""
-            
-            story.append(Paragraph(india_stats, normal_style))
-            story.append(Paragraph("<b>🇮🇳 India's Story:</b> India has been participating in Olympics for many years. Our performance is slowly getting better. We need more investment in sports to compete with top countries. Recent Olympics show improvement in India's medal count.", normal_style))
-        else:
-            story.append(Paragraph("No data available for India in this dataset.", normal_style))
-        story.append(Spacer(1, 15))
-        
-        # Trends with better formatting
-        story.append(Paragraph("📈 IMPORTANT TRENDS WE FOUND", heading_style))
-        
-        trends_text = """<b>1. 📊 Medal Distribution Over Time:</b><br/>
-        Number of medals given has increased over years. This is because more sports and events are added to Olympics. More countries participate now than before.<br/><br/>
-        
-        <b>2. 🌍 Country Performance Patterns:</b><br/>
-        • <b>Consistent Winners:</b> USA, Germany, and Great Britain always perform well<br/>
-        • <b>Rising Powers:</b> China has improved a lot in recent Olympics<br/>
-        • <b>Political Impact:</b> When Soviet Union broke up, it affected their medal count<br/><br/>
-        
-        <b>3. 🏅 Medal Types:</b><br/>
-        Gold, Silver, and Bronze medals are almost equally distributed. This shows fair competition in Olympics."""
-        
-        story.append(Paragraph(trends_text, normal_style))
-        story.append(Spacer(1, 15))
-        
-        # Visualization mistakes with enhanced formatting
-        story.append(Paragraph("⚠️ COMMON MISTAKES IN DATA VISUALIZATION", heading_style))
-        
-        mistakes_text = """We also learned about wrong ways to show data:<br/><br/>
-        
-        <b>🥧 Pie Charts Problems:</b><br/>
-        • <b>❌ Bad:</b> Using pie charts with too many countries<br/>
-        • <b>🚫 Why Bad:</b> Hard to compare small slices<br/>
-        • <b>✅ Better:</b> Use bar charts to show rankings clearly<br/><br/>
-        
-        <b>📊 Y-Axis Tricks:</b><br/>
-        • <b>❌ Bad:</b> Starting Y-axis from middle instead of zero<br/>
-        • <b>🚫 Why Bad:</b> Makes small differences look very big<br/>
-        • <b>✅ Better:</b> Always start from zero to show true picture"""
-        
-        story.append(Paragraph(mistakes_text, normal_style))
-        story.append(Spacer(1, 15))
-        
-        # Key learnings with enhanced formatting
-        story.append(Paragraph("🎯 KEY LEARNINGS", heading_style))
-        
-        learnings_text = """<b>🏆 For Countries:</b><br/>
-        • <b>💰 Investment Matters:</b> Countries that spend more on sports get more medals<br/>
-        • <b>📅 Long-term Planning:</b> Success comes from years of preparation<br/>
-        • <b>🏟️ Infrastructure:</b> Good training facilities are very important<br/><br/>
-        
-        <b>📊 For Data Analysis:</b><br/>
-        • <b>📈 Choose Right Charts:</b> Bar charts are better than pie charts for rankings<br/>
-        • <b>💯 Be Honest:</b> Don't manipulate scales to mislead people<br/>
-        • <b>📖 Tell Stories:</b> Data should tell a clear story that everyone can understand"""
-        
-        story.append(Paragraph(learnings_text, normal_style))
-        story.append(Spacer(1, 15))
-        
-        # Future predictions
-        story.append(Paragraph("🔮 FUTURE PREDICTIONS", heading_style))
-        
-        predictions_text = """Based on current trends:<br/>
-        • <b>🌏 Asian Countries</b> will likely win more medals in future Olympics<br/>
-        • <b>🇮🇳 India</b> has potential to improve if we invest more in sports<br/>
-        • <b>🌍 Medal Distribution</b> will become more spread across countries<br/>
-        • <b>🆕 New Sports</b> will be added, giving more opportunities to different countries"""
-        
-        story.append(Paragraph(predictions_text, normal_style))
-        story.append(Spacer(1, 15))
-        
-        # Conclusion
-        story.append(Paragraph("📝 CONCLUSION", heading_style))
-        
-        conclusion_text = """This analysis of Olympic data teaches us many things:<br/><br/>
-        
-        <b>1. 💰 Sports Success Needs Investment:</b> Countries that spend money on sports training get better results<br/><br/>
-        
-        <b>2. 🏆 Consistency Wins:</b> Countries like USA succeed because they consistently support their athletes<br/><br/>
-        
-        <b>3. 📊 Data Tells Stories:</b> When we analyze data properly, we can understand patterns and make predictions<br/><br/>
-        
-        <b>4. 📈 Visualization Matters:</b> How we show data is very important - it should be clear and honest<br/><br/>
-        
-        <b>5. 🇮🇳 India's Opportunity:</b> Our country has potential to do much better in Olympics with proper planning<br/><br/>
-        
-        <b>💭 Final Thoughts:</b> Olympics is not just about winning medals. It brings countries together and shows the power of human achievement. Through data analysis, we can understand these patterns and help our country perform better in future Olympics."""
-        
-        story.append(Paragraph(conclusion_text, normal_style))
-        story.append(Spacer(1, 20))
-        
-        # Footer with enhanced styling
-        footer_style = ParagraphStyle('FooterStyle', 
-                                    parent=styles['Normal'], 
-                                    fontSize=10, 
-                                    spaceAfter=4,
-                                    textColor='darkblue')
-        
-        story.append(Paragraph("📋 <b>REPORT DETAILS</b>", heading_style))
-        story.append(Paragraph("👤 <b>Report Prepared By:</b> Aryan Gupta (Roll No: 2415800019)", footer_style))
-        story.append(Paragraph("📚 <b>Course:</b> Data Visualization and Storytelling", footer_style))
-        story.append(Paragraph("👨🏫 <b>Instructor:</b> Dr. Saurabh Tewari", footer_style))
-        story.append(Paragraph("🛠️ <b>Tools Used:</b> Python, Streamlit, Plotly, Matplotlib, Seaborn", footer_style))
-        story.append(Spacer(1, 12))
-        
-        italic_style = ParagraphStyle('ItalicStyle', 
-                                    parent=styles['Italic'], 
-                                    fontSize=9, 
-                                    textColor='gray')
-        story.append(Paragraph("<i>💡 This report uses simple English to explain complex data patterns so everyone can understand the Olympic Games analysis.</i>", italic_style))
-
-        
-        doc.build(story)
-        buffer.seek(0)
-        
-        # Create download link
-        b64 = base64.b64encode(buffer.read()).decode()
-        href = f'<a href="data:application/pdf;base64,{b64}" download="Olympic_Analysis_Report_Aryan_Gupta.pdf">📄 Click Here to Download PDF Report</a>'
-        st.markdown(href, unsafe_allow_html=True)
-        st.success("✅ PDF Report generated successfully! Click the link above to download.")
+        # Report builds are keyed by dataset version, report date, focus country and season
+        report_args = (version, date.today().isoformat(), report_country, season)
+        stats = get_report_stats(*report_args)
+        st.session_state['report_job'] = get_report_queue().submit(('pdf',) + report_args, render_pdf, stats)
+    
+    job_id = st.session_state.get('report_job')
+    job = get_report_queue().get(job_id) if job_id else None
+    if job is not None and not job.done:
+        poll_report_job(job_id)
+    elif job is not None and job.status == 'failed':
+        st.error(f"❌ PDF report generation failed: {job.error}")
+    elif job is not None:
+        if st.session_state.get('report_job_timed') != job.job_id:
+            # Record the background build once, on the rerun that first sees it finished
+            st.session_state['report_job_timed'] = job.job_id
+            record_span('report.pdf', job.elapsed)
+        
+        # Serve the other formats for the same version, date, country and season as the PDF
+        report_args = job.key[1:]
+        report_text = get_markdown_report(*report_args)
+        
+        download_button("📄 Download PDF Report", job.result, 'report.pdf',
+                        file_name="Olympic_Analysis_Report_Aryan_Gupta.pdf",
+                        mime="application/pdf", key="download_pdf")
+        
+        compress = st.checkbox("🗜️ Gzip the Markdown report", key="gzip_markdown")
+        markdown_data = get_markdown_bytes(*report_args, compress)
+        download_button("📝 Download Markdown Report", markdown_data, 'report.md' + (".gz" if compress else ""),
+                        file_name="Olympic_Analysis_Report_Aryan_Gupta.md" + (".gz" if compress else ""),
+                        mime="application/gzip" if compress else "text/markdown",
+                        key="download_markdown")
+        html_data = get_html_bytes(*report_args)
+        download_button("🌐 Download HTML Report", html_data, 'report.html',
+                        file_name="Olympic_Analysis_Report_Aryan_Gupta.html",
+                        mime="text/html", key="download_html")
+        
+        # The bytes are served as media files, only their URLs are sent with each rerun
+        st.caption(f"📦 PDF: {format_size(len(job.result))} · Markdown: {format_size(len(markdown_data))} · "
+                   f"HTML: {format_size(len(html_data))}")
+        st.success("✅ PDF Report generated successfully! Use the buttons above to download.")
         
         # Show preview
         with st.expander("📖 Preview Report Content"):
@@ -957,4 +806,10 @@ st.markdown("""
     <p>📊 Created with ❤️ using Streamlit, Matplotlib, Seaborn & Plotly</p>
     <p>🏅 Olympic Data Visualization Project | Data Storytelling Assignment</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+set_section(None)
+st.sidebar.checkbox("🛠️ Show performance panel", key="debug_panel")
+trace = finish_rerun()
+if show_debug_panel and trace is not None:
+    debug_panel(trace)
@@ -0,0 +1,235 @@
+"""Headless batch report generator.
+
+Examples:
+    python batch_reports.py country --top 20 --out reports/
+    python batch_reports.py edition --formats pdf md --out reports/
+    python batch_reports.py recipients recipients.json --workers 8 --out reports/
+    python batch_reports.py country --season Winter --top 10
+
+The shared options (--out, --formats, --workers, --data, --season) follow the
+report kind. Reports whose names make the same file name get a -2, -3, ... suffix.
+
+A recipients file is a JSON list of objects with a "name" plus an optional
+"country" to focus on, "edition_id" or "season" to restrict the data to, and "formats".
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from aggregates import ALL_SEASONS, SEASONS, build_aggregates, build_partitions
+from data_loader import DATA_FILE, dataset_version, load_tally
+from forecasts import next_games_forecast
+from report_generator import compute_report_stats, render_html, render_markdown, render_pdf
+
+FORMATS = {
+    'pdf': render_pdf,
+    'md': lambda stats: render_markdown(stats).encode('utf-8'),
+    'html': lambda stats: render_html(stats).encode('utf-8'),
+}
+
+# Per-worker dataset, loaded once by _init_worker
+_worker = {}
+
+
+def _init_worker(csv_path):
+    df = load_tally(csv_path)
+    _worker['df'] = df
+    _worker['partitions'] = build_partitions(df)
+    _worker['editions'] = {}
+    _worker['forecasts'] = {}
+
+
+def _edition_aggregates(edition_id):
+    editions = _worker['editions']
+    if edition_id not in editions:
+        df = _worker['df']
+        editions[edition_id] = build_aggregates(df[df['edition_id'] == edition_id])
+    return editions[edition_id]
+
+
+def _forecast(season):
+    forecasts = _worker['forecasts']
+    if season not in forecasts:
+        forecasts[season] = next_games_forecast(_worker['partitions'], season)
+    return forecasts[season]
+
+
+def slugify(text):
+    """File-name friendly version of text"""
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(text)).strip('_') or 'report'
+
+
+def build_report(task):
+    """Render one report task in a worker and write its files"""
+    start = time.perf_counter()
+    season = task.get('season', ALL_SEASONS)
+    scope = task.get('scope')
+    # Names and NOC codes are accepted, as everywhere else in the aggregates layer
+    country = _worker['partitions'][ALL_SEASONS].resolve_country(task['country'])
+    if country is None:
+        raise ValueError(f"Unknown country {task['country']!r} for {task['name']}")
+    forecast = None
+    if task.get('edition_id') is not None:
+        aggregates = _edition_aggregates(task['edition_id'])
+    else:
+        aggregates = _worker['partitions'][season]
+        forecast = _forecast(season)
+        if season != ALL_SEASONS:
+            scope = f"{scope} ({season} Olympics Only)"
+    stats = compute_report_stats(aggregates, date=task['date'], focus_country=country, scope=scope,
+                                 forecast=forecast)
+
+    files = []
+    for fmt in task['formats']:
+        data = FORMATS[fmt](stats)
+        path = os.path.join(task['out_dir'], f"{task['slug']}.{fmt}")
+        with open(path, 'wb') as f:
+            f.write(data)
+        files.append({'format': fmt, 'path': os.path.basename(path), 'bytes': len(data),
+                      'sha256': hashlib.sha256(data).hexdigest()})
+
+    return {'name': task['name'], 'kind': task['kind'], 'country': country,
+            'edition_id': task.get('edition_id'), 'season': season, 'files': files,
+            'seconds': round(time.perf_counter() - start, 4), 'pid': os.getpid()}
+
+
+def country_tasks(df, countries=None, top=None):
+    totals = build_aggregates(df).country_totals
+    if countries:
+        names = countries
+    elif top:
+        names = list(totals.index[:top])
+    else:
+        names = sorted(totals.index)
+    return [{'kind': 'country', 'name': c, 'country': c, 'scope': f"{c} Country Report",
+             'slug': slugify(c)} for c in names]
+
+
+def edition_tasks(df, editions=None, country='India'):
+    table = df[['edition_id', 'edition']].drop_duplicates('edition_id').sort_values('edition_id')
+    if editions:
+        table = table[table['edition_id'].isin(editions)]
+    return [{'kind': 'edition', 'name': str(name), 'country': country, 'edition_id': int(eid),
+             'scope': str(name), 'slug': f"{int(eid):03d}_{slugify(name)}"}
+            for eid, name in table.itertuples(index=False)]
+
+
+def recipient_tasks(path):
+    with open(path) as f:
+        recipients = json.load(f)
+    tasks = []
+    for r in recipients:
+        task = {'kind': 'recipient', 'name': r['name'], 'country': r.get('country', 'India'),
+                'scope': f"Prepared for {r['name']}", 'slug': slugify(r['name'])}
+        if r.get('edition_id') is not None:
+            task['edition_id'] = int(r['edition_id'])
+        if r.get('season'):
+            task['season'] = r['season']
+        if r.get('formats'):
+            task['formats'] = r['formats']
+        tasks.append(task)
+    return tasks
+
+
+def unique_slugs(tasks):
+    """Give tasks whose slugs collide (ignoring case) a -2, -3, ... suffix, in task order"""
+    taken = set()
+    for task in tasks:
+        slug, n = task['slug'], 1
+        while slug.lower() in taken:
+            n += 1
+            slug = f"{task['slug']}-{n}"
+        taken.add(slug.lower())
+        task['slug'] = slug
+    return tasks
+
+
+def run_batch(tasks, out_dir, formats=('pdf',), workers=None, csv_path=DATA_FILE, date=None, season=ALL_SEASONS):
+    """Build all tasks across a process pool and write out_dir/manifest.json"""
+    os.makedirs(out_dir, exist_ok=True)
+    date = date or datetime.now().strftime('%B %d, %Y')
+    # Two reports must never write the same file, or the manifest's checksums would not match the disk
+    unique_slugs(tasks)
+    for task in tasks:
+        task.setdefault('formats', list(formats))
+        task.setdefault('season', season)
+        task.update(out_dir=out_dir, date=date)
+        unknown = set(task['formats']) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown report format(s) for {task['name']}: {', '.join(sorted(unknown))}")
+
+    start = time.perf_counter()
+    results, failures = [], []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(csv_path,)) as pool:
+        futures = {pool.submit(build_report, task): task for task in tasks}
+        for future in as_completed(futures):
+            task = futures[future]
+            try:
+                results.append(future.result())
+            except Exception as e:
+                failures.append({'name': task['name'], 'kind': task['kind'], 'error': repr(e)})
+
+    results.sort(key=lambda r: r['name'])
+    manifest = {
+        'dataset_version': dataset_version(csv_path),
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'report_date': date,
+        'seconds': round(time.perf_counter() - start, 3),
+        'reports': results,
+        'failures': failures,
+    }
+    with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+
+def main(argv=None):
+    # Options shared by every report kind, accepted after the kind's name
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--out', default='reports', help="output directory (default: reports)")
+    common.add_argument('--formats', nargs='+', default=['pdf'], choices=sorted(FORMATS))
+    common.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    common.add_argument('--data', default=DATA_FILE, help="tally CSV to report on")
+    common.add_argument('--season', default=ALL_SEASONS, choices=[ALL_SEASONS] + SEASONS,
+                        help="only report on the Summer or Winter Games (default: All)")
+
+    parser = argparse.ArgumentParser(description="Generate Olympic analysis reports in bulk")
+    sub = parser.add_subparsers(dest='mode', required=True)
+
+    by_country = sub.add_parser('country', parents=[common], help="one report per country")
+    by_country.add_argument('--countries', nargs='+', help="countries to include (default: all)")
+    by_country.add_argument('--top', type=int, help="only the top N countries by total medals")
+
+    by_edition = sub.add_parser('edition', parents=[common], help="one report per Olympic edition")
+    by_edition.add_argument('--editions', nargs='+', type=int, help="edition ids to include (default: all)")
+    by_edition.add_argument('--country', default='India', help="country to focus on in each report")
+
+    by_recipient = sub.add_parser('recipients', parents=[common], help="one report per configured recipient")
+    by_recipient.add_argument('file', help="JSON list of recipients")
+
+    args = parser.parse_args(argv)
+    df = load_tally(args.data)
+    if args.season != ALL_SEASONS:
+        df = df[df['season'] == args.season]
+    if args.mode == 'country':
+        tasks = country_tasks(df, args.countries, args.top)
+    elif args.mode == 'edition':
+        tasks = edition_tasks(df, args.editions, args.country)
+    else:
+        tasks = recipient_tasks(args.file)
+
+    manifest = run_batch(tasks, args.out, args.formats, args.workers, args.data, season=args.season)
+    print(f"Wrote {len(manifest['reports'])} report(s) to {args.out} in {manifest['seconds']}s")
+    for failure in manifest['failures']:
+        print(f"Failed: {failure['name']}: {failure['error']}", file=sys.stderr)
+    return 1 if manifest['failures'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""Benchmark data loading, dashboard sections and report generation on synthetic tallies.
+
+Examples:
+    python benchmark.py --out bench.json
+    python benchmark.py --scales 1 100 --repeat 5 --backend sqlite --out bench_sqlite.json
+
+Each scale runs in its own process (so running out of memory at a large scale
+is recorded instead of ending the run) and the results are written as JSON for
+comparing commits.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import charts
+from aggregates import build_aggregates, build_partitions
+from data_loader import DATA_FILE, dataset_version, load_tally, read_tally_csv
+from query_backend import PandasBackend, SQLiteBackend, build_sqlite
+from report_generator import COUNTRY_FLAGS, compute_report_stats, generate_olympic_report, render_pdf
+from trends import improvement_scores
+from forecasts import forecast_medals
+
+SCALES = [1, 100, 10_000]
+# Olympic years repeat every cycle, shifted past the real 1896-2022 span
+CYCLE_YEARS = 128
+
+
+def synthetic_tally(df, scale, seed=0):
+    """A tally with about scale x the rows of df and the same per-country and per-year shape
+
+    The rows are repeated as extra countries (a "Kenya 2" next to Kenya) and extra
+    Olympic cycles (the whole history again, CYCLE_YEARS later), about sqrt(scale)
+    of each, with Poisson noise on the medal counts. The original countries and
+    years come first, so real names like "India" still resolve.
+    """
+    n_countries = max(1, int(round(scale ** 0.5)))
+    n_cycles = -(-scale // n_countries)
+    n = len(df)
+    rng = np.random.default_rng(seed)
+
+    row = np.tile(np.arange(n), n_countries * n_cycles)
+    clone = np.tile(np.repeat(np.arange(n_countries), n), n_cycles)
+    cycle = np.repeat(np.arange(n_cycles), n * n_countries)
+
+    columns = {}
+    for column, copy, copies, label in [('edition', cycle, n_cycles, "{} #{}"),
+                                        ('country', clone, n_countries, "{} {}"),
+                                        ('country_noc', clone, n_countries, "{}{}")]:
+        values = df[column].astype('category')
+        categories = list(values.cat.categories)
+        names = categories + [label.format(name, k + 1) for k in range(1, copies) for name in categories]
+        codes = values.cat.codes.to_numpy()[row] + copy * len(categories)
+        columns[column] = pd.Categorical.from_codes(codes, categories=names)
+
+    medals = {m: rng.poisson(df[m].to_numpy()[row]) for m in ['gold', 'silver', 'bronze']}
+    # Every tally row has at least one medal
+    medals['bronze'] = np.where(medals['gold'] + medals['silver'] + medals['bronze'] == 0, 1, medals['bronze'])
+
+    tally = pd.DataFrame({
+        'edition': columns['edition'],
+        'edition_id': df['edition_id'].to_numpy()[row] + cycle * (int(df['edition_id'].max()) + 1),
+        'year': df['year'].to_numpy()[row] + cycle * CYCLE_YEARS,
+        'country': columns['country'],
+        'country_noc': columns['country_noc'],
+        'gold': medals['gold'],
+        'silver': medals['silver'],
+        'bronze': medals['bronze'],
+    })
+    tally['total'] = tally['gold'] + tally['silver'] + tally['bronze']
+    return tally
+
+
+def timed(fn, repeat=1):
+    """Run fn repeat times; its last result plus min/median wall time in seconds"""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - start)
+    return result, {'min': round(min(runs), 6), 'median': round(statistics.median(runs), 6), 'runs': len(runs)}
+
+
+# Each dashboard section as (compute, figures): compute runs the section's queries,
+# figures builds its charts from what compute returned, as the app does on a rerun
+def _overview(backend, aggregates):
+    return {'top': backend.country_totals(10), 'stats': aggregates.medal_stats}
+
+
+def _overview_figures(data, aggregates):
+    return [charts.top_countries_bar(data['top'])]
+
+
+def _global(backend, aggregates):
+    top = backend.country_totals(10)
+    return {'yearly': backend.yearly_medals().reset_index(), 'top': top,
+            'detailed': backend.country_medals(list(top.index))}
+
+
+def _global_figures(data, aggregates):
+    return [charts.medal_trends_line(data['yearly']), charts.medal_composition_bar(data['detailed']),
+            charts.gold_efficiency_bar(data['detailed']), charts.participation_scatter(aggregates, data['top'].index)]
+
+
+def _journey(backend, aggregates, country='India'):
+    return {'country': country, 'yearly': aggregates.country_yearly(country),
+            'ranks': aggregates.edition_ranks.trajectory(country),
+            'comparison': backend.country_year([country, 'Japan'])}
+
+
+def _journey_figures(data, aggregates):
+    return [charts.country_timeline(data['country'], data['yearly']),
+            charts.rank_trajectory_line(data['country'], data['ranks']),
+            charts.comparison_line(data['comparison'], f"Medal Performance: {data['country']} vs Japan")]
+
+
+def _misleading(backend, aggregates):
+    return {'top': backend.country_totals(15), 'recent': backend.yearly_medals(2000)[['total']].reset_index()}
+
+
+def _misleading_figures(data, aggregates):
+    return [charts.medal_share_pie(data['top']), charts.ranked_bar(data['top']),
+            charts.figure_png(charts.truncated_axis_bar(data['recent'])), charts.full_scale_bar(data['recent'])]
+
+
+def _storytelling(backend, aggregates):
+    improvers = list(improvement_scores(aggregates).improvers.index[:5])
+    selected = [c for c in ['United States', 'China', 'Germany', 'India'] if c in aggregates.country_rows]
+    return {'story': backend.country_year(list(backend.country_totals(8).index)),
+            'improvement': backend.country_year(improvers), 'selected': selected,
+            'comparison': backend.country_year(selected)}
+
+
+def _storytelling_figures(data, aggregates):
+    figures = [charts.comparison_line(data['story'], "The Evolution of Olympic Dominance (1896-Present)", height=600),
+               charts.efficiency_scatter(aggregates)]
+    if len(data['improvement']):
+        figures.append(charts.improvement_bar(data['improvement']))
+    return figures + [charts.comparison_area(data['comparison'], data['selected'])]
+
+
+def _forecasts(backend, aggregates):
+    forecast = forecast_medals(aggregates)
+    country = 'India' if forecast.country('India') is not None else forecast.forecasts.index[0]
+    return {'forecast': forecast, 'country': country, 'history': aggregates.country_year[country].fillna(0)}
+
+
+def _forecasts_figures(data, aggregates):
+    forecast = data['forecast']
+    return [charts.forecast_bar(forecast),
+            charts.forecast_line(data['country'], data['history'], forecast, forecast.country(data['country']))]
+
+
+SECTIONS = {
+    'overview': (_overview, _overview_figures),
+    'global': (_global, _global_figures),
+    'journey': (_journey, _journey_figures),
+    'misleading': (_misleading, _misleading_figures),
+    'storytelling': (_storytelling, _storytelling_figures),
+    'forecasts': (_forecasts, _forecasts_figures),
+}
+
+
+def run_scale(base, scale, repeat=3, backend='pandas', work_dir=None):
+    """Time every stage at one scale; a failing stage is recorded and the ones needing it skipped"""
+    work_dir = work_dir or tempfile.mkdtemp(prefix='olympics-bench-')
+    cache_dir = os.path.join(work_dir, 'cache')
+    result = {'scale': scale, 'timings': {}, 'figure_bytes': {}, 'errors': {}}
+    timings = result['timings']
+
+    def stage(name, fn, times=repeat):
+        try:
+            value, timings[name] = timed(fn, times)
+            return value
+        except Exception as e:
+            result['errors'][name] = repr(e)
+            return None
+
+    tally = stage('synthesize', lambda: synthetic_tally(base, scale), 1)
+    if tally is None:
+        return result
+    csv_path = os.path.join(work_dir, f'tally_{scale}x.csv')
+    stage('write_csv', lambda t=tally: t.to_csv(csv_path, index=False), 1)
+    result.update(rows=len(tally), countries=int(tally['country'].nunique()), years=int(tally['year'].nunique()),
+                  csv_bytes=os.path.getsize(csv_path))
+    del tally
+
+    stage('load_csv', lambda: read_tally_csv(csv_path))
+    # Cold: parse the CSV and write the Parquet cache; warm: read the cache back
+    df = stage('load_cold', lambda: load_tally(csv_path, cache_dir), 1)
+    df = stage('load_warm', lambda: load_tally(csv_path, cache_dir)) if df is not None else None
+    if df is None:
+        return result
+    aggregates = stage('aggregates', lambda: build_aggregates(df))
+    if aggregates is None:
+        return result
+    stage('partitions', lambda: build_partitions(df))
+
+    if backend == 'sqlite':
+        version = dataset_version(csv_path, cache_dir)
+        db_path = stage('sqlite_build', lambda: build_sqlite(df, version, csv_path, cache_dir), 1)
+        queries = SQLiteBackend(db_path)
+    else:
+        queries = PandasBackend(aggregates)
+
+    for name, (compute, figures) in SECTIONS.items():
+        data = stage(f'section.{name}.compute', lambda: compute(queries, aggregates))
+        if data is not None:
+            figs = stage(f'section.{name}.figures', lambda: figures(data, aggregates))
+            if figs is not None:
+                result['figure_bytes'][name] = [len(f) if isinstance(f, bytes) else charts.figure_bytes(f) for f in figs]
+
+    markdown = stage('report.markdown', lambda: generate_olympic_report(df, COUNTRY_FLAGS, aggregates))
+    pdf = stage('report.pdf', lambda: render_pdf(compute_report_stats(aggregates, COUNTRY_FLAGS)), max(1, repeat // 3))
+    result['report_bytes'] = {'markdown': len(markdown.encode('utf-8')) if markdown else None,
+                              'pdf': len(pdf) if pdf else None}
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Olympics dashboard on synthetic data")
+    parser.add_argument('--scales', nargs='+', type=int, default=SCALES, help="multiples of the bundled tally")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per stage (min and median are kept)")
+    parser.add_argument('--backend', choices=['pandas', 'sqlite'], default='pandas')
+    parser.add_argument('--data', default=DATA_FILE, help="tally CSV the synthetic data is modelled on")
+    parser.add_argument('--out', default='bench.json', help="JSON results file")
+    parser.add_argument('--single', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single:
+        # Child process: one scale, result as JSON on stdout
+        base = pd.read_csv(args.data)
+        with tempfile.TemporaryDirectory(prefix='olympics-bench-') as work_dir:
+            result = run_scale(base, args.scales[0], args.repeat, args.backend, work_dir)
+        json.dump(result, sys.stdout)
+        return 0
+
+    results = []
+    for scale in args.scales:
+        print(f"Benchmarking {scale}x ...", file=sys.stderr)
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--single', '--scales', str(scale),
+                               '--repeat', str(args.repeat), '--backend', args.backend, '--data', args.data],
+                              capture_output=True, text=True)
+        if proc.returncode == 0:
+            results.append(json.loads(proc.stdout))
+        else:
+            results.append({'scale': scale, 'errors': {'process': f"exit code {proc.returncode}",
+                                                       'stderr': proc.stderr[-2000:]}})
+
+    report = {
+        'commit': _git_commit(),
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'backend': args.backend,
+        'repeat': args.repeat,
+        'scales': results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for r in results:
+        timings = r.get('timings', {})
+        summary = ', '.join(f"{name} {t['median'] * 1000:.1f}ms" for name, t in timings.items())
+        print(f"{r['scale']}x ({r.get('rows', '?')} rows): {summary}")
+        for name, error in r.get('errors', {}).items():
+            print(f"  {name} failed: {error[:200]}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
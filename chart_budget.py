@@ -0,0 +1,76 @@
+"""Check that lean_figure() keeps large figures within the point budget.
+
+Examples:
+    python chart_budget.py
+    python chart_budget.py --points 50000 --budget 2000
+
+Builds figures with many points the way the chart builders do (Plotly Express,
+which switches traces of over 1000 points to scattergl, and hand-built
+graph_objects traces), passes each through lean_figure() and counts the points
+left. Exits with status 1 if any figure still has more points than the budget.
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from charts import MIN_TRACE_POINTS, POINT_BUDGET, lean_figure
+
+
+def sample_figures(n_points, seed=0):
+    """(name, figure) pairs with about n_points points each"""
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    rng = np.random.default_rng(seed)
+    x = np.arange(n_points)
+    y = np.cumsum(rng.normal(size=n_points))
+    half = n_points // 2
+    two = pd.DataFrame({'x': np.r_[x[:half], x[:half]], 'y': np.r_[y[:half], y[half:2 * half]],
+                        'series': ['a'] * half + ['b'] * half})
+    return [
+        ('px.scatter', px.scatter(x=x, y=y)),
+        ('px.scatter bubbles', px.scatter(x=x, y=y, size=rng.random(n_points))),
+        ('px.line', px.line(x=x, y=y)),
+        ('px.line by series', px.line(two, x='x', y='y', color='series')),
+        ('px.area stacked', px.area(two, x='x', y='y', color='series')),
+        ('go.Scatter', go.Figure(go.Scatter(x=x, y=y, mode='lines+markers'))),
+    ]
+
+
+def point_count(fig):
+    """Scatter/line points a figure sends to the browser"""
+    return sum(len(t.x) for t in fig.data if t.type in ('scatter', 'scattergl') and t.x is not None)
+
+
+def check(n_points, budget):
+    """(name, trace types, points before, points after, allowed) for each sample figure"""
+    results = []
+    for name, fig in sample_figures(n_points):
+        before = point_count(fig)
+        # Each trace keeps at least MIN_TRACE_POINTS, however many share the budget
+        allowed = max(budget, MIN_TRACE_POINTS * len(fig.data))
+        lean_figure(fig, point_budget=budget)
+        results.append((name, '/'.join(sorted({t.type for t in fig.data})), before, point_count(fig), allowed))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that lean_figure() keeps large figures within the point budget")
+    parser.add_argument('--points', type=int, default=10000, help="points per sample figure (default: 10000)")
+    parser.add_argument('--budget', type=int, default=POINT_BUDGET,
+                        help=f"point budget to check against (default: OLYMPICS_POINT_BUDGET, {POINT_BUDGET})")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name, types, before, after, allowed in check(args.points, args.budget):
+        over = after > allowed
+        failed |= over
+        print(f"  {name:<20} {types:<18} {before:>8} -> {after:>6} points{'  OVER BUDGET' if over else ''}")
+    print("FAIL" if failed else "OK")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
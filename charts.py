@@ -0,0 +1,373 @@
+"""Figure builders for the dashboard sections, kept free of Streamlit so they can be benchmarked.
+
+Every Plotly builder passes its figure through lean_figure(), which keeps the
+JSON sent to the browser small however many rows or countries are plotted.
+"""
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Figures with more scatter points than this are drawn with WebGL instead of SVG
+WEBGL_THRESHOLD = int(os.environ.get("OLYMPICS_WEBGL_THRESHOLD", 2000))
+# Most scatter/line points one figure sends to the browser; longer series are decimated
+POINT_BUDGET = int(os.environ.get("OLYMPICS_POINT_BUDGET", 5000))
+# Fewest points a trace is decimated down to, however many traces share the budget
+MIN_TRACE_POINTS = 50
+
+# Point trace types; Plotly Express itself draws traces of over 1000 points as scattergl
+SCATTER_TYPES = ('scatter', 'scattergl')
+# Per-point attributes that have to be decimated together with x and y
+POINT_ATTRIBUTES = ['x', 'y', 'text', 'hovertext', 'customdata', 'marker.size', 'marker.color', 'marker.symbol']
+
+
+def _point_count(trace):
+    return len(trace.x) if trace.x is not None else 0
+
+
+def _stacked(trace):
+    # Only SVG scatter traces can be stacked; scattergl has no stackgroup
+    return trace.type == 'scatter' and bool(trace.stackgroup)
+
+
+def _take(trace, keep):
+    """Keep only the given point indices of every per-point attribute"""
+    n = _point_count(trace)
+    for path in POINT_ATTRIBUTES:
+        value = trace[path]
+        if value is not None and not isinstance(value, str) and np.ndim(value) == 1 and len(value) == n:
+            trace[path] = np.asarray(value)[keep]
+
+
+def _min_max_indices(y, budget):
+    """Indices of the first, last, lowest and highest point of each bucket, so peaks survive; at most budget of them"""
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(0, len(y), max((budget - 2) // 2, 1) + 1).astype(int)
+    keep = [0, len(y) - 1]
+    for start, stop in zip(edges[:-1], edges[1:]):
+        if stop > start:
+            keep += [start + int(np.nanargmin(y[start:stop])), start + int(np.nanargmax(y[start:stop]))]
+    return np.unique(keep)
+
+
+def _decimate(fig, budget):
+    traces = [t for t in fig.data if t.type in SCATTER_TYPES and _point_count(t) > 0]
+    if sum(_point_count(t) for t in traces) <= budget:
+        return
+    per_trace = max(budget // len(traces), MIN_TRACE_POINTS)
+
+    # Stacked areas are summed by x, so all their traces keep the same x values
+    stacked = [t for t in traces if _stacked(t)]
+    xs = np.unique(np.concatenate([np.asarray(t.x) for t in stacked])) if stacked else []
+    if len(xs) > per_trace:
+        kept_x = xs[np.unique(np.linspace(0, len(xs) - 1, per_trace).astype(int))]
+        for trace in stacked:
+            _take(trace, np.flatnonzero(np.isin(np.asarray(trace.x), kept_x)))
+
+    for trace in traces:
+        n = _point_count(trace)
+        if _stacked(trace) or n <= per_trace:
+            continue
+        if 'lines' in (trace.mode or 'lines'):
+            keep = _min_max_indices(trace.y, per_trace)
+        elif isinstance(trace.marker.size, (tuple, list, np.ndarray)):
+            # Bubble charts: keep the biggest bubbles
+            keep = np.sort(np.argsort(-np.asarray(trace.marker.size, dtype=float))[:per_trace])
+        else:
+            keep = np.unique(np.linspace(0, n - 1, per_trace).astype(int))
+        _take(trace, keep)
+
+
+def _to_webgl(fig):
+    """Redraw plain scatter traces with scattergl; stacked areas have no WebGL version"""
+    data = []
+    for trace in fig.data:
+        if trace.type == 'scatter' and not _stacked(trace):
+            spec = trace.to_plotly_json()
+            spec.pop('type', None)
+            if spec.get('line', {}).get('shape') == 'spline':
+                spec['line']['shape'] = 'linear'
+            trace = go.Scattergl(spec, skip_invalid=True)
+        data.append(trace)
+    fig.data = []
+    fig.add_traces(data)
+
+
+def lean_figure(fig, point_budget=POINT_BUDGET, webgl_threshold=WEBGL_THRESHOLD):
+    """Shrink a figure's browser payload in place and return it
+
+    Series over the point budget are decimated (peaks kept for lines), figures
+    with many points switch to WebGL traces, and the template's defaults for
+    trace types the figure does not use are dropped.
+    """
+    _decimate(fig, point_budget)
+    if sum(_point_count(t) for t in fig.data if t.type in SCATTER_TYPES) > webgl_threshold:
+        _to_webgl(fig)
+
+    template = fig.layout.template
+    if template.data is not None:
+        used = {t.type for t in fig.data}
+        template.data = {k: v for k, v in template.data.to_plotly_json().items() if k in used}
+    return fig
+
+
+def figure_png(fig, dpi=200):
+    """Render a matplotlib figure to PNG bytes, the way st.pyplot would"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def figure_bytes(fig):
+    """Size of the JSON a Plotly figure is sent to the browser as"""
+    return len(fig.to_json().encode('utf-8'))
+
+
+def top_countries_bar(top_countries):
+    """Horizontal bar of the top countries by total medals (Overview)"""
+    fig = px.bar(x=top_countries.values, y=top_countries.index, orientation='h',
+                 title="Top 10 Countries by Total Medals",
+                 color=top_countries.values,
+                 color_continuous_scale='Viridis')
+    fig.update_layout(height=400)
+    return lean_figure(fig)
+
+
+def medal_trends_line(yearly_medals):
+    """Gold/silver/bronze per year (Global Analysis)"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=yearly_medals['year'], y=yearly_medals['gold'],
+                             mode='lines+markers', name='Gold', line=dict(color='gold', width=3)))
+    fig.add_trace(go.Scatter(x=yearly_medals['year'], y=yearly_medals['silver'],
+                             mode='lines+markers', name='Silver', line=dict(color='silver', width=3)))
+    fig.add_trace(go.Scatter(x=yearly_medals['year'], y=yearly_medals['bronze'],
+                             mode='lines+markers', name='Bronze', line=dict(color='#CD7F32', width=3)))
+
+    fig.update_layout(title="Global Medal Distribution Trends", xaxis_title="Year",
+                      yaxis_title="Number of Medals", height=500)
+    return lean_figure(fig)
+
+
+def medal_composition_bar(country_medals):
+    """Stacked gold/silver/bronze for a few countries (Global Analysis)"""
+    detailed = country_medals[['gold', 'silver', 'bronze']].sort_index()
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name='Gold', x=detailed.index, y=detailed['gold'], marker_color='gold'))
+    fig.add_trace(go.Bar(name='Silver', x=detailed.index, y=detailed['silver'], marker_color='silver'))
+    fig.add_trace(go.Bar(name='Bronze', x=detailed.index, y=detailed['bronze'], marker_color='#CD7F32'))
+
+    fig.update_layout(barmode='stack', title="Medal Composition of Top 10 Olympic Nations",
+                      xaxis_title="Country", yaxis_title="Number of Medals", height=500)
+    return lean_figure(fig)
+
+
+def gold_efficiency_bar(country_medals):
+    """Gold share of each country's medals (Global Analysis)"""
+    efficiency = country_medals[['gold', 'total']].sort_index()
+    efficiency['efficiency'] = (efficiency['gold'] / efficiency['total'] * 100).round(2)
+
+    fig = px.bar(x=efficiency.index, y=efficiency['efficiency'],
+                 title="Gold Medal Efficiency (Gold/Total %)",
+                 color=efficiency['efficiency'],
+                 color_continuous_scale='RdYlGn')
+    fig.update_layout(height=400)
+    return lean_figure(fig)
+
+
+def participation_scatter(aggregates, countries):
+    """Years between first and last medal vs editions with medals (Global Analysis)"""
+    span = pd.DataFrame({
+        'min': aggregates.country_first_year,
+        'max': aggregates.country_last_year,
+        'count': aggregates.country_editions,
+    }).loc[countries].sort_index()
+    span['span'] = span['max'] - span['min']
+
+    fig = px.scatter(x=span['span'], y=span['count'],
+                     hover_name=span.index,
+                     title="Olympic Participation: Years Span vs Games Count",
+                     labels={'x': 'Years Span', 'y': 'Games Participated'})
+    fig.update_layout(height=400)
+    return lean_figure(fig)
+
+
+def country_timeline(country, country_yearly):
+    """Stacked medals per year with the total on a second axis (Country Journey)"""
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+
+    fig.add_trace(go.Bar(x=country_yearly['year'], y=country_yearly['gold'], name='Gold', marker_color='gold'))
+    fig.add_trace(go.Bar(x=country_yearly['year'], y=country_yearly['silver'], name='Silver', marker_color='silver'))
+    fig.add_trace(go.Bar(x=country_yearly['year'], y=country_yearly['bronze'], name='Bronze', marker_color='#CD7F32'))
+
+    fig.add_trace(go.Scatter(x=country_yearly['year'], y=country_yearly['total'],
+                             mode='lines+markers', name='Total Medals',
+                             line=dict(color='red', width=3)), secondary_y=True)
+
+    fig.update_layout(title=f"{country}'s Olympic Medal Journey", barmode='stack', height=500)
+    fig.update_xaxes(title_text="Year")
+    fig.update_yaxes(title_text="Individual Medals", secondary_y=False)
+    fig.update_yaxes(title_text="Total Medals", secondary_y=True)
+    return lean_figure(fig)
+
+
+def rank_trajectory_line(country, trajectory):
+    """Medal-table rank at each edition, gold-first and by total, best rank at the top (Country Journey)"""
+    fig = go.Figure()
+    for column, name, color in [('gold_rank', 'Gold-first rank', 'goldenrod'), ('total_rank', 'Rank by total', 'steelblue')]:
+        fig.add_trace(go.Scatter(x=trajectory['year'], y=trajectory[column], mode='lines+markers', name=name,
+                                 text=trajectory['edition'], hovertemplate='%{text}<br>Rank %{y}<extra></extra>',
+                                 line=dict(color=color, width=2)))
+    fig.update_layout(title=f"{country}'s Medal Table Rank Over Time", height=450)
+    fig.update_xaxes(title_text="Year")
+    fig.update_yaxes(title_text="Rank", autorange='reversed')
+    return lean_figure(fig)
+
+
+def _country_traces(fig, country_year, trace, **kwargs):
+    """Add one trace per column of a wide year x country frame, skipping the years a country won nothing"""
+    years = country_year.index.to_numpy()
+    for country in country_year.columns:
+        totals = country_year[country].to_numpy()
+        won = ~np.isnan(totals)
+        fig.add_trace(trace(x=years[won], y=totals[won].astype('int64'), name=country, legendgroup=country,
+                            hovertemplate=f'country={country}<br>year=%{{x}}<br>total=%{{y}}<extra></extra>',
+                            **kwargs))
+    fig.update_layout(legend_title_text='country', xaxis_title='year', yaxis_title='total')
+    return fig
+
+
+def comparison_line(country_year, title, height=500):
+    """One line per country over the years (Country Journey, Data Storytelling)"""
+    fig = _country_traces(go.Figure(), country_year, go.Scatter, mode='lines+markers', line_shape='spline')
+    fig.update_layout(title=title, height=height)
+    return lean_figure(fig)
+
+
+def medal_share_pie(top_countries):
+    """The misleading pie chart of medal shares"""
+    fig = go.Figure(data=[go.Pie(
+        labels=top_countries.index,
+        values=top_countries.values,
+        hole=0.3,
+        marker_colors=px.colors.qualitative.Set3,
+        textinfo='label+percent',
+        textfont_size=10,
+        marker=dict(line=dict(color='#FFFFFF', width=2))
+    )])
+    fig.update_layout(
+        title="Medal Distribution (Misleading Pie Chart)",
+        height=500,
+        showlegend=False
+    )
+    return lean_figure(fig)
+
+
+def ranked_bar(top_countries):
+    """The corrected, ranked horizontal bar chart of medal totals"""
+    fig = px.bar(x=top_countries.values, y=top_countries.index,
+                 orientation='h', title="Medal Distribution Among Top 15 Countries\n(Corrected Visualization)",
+                 color=top_countries.values, color_continuous_scale='viridis')
+    fig.update_layout(height=600, yaxis={'categoryorder': 'total ascending'})
+    fig.update_traces(texttemplate='%{x}', textposition='outside')
+    return lean_figure(fig)
+
+
+def truncated_axis_bar(recent_years):
+    """The misleading matplotlib bar chart with a truncated y-axis
+
+    Built as a bare Figure, not through pyplot, so it is never held in pyplot's
+    global figure registry and is freed as soon as it goes out of scope.
+    """
+    # matplotlib is only needed by this one chart, so it is not loaded at startup
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.bar(recent_years['year'], recent_years['total'], color='lightcoral')
+    ax.set_ylim(recent_years['total'].min() - 50, recent_years['total'].max() + 50)  # Truncated
+    ax.set_title("Total Medals by Year (Misleading - Truncated Y-Axis)")
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Total Medals")
+    return fig
+
+
+def full_scale_bar(recent_years):
+    """The corrected bar chart with the y-axis starting at zero"""
+    fig = px.bar(recent_years, x='year', y='total',
+                 title="Total Medals by Year (Corrected - Full Scale)",
+                 color='total', color_continuous_scale='blues')
+    fig.update_layout(yaxis=dict(range=[0, recent_years['total'].max() * 1.1]))
+    return lean_figure(fig)
+
+
+def efficiency_scatter(aggregates, min_total=50):
+    """Medals per Olympic year vs gold share for countries with at least min_total medals (Data Storytelling)"""
+    country_stats = (aggregates.country_medals[['total', 'gold']].assign(year=aggregates.country_years_count)
+                     .rename_axis('country').reset_index())
+
+    country_stats['medals_per_game'] = (country_stats['total'] / country_stats['year']).round(2)
+    country_stats['gold_ratio'] = (country_stats['gold'] / country_stats['total'] * 100).round(2)
+
+    # Filter for countries with significant participation
+    significant_countries = country_stats[country_stats['total'] >= min_total]
+
+    fig = px.scatter(significant_countries, x='medals_per_game', y='gold_ratio',
+                     size='total', hover_name='country',
+                     title="Olympic Efficiency: Medals per Game vs Gold Medal Ratio",
+                     labels={'medals_per_game': 'Average Medals per Olympic Game',
+                             'gold_ratio': 'Gold Medal Percentage (%)'})
+    fig.update_layout(height=600)
+    return lean_figure(fig)
+
+
+def improvement_bar(country_year):
+    """Grouped yearly totals of the most improved countries (Data Storytelling)"""
+    fig = _country_traces(go.Figure(), country_year, go.Bar)
+    fig.update_layout(title="Countries That Got Much Better at Olympics", barmode='group', height=500)
+    return lean_figure(fig)
+
+
+def comparison_area(country_year, countries):
+    """Stacked area of the selected countries' yearly totals (Data Storytelling)"""
+    fig = _country_traces(go.Figure(), country_year, go.Scatter, mode='lines', stackgroup='1')
+    fig.update_layout(title=f"Olympic Medal Journey: {', '.join(countries)}", height=500)
+    return lean_figure(fig)
+
+
+def forecast_bar(forecast, n=15):
+    """Next-Games forecast with its interval for the n countries expected to win most (Medal Forecasts)"""
+    top = forecast.forecasts.head(n)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=top.index, y=top['forecast'], name=f'Forecast {forecast.next_year}',
+                         marker_color='steelblue',
+                         error_y=dict(type='data', symmetric=False, array=top['high'] - top['forecast'],
+                                      arrayminus=top['forecast'] - top['low'])))
+    fig.add_trace(go.Scatter(x=top.index, y=top['last_total'], mode='markers', name=f'Won in {forecast.years[-1]}',
+                             marker=dict(color='goldenrod', size=10, symbol='diamond')))
+    fig.update_layout(title=f"Expected Medals at the {forecast.games}", height=500,
+                      xaxis_title="Country", yaxis_title="Total Medals")
+    return lean_figure(fig)
+
+
+def forecast_line(country, history, forecast, row):
+    """A country's medals per Olympic year, the fitted models' next-Games forecasts and interval (Medal Forecasts)"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=history.index, y=history.values, mode='lines+markers', name='Medals won',
+                             line=dict(color='steelblue', width=2)))
+    last_year, next_year = forecast.years[-1], forecast.next_year
+    for column, name, color in [('trend', 'Trend line', 'gray'), ('smoothed', 'Exponential smoothing', 'purple'),
+                                ('forecast', 'Combined forecast', 'red')]:
+        fig.add_trace(go.Scatter(x=[last_year, next_year], y=[row['last_total'], row[column]], mode='lines+markers',
+                                 name=name, line=dict(color=color, dash='dash')))
+    fig.add_trace(go.Scatter(x=[next_year, next_year], y=[row['low'], row['high']], mode='lines', name='Likely range',
+                             line=dict(color='red', width=8), opacity=0.3))
+    fig.update_layout(title=f"{country}: Medals So Far and Forecast for the {forecast.games}", height=450)
+    fig.update_xaxes(title_text="Year")
+    fig.update_yaxes(title_text="Total Medals", rangemode='tozero')
+    return lean_figure(fig)
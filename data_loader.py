@@ -0,0 +1,202 @@
+import hashlib
+import io
+import json
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from aggregates import ALL_SEASONS, SEASONS, concat_rows
+
+# Tally to load; point OLYMPICS_DATA_FILE at e.g. the output of ingest.py to use another one
+DATA_FILE = os.environ.get("OLYMPICS_DATA_FILE", "Olympic_Games_Medal_Tally.csv")
+CACHE_DIR = ".cache"
+
+# Compact dtypes for the tally: repeated strings as categoricals, counts as small ints
+TALLY_DTYPES = {
+    'edition': 'category',
+    'edition_id': 'int16',
+    'year': 'int16',
+    'country': 'category',
+    'country_noc': 'category',
+    'gold': 'int16',
+    'silver': 'int16',
+    'bronze': 'int16',
+    'total': 'int16',
+}
+SEASON_DTYPE = pd.CategoricalDtype(SEASONS)
+
+
+class StaleVersionError(Exception):
+    """The CSV on disk is no longer the dataset version that was asked for"""
+
+
+@dataclass(frozen=True)
+class DataBundle:
+    """One dataset version and everything derived from it, held once per process
+
+    Shared read-only by every session: callers must not modify the tally or the
+    aggregates in place (with pandas copy-on-write, derived frames are copies).
+    """
+
+    version: str
+    tally: pd.DataFrame
+    # Season ('All', 'Summer', 'Winter') -> MedalAggregates, only for seasons in the tally
+    partitions: dict
+    # Season -> row positions of its Games in the tally
+    season_rows: dict
+
+    @property
+    def aggregates(self):
+        """Aggregates over every season"""
+        return self.partitions[ALL_SEASONS]
+
+    def season_tally(self, season, n=None):
+        """Tally rows of one season (the first n of them if given)"""
+        if season == ALL_SEASONS:
+            return self.tally if n is None else self.tally.head(n)
+        rows = self.season_rows[season]
+        return self.tally.iloc[rows if n is None else rows[:n]]
+
+
+def file_hash(path):
+    """SHA-256 of a file's contents, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _prefix_hash(path, prefix_size):
+    """SHA-256 of the whole file and of its first prefix_size bytes, in one read"""
+    digest = hashlib.sha256()
+    prefix = None
+    done = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            if prefix is None and done + len(block) >= prefix_size:
+                head = digest.copy()
+                head.update(block[:prefix_size - done])
+                prefix = head.hexdigest()
+            digest.update(block)
+            done += len(block)
+    return digest.hexdigest(), prefix
+
+
+def _cache_paths(csv_path, cache_dir):
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    base = os.path.join(cache_dir, stem)
+    return base + '.parquet', base + '.meta.json'
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = f'{meta_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def dataset_version(csv_path=DATA_FILE, cache_dir=CACHE_DIR):
+    """Content hash of the CSV, only re-hashed when its mtime or size changes"""
+    stat = os.stat(csv_path)
+    _, meta_path = _cache_paths(csv_path, cache_dir)
+    meta = _read_meta(meta_path)
+    if meta and meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size:
+        return meta['sha256']
+    return file_hash(csv_path)
+
+
+def with_season(df):
+    """Tally with a categorical season column, parsed once from the edition names"""
+    if 'season' in df.columns:
+        return df
+    editions = df['edition'].astype('category')
+    # Parse each distinct edition name once, then spread by category code
+    winter = np.asarray(editions.cat.categories.str.contains('Winter', case=False), dtype='int8')
+    codes = editions.cat.codes.to_numpy()
+    df = df.copy()
+    df['season'] = pd.Categorical.from_codes(np.where(codes < 0, -1, winter[codes]), dtype=SEASON_DTYPE)
+    return df
+
+
+def read_tally_csv(csv_path=DATA_FILE):
+    """Parse the tally CSV with compact dtypes"""
+    return with_season(pd.read_csv(csv_path, dtype=TALLY_DTYPES))
+
+
+def load_tally(csv_path=DATA_FILE, cache_dir=CACHE_DIR):
+    """Load the tally from the Parquet cache, rebuilding it when the CSV has changed"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return read_tally_csv(csv_path)
+
+    parquet_path, meta_path = _cache_paths(csv_path, cache_dir)
+    stat = os.stat(csv_path)
+    meta = _read_meta(meta_path)
+
+    appended = None
+    if meta and os.path.exists(parquet_path):
+        if meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size:
+            return with_season(pd.read_parquet(parquet_path))
+        # Touched but possibly unchanged: compare content before rebuilding
+        sha, prefix = _prefix_hash(csv_path, meta['size'])
+        if meta.get('sha256') == sha:
+            _write_meta(meta_path, dict(meta, mtime_ns=stat.st_mtime_ns, size=stat.st_size))
+            return with_season(pd.read_parquet(parquet_path))
+        if prefix == meta.get('sha256') and _ends_with_newline(csv_path, meta['size']):
+            # Rows were only appended (e.g. a new edition): parse just the new tail
+            appended = {'from': meta['sha256'], 'rows': meta['rows']}
+    else:
+        sha = file_hash(csv_path)
+
+    if appended:
+        df = concat_rows(with_season(pd.read_parquet(parquet_path)), _read_tail(csv_path, meta['size']))
+    else:
+        df = read_tally_csv(csv_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f'{parquet_path}.{os.getpid()}.tmp'
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, parquet_path)
+    _write_meta(meta_path, {'sha256': sha, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'rows': len(df),
+                            'appended': appended})
+    return df
+
+
+def _ends_with_newline(path, size):
+    with open(path, 'rb') as f:
+        f.seek(size - 1)
+        return f.read(1) == b'\n'
+
+
+def _read_tail(csv_path, offset):
+    """Parse the rows after byte offset, reusing the file's header line"""
+    with open(csv_path, 'rb') as f:
+        header = f.readline()
+        f.seek(offset)
+        tail = f.read()
+    return with_season(pd.read_csv(io.BytesIO(header + tail), dtype=TALLY_DTYPES))
+
+
+def appended_rows(df, previous_version, csv_path=DATA_FILE, cache_dir=CACHE_DIR):
+    """Rows of df appended since previous_version, or None if the change was not a pure append
+
+    Lets callers holding aggregates for previous_version fold in just the new
+    rows (see aggregates.append_rows) instead of rebuilding everything.
+    """
+    _, meta_path = _cache_paths(csv_path, cache_dir)
+    meta = _read_meta(meta_path) or {}
+    appended = meta.get('appended')
+    if not appended or appended['from'] != previous_version or meta.get('rows') != len(df):
+        return None
+    return df.iloc[appended['rows']:]
@@ -0,0 +1,241 @@
+"""Export the dashboard's default view as a static site: one HTML page per section plus the PDF report.
+
+Examples:
+    python export_site.py --out site/
+    python export_site.py --season Winter --out site-winter/
+
+Runs app.py headlessly with Streamlit's AppTest, once per section, and turns the
+elements each run drew into plain HTML. Plotly figures are drawn from their JSON
+by one shared plotly.min.js, and widgets are shown with their default values.
+The directory can be served by any static file server or CDN; readers need no
+Streamlit session.
+"""
+import argparse
+import base64
+import html
+import os
+import sys
+import time
+from string import Template
+
+from aggregates import ALL_SEASONS, build_partitions
+from batch_reports import slugify
+from data_loader import load_tally
+from forecasts import next_games_forecast
+from instrumentation import add_listener
+from report_generator import BOLD_PATTERN, compute_report_stats, format_size, render_pdf
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+PLOTLY_JS = 'plotly.min.js'
+REPORT_PDF = 'Olympic_Analysis_Report.pdf'
+# Buttons that become links to exported files; other buttons are left out
+BUTTON_LINKS = {'download_report': REPORT_PDF}
+WIDGETS = {'selectbox', 'radio', 'select_slider', 'slider', 'multiselect', 'checkbox'}
+ALERTS = {'info', 'success', 'warning', 'error'}
+
+PAGE_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>$title · Olympics Data Storytelling</title>
+<script src="$plotly_js"></script>
+<style>
+body { font-family: sans-serif; max-width: 80rem; margin: 0 auto; padding: 1rem 2rem; line-height: 1.5; color: #31333f; }
+nav { display: flex; flex-wrap: wrap; gap: 0.5rem 1.25rem; padding: 0.75rem 0; border-bottom: 1px solid #ddd; }
+nav a { color: #0068c9; text-decoration: none; }
+nav a.current { font-weight: bold; color: #31333f; }
+nav .season { margin-left: auto; color: #666; }
+.row { display: flex; gap: 1rem; }
+.col { min-width: 0; }
+.metric .label { font-size: 0.9rem; color: #666; }
+.metric .value { font-size: 2rem; }
+.metric .delta { font-size: 0.9rem; color: #09ab3b; }
+.widget .label { font-weight: bold; margin-right: 0.5rem; }
+.caption { font-size: 0.85rem; color: #666; }
+.alert { padding: 0.75rem 1rem; border-radius: 0.5rem; background: #e8f0fe; }
+.alert.success { background: #e6f4ea; }
+.alert.warning { background: #fff8e1; }
+.alert.error { background: #fdecea; }
+.button a { display: inline-block; padding: 0.5rem 1rem; border: 1px solid #ccc; border-radius: 0.5rem; color: inherit; text-decoration: none; }
+.table-wrap { overflow-x: auto; max-height: 30rem; }
+table.dataframe { border-collapse: collapse; font-size: 0.9rem; }
+table.dataframe th, table.dataframe td { padding: 0.25rem 0.75rem; border-bottom: 1px solid #eee; text-align: right; }
+img { max-width: 100%; }
+</style>
+</head>
+<body>
+$nav
+$body
+<p class="caption">Static export of the dashboard's default view, generated $generated.</p>
+</body>
+</html>
+""")
+
+
+def markdown_html(text):
+    """HTML for what the app passes to st.markdown: raw HTML blocks, rules, paragraphs, bullet lists and **bold**"""
+    text = text.strip()
+    if text.startswith('<'):
+        return text
+    if text == '---':
+        return '<hr>'
+    parts = []
+    items = []
+    for line in [line.strip() for line in text.splitlines()] + ['']:
+        if line.startswith('- '):
+            items.append(f"<li>{_inline(line[2:])}</li>")
+            continue
+        if items:
+            parts.append(f"<ul>{''.join(items)}</ul>")
+            items = []
+        if line:
+            parts.append(f"<p>{_inline(line)}</p>")
+    return '\n'.join(parts)
+
+
+def _inline(text):
+    return BOLD_PATTERN.sub(r'<b>\1</b>', html.escape(text, quote=False))
+
+
+def _figure_html(spec, n):
+    # Escape "</" so figure text cannot close the script tag
+    spec = spec.replace('</', '<\\/')
+    return (f'<div id="figure-{n}" class="figure"></div>\n'
+            f'<script>(function () {{ var spec = {spec}; Plotly.newPlot("figure-{n}", spec.data, spec.layout, '
+            f'{{responsive: true, displaylogo: false}}); }})();</script>')
+
+
+def _widget_value(node):
+    if node.type == 'checkbox':
+        return '☑' if node.value else '☐'
+    if node.type == 'multiselect':
+        return html.escape(', '.join(map(str, node.value)) or '(none)')
+    value = node.value
+    if isinstance(value, tuple):
+        value = ' – '.join(map(str, value))
+    return html.escape(str(value))
+
+
+def element_html(node, images, figures):
+    """HTML for one element of an AppTest tree and everything inside it
+
+    images yields the (name, bytes) pairs the run showed, in order; figures counts
+    the Plotly figures drawn so far on the page, to give each a unique id.
+    """
+    kind = node.type
+    if kind == 'markdown':
+        return markdown_html(node.value)
+    if kind in ('title', 'header', 'subheader'):
+        level = {'title': 1, 'header': 2, 'subheader': 3}[kind]
+        return f"<h{level}>{html.escape(node.value)}</h{level}>"
+    if kind == 'caption':
+        return f'<p class="caption">{_inline(node.value)}</p>'
+    if kind in ALERTS:
+        return f'<div class="alert {kind}">{_inline(node.value)}</div>'
+    if kind == 'metric':
+        delta = f'<div class="delta">{html.escape(node.delta)}</div>' if node.delta else ''
+        return (f'<div class="metric"><div class="label">{html.escape(node.label)}</div>'
+                f'<div class="value">{html.escape(node.value)}</div>{delta}</div>')
+    if kind == 'dataframe':
+        return f'<div class="table-wrap">{node.value.to_html(border=0, classes="dataframe", na_rep="")}</div>'
+    if kind == 'plotly_chart':
+        figures.append(len(figures))
+        return _figure_html(node.proto.spec, figures[-1])
+    if kind == 'image':
+        name, data = next(images, (None, None))
+        if data is None:
+            return ''
+        return f'<img alt="{html.escape(name)}" src="data:image/png;base64,{base64.b64encode(data).decode("ascii")}">'
+    if kind in WIDGETS:
+        return f'<p class="widget"><span class="label">{html.escape(node.label)}</span>{_widget_value(node)}</p>'
+    if kind == 'button':
+        href = BUTTON_LINKS.get(node.key)
+        return f'<p class="button"><a href="{href}">{html.escape(node.label)}</a></p>' if href else ''
+
+    children = '\n'.join(element_html(child, images, figures) for child in node.children.values())
+    if kind == 'expander':
+        return f'<details open><summary>{html.escape(node.label)}</summary>\n{children}\n</details>'
+    if kind == 'column':
+        return f'<div class="col" style="flex: {node.weight}">\n{children}\n</div>'
+    if kind == 'flex_container' and any(child.type == 'column' for child in node.children.values()):
+        return f'<div class="row">\n{children}\n</div>'
+    return children
+
+
+def _nav(pages, current, season):
+    links = [f'<a href="{page}"{" class=current" if page == current else ""}>{html.escape(title)}</a>'
+             for title, page in pages]
+    return f'<nav>{"".join(links)}<span class="season">Olympic Season: {html.escape(season)}</span></nav>'
+
+
+def export(out_dir, season=ALL_SEASONS, country='India'):
+    """Write one page per dashboard section, the shared Plotly JS and the PDF report; returns (file, bytes, seconds)"""
+    from plotly.offline import get_plotlyjs
+    from streamlit.testing.v1 import AppTest
+
+    # The exporter visits every section itself; no need for the app's background warm-up
+    os.environ.setdefault("OLYMPICS_WARMUP", "0")
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+
+    def write(name, data, seconds):
+        with open(os.path.join(out_dir, name), 'wb') as f:
+            f.write(data)
+        written.append((name, len(data), seconds))
+
+    start = time.perf_counter()
+    write(PLOTLY_JS, get_plotlyjs().encode('utf-8'), time.perf_counter() - start)
+
+    # Images are served as media files, so their bytes are taken from the run's trace instead
+    traces = []
+    add_listener(traces.append)
+
+    at = AppTest.from_file(APP, default_timeout=300).run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    at.sidebar.radio(key="season").set_value(season)
+    sections = at.sidebar.selectbox[0].options
+    pages = [(section, 'index.html' if i == 0 else f'{slugify(section)}.html') for i, section in enumerate(sections)]
+    generated = time.strftime('%Y-%m-%d %H:%M')
+
+    for section, page in pages:
+        start = time.perf_counter()
+        traces.clear()
+        at.sidebar.selectbox[0].set_value(section).run()
+        if at.exception:
+            raise RuntimeError(f"{section}: {at.exception[0].message}")
+        images = iter([image for trace in traces for image in trace.images])
+        body = element_html(at.main, images, [])
+        document = PAGE_TEMPLATE.substitute(title=html.escape(section), plotly_js=PLOTLY_JS,
+                                            nav=_nav(pages, page, season), body=body, generated=generated)
+        write(page, document.encode('utf-8'), time.perf_counter() - start)
+
+    # The same report the download button builds for the default focus country
+    start = time.perf_counter()
+    partitions = build_partitions(load_tally())
+    scope = None if season == ALL_SEASONS else f"{season} Olympics Only"
+    stats = compute_report_stats(partitions[season], focus_country=country, scope=scope,
+                                 forecast=next_games_forecast(partitions, season))
+    write(REPORT_PDF, render_pdf(stats), time.perf_counter() - start)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the dashboard's default view as a static site")
+    parser.add_argument('--out', default='site', help="output directory")
+    parser.add_argument('--season', default=ALL_SEASONS, help="Olympic season to export (All, Summer or Winter)")
+    parser.add_argument('--country', default='India', help="focus country of the PDF report")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    written = export(args.out, args.season, args.country)
+    for name, size, seconds in written:
+        print(f"  {name:<55} {format_size(size):>10}  {seconds:.2f}s")
+    total = sum(size for _, size, _ in written)
+    print(f"Wrote {len(written)} files ({format_size(total)}) to {args.out} in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from aggregates import ALL_SEASONS, SEASONS
+
+# Olympic years each model is fitted on, counting back from the latest
+WINDOW = 8
+# Smoothing constants tried for every country; the one with the smallest one-step error is kept
+ALPHAS = (0.2, 0.4, 0.6, 0.8)
+# Normal quantile for approximate 95% prediction intervals
+Z = 1.96
+
+
+@dataclass(frozen=True)
+class MedalForecast:
+    """Next-edition medal forecasts for every country with medals in the fitting window"""
+
+    # Per-country last_total, recent_avg, trend (+ low/high), smoothed (+ alpha, low/high)
+    # and the combined forecast with its low/high interval, largest forecast first
+    forecasts: pd.DataFrame
+    # Olympic year the forecasts are for
+    next_year: int
+    # Olympic years the models were fitted on
+    years: tuple
+    # Season of the forecast Games, None when the aggregates were not split by season
+    season: str = None
+
+    @property
+    def games(self):
+        """Name of the forecast Games, e.g. 2024 Summer Olympics"""
+        return f"{self.next_year} {self.season} Olympics" if self.season else f"{self.next_year} Olympics"
+
+    def country(self, country):
+        """Forecast row of one country, None if it won nothing in the fitting window"""
+        if country not in self.forecasts.index:
+            return None
+        return self.forecasts.loc[country]
+
+
+def forecast_medals(aggregates, window=WINDOW, alphas=ALPHAS, season=None):
+    """Fit a linear trend and simple exponential smoothing to every country's medals per Olympic year at once
+
+    Both models run as array operations over the year x country matrix (the smoothing
+    loops over years only, for every country and smoothing constant together). The
+    combined forecast averages the two; its interval uses their averaged error variance.
+    """
+    matrix = aggregates.country_year.iloc[-window:]
+    years = matrix.index.to_numpy(dtype=float)
+    values = np.nan_to_num(matrix.to_numpy(dtype=float))
+    n = len(years)
+    gaps = np.diff(years)
+    next_year = int(years[-1] + (np.median(gaps) if len(gaps) else 4))
+
+    # Least-squares trend line per country, with its prediction interval at next_year
+    x = years - years.mean()
+    sxx = (x ** 2).sum()
+    mean = values.mean(axis=0)
+    slope = x @ (values - mean) / sxx if sxx else np.zeros(values.shape[1])
+    residuals = values - (mean + np.outer(x, slope))
+    sigma = np.sqrt((residuals ** 2).sum(axis=0) / max(n - 2, 1))
+    x_next = next_year - years.mean()
+    trend = mean + slope * x_next
+    trend_se = sigma * np.sqrt(1 + 1 / n + (x_next ** 2 / sxx if sxx else 0))
+
+    # Simple exponential smoothing for every smoothing constant and country together
+    alpha = np.asarray(alphas, dtype=float)[:, None]
+    level = np.repeat(values[:1], len(alphas), axis=0)
+    sse = np.zeros_like(level)
+    for t in range(1, n):
+        error = values[t] - level
+        sse += error ** 2
+        level += alpha * error
+    best = sse.argmin(axis=0)
+    columns = np.arange(values.shape[1])
+    smoothed = level[best, columns]
+    smoothed_se = np.sqrt(sse[best, columns] / max(n - 1, 1))
+
+    forecast = (trend + smoothed) / 2
+    forecast_se = np.sqrt((trend_se ** 2 + smoothed_se ** 2) / 2)
+
+    forecasts = pd.DataFrame({
+        'last_total': values[-1],
+        'recent_avg': mean,
+        'trend': np.clip(trend, 0, None),
+        'trend_low': np.clip(trend - Z * trend_se, 0, None),
+        'trend_high': np.clip(trend + Z * trend_se, 0, None),
+        'smoothed': smoothed,
+        'alpha': alpha[best, 0],
+        'smoothed_low': np.clip(smoothed - Z * smoothed_se, 0, None),
+        'smoothed_high': smoothed + Z * smoothed_se,
+        'forecast': np.clip(forecast, 0, None),
+        'low': np.clip(forecast - Z * forecast_se, 0, None),
+        'high': np.clip(forecast + Z * forecast_se, 0, None),
+    }, index=matrix.columns)
+    forecasts = forecasts[values.any(axis=0)].sort_values('forecast', ascending=False)
+    return MedalForecast(forecasts=forecasts, next_year=next_year, years=tuple(int(y) for y in years), season=season)
+
+
+def next_games_forecast(partitions, season=ALL_SEASONS):
+    """Forecast for a season's next Games; for 'All', whichever season's Games come first
+
+    Summer and Winter Games alternate, so a series mixing both is not forecast as one.
+    """
+    if season != ALL_SEASONS:
+        return forecast_medals(partitions[season], season=season)
+    candidates = [forecast_medals(partitions[s], season=s) for s in SEASONS if s in partitions]
+    if not candidates:
+        return forecast_medals(partitions[ALL_SEASONS])
+    return min(candidates, key=lambda f: f.next_year)
@@ -0,0 +1,103 @@
+"""Measure how long the dashboard's startup imports take and fail when they go over budget.
+
+Examples:
+    python import_budget.py
+    python import_budget.py --budget-ms 1500 --repeat 5 --show 15
+
+Runs the module-level imports of app.py in a fresh interpreter with
+`python -X importtime`, which is what every new server process pays before the
+first page can be drawn. Exits with status 1 if the total is over the budget or
+if a library that should only load on demand (charting, PDF) is imported at
+startup.
+"""
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(HERE, 'app.py')
+# Total startup import time allowed, in milliseconds (Streamlit and pandas are most of it)
+BUDGET_MS = float(os.environ.get("OLYMPICS_IMPORT_BUDGET_MS", 1500))
+# Packages only the sections or downloads that use them may import
+LAZY_PACKAGES = ['matplotlib', 'plotly', 'reportlab', 'seaborn']
+# Imports the app cannot avoid; lazy packages these already load (Streamlit loads plotly) are not flagged
+FRAMEWORK_IMPORTS = ['import streamlit']
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def startup_imports(path=APP):
+    """Source of the import statements at the top level of a script"""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def measure(statements, cwd=HERE):
+    """Run the imports under -X importtime; {module: (self us, cumulative us, depth)} in import order"""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', '\n'.join(statements)],
+                          capture_output=True, text=True, cwd=cwd)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Startup imports failed:\n{proc.stderr[-2000:]}")
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), (len(indent) - 1) // 2)
+    return modules
+
+
+def total_ms(modules):
+    """Wall time of all imports: the sum over the top-level ones"""
+    return sum(cumulative for _, cumulative, depth in modules.values() if depth == 0) / 1000
+
+
+def packages(modules):
+    return {name.split('.')[0] for name in modules}
+
+
+def lazy_violations(modules, framework=(), lazy=LAZY_PACKAGES):
+    """Packages from the on-demand list that were imported anyway, beyond those the framework loads"""
+    loaded = packages(modules) - packages(framework)
+    return [p for p in lazy if p in loaded]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the dashboard's startup import time against a budget")
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS, help="allowed total startup import time")
+    parser.add_argument('--repeat', type=int, default=3, help="fresh interpreters to measure (the fastest counts)")
+    parser.add_argument('--show', type=int, default=10, help="slowest top-level imports to list")
+    parser.add_argument('--app', default=APP, help="script whose top-level imports are measured")
+    args = parser.parse_args(argv)
+
+    statements = startup_imports(args.app)
+    runs = [measure(statements, os.path.dirname(os.path.abspath(args.app))) for _ in range(max(1, args.repeat))]
+    modules = min(runs, key=total_ms)
+    total = total_ms(modules)
+
+    top_level = sorted(((name, cumulative) for name, (_, cumulative, depth) in modules.items() if depth == 0),
+                       key=lambda item: item[1], reverse=True)
+    print(f"Startup imports of {os.path.basename(args.app)}: {total:.0f} ms "
+          f"(fastest of {len(runs)}, budget {args.budget_ms:.0f} ms, {len(modules)} modules)")
+    for name, cumulative in top_level[:args.show]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    violations = lazy_violations(modules, measure(FRAMEWORK_IMPORTS))
+    failed = False
+    if violations:
+        print(f"FAIL: imported at startup but should load on demand: {', '.join(violations)}")
+        failed = True
+    if total > args.budget_ms:
+        print(f"FAIL: startup imports take {total:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Streaming roll-up of athlete- or event-level results into the medal tally schema.
+
+Examples:
+    python ingest.py athlete_events.csv --out tally.csv \
+        --map edition=Games year=Year country=Team country_noc=NOC event=Event medal=Medal
+    OLYMPICS_DATA_FILE=tally.csv streamlit run app.py
+"""
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+TALLY_COLUMNS = ['edition', 'edition_id', 'year', 'country', 'country_noc', 'gold', 'silver', 'bronze', 'total']
+KEY_COLUMNS = ['edition', 'year', 'country_noc']
+MEDALS = ['gold', 'silver', 'bronze']
+
+
+class IngestStats:
+    """Progress counters for a streaming ingestion run"""
+
+    def __init__(self):
+        self.rows = 0
+        self.medal_rows = 0
+        self.chunks = 0
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.rows:,} rows ({self.medal_rows:,} medal rows) in {self.chunks} chunk(s), "
+                f"{self.seconds:.2f}s, {self.rows_per_second:,.0f} rows/s")
+
+
+def _medal_counts(chunk, keys, team_events, seen):
+    """Gold/silver/bronze counts per source row for one chunk, plus its country-name counts"""
+    if 'medal' in chunk.columns:
+        medal = chunk['medal'].astype('string').str.strip().str.lower()
+        chunk = chunk[medal.isin(MEDALS)].assign(medal=medal)
+        names = chunk.groupby(['country_noc', 'country'], sort=False).size()
+        if team_events and 'event' in chunk.columns:
+            # A team event awards one medal per country, however many athletes it lists
+            medal_keys = zip(chunk['edition'], chunk['event'], chunk['country_noc'], chunk['medal'])
+            first = [key not in seen and not seen.add(key) for key in medal_keys]
+            chunk = chunk[first]
+        counts = pd.get_dummies(chunk['medal']).reindex(columns=MEDALS, fill_value=0).astype('int64')
+        return chunk[keys].join(counts), names
+
+    counts = chunk[MEDALS].fillna(0).astype('int64')
+    chunk = chunk[keys + ['country']].join(counts)[counts.sum(axis=1) > 0]
+    names = chunk.groupby(['country_noc', 'country'], sort=False).size()
+    return chunk[keys + MEDALS], names
+
+
+def ingest_results(source, column_map=None, chunksize=100_000, team_events=True, progress=None):
+    """Roll a large results CSV up into the tally schema, one chunk at a time
+
+    The source either has one row per awarded medal (a 'medal' column holding
+    Gold/Silver/Bronze, blank for non-medal rows) or gold/silver/bronze count
+    columns. column_map renames source columns to edition, year, country,
+    country_noc and, for row-per-medal data, event and medal. Memory is bounded
+    by the chunk size plus one row per (edition, country) in the running tally
+    and, when de-duplicating team events, one key per awarded medal.
+    """
+    column_map = column_map or {}
+    rename = {src: dst for dst, src in column_map.items()}
+    stats = IngestStats()
+    tally = None
+    names = None
+    keys = None
+    seen = set()
+
+    for chunk in pd.read_csv(source, chunksize=chunksize, usecols=lambda c: c in rename or c in rename.values()
+                             or c in TALLY_COLUMNS + ['event', 'medal']):
+        chunk = chunk.rename(columns=rename)
+        stats.rows += len(chunk)
+        stats.chunks += 1
+
+        if keys is None:
+            # Keep the source's own edition ids when it has them
+            keys = KEY_COLUMNS + (['edition_id'] if 'edition_id' in chunk.columns else [])
+        rows, chunk_names = _medal_counts(chunk, keys, team_events, seen)
+        stats.medal_rows += len(rows)
+
+        # Fold this chunk into the running tally and country-name counts
+        partial = rows.groupby(keys, sort=False)[MEDALS].sum()
+        tally = partial if tally is None else tally.add(partial, fill_value=0)
+        names = chunk_names if names is None else names.add(chunk_names, fill_value=0)
+
+        stats.seconds = time.perf_counter() - stats.started
+        if progress is not None:
+            progress(stats)
+
+    stats.seconds = time.perf_counter() - stats.started
+    if tally is None or tally.empty:
+        return pd.DataFrame(columns=TALLY_COLUMNS), stats
+
+    # Most frequent name per NOC, e.g. "United States" over "United States-1"
+    country_names = names.sort_values(ascending=False).reset_index().drop_duplicates('country_noc')
+    country_names = country_names.set_index('country_noc')['country']
+
+    tally = tally.astype('int64').reset_index()
+    tally['country'] = tally['country_noc'].map(country_names)
+    tally['total'] = tally[MEDALS].sum(axis=1)
+    if 'edition_id' not in tally.columns:
+        editions = tally[['year', 'edition']].drop_duplicates().sort_values(['year', 'edition'])
+        edition_ids = {edition: i for i, edition in enumerate(editions['edition'], 1)}
+        tally['edition_id'] = tally['edition'].map(edition_ids)
+    tally = tally.sort_values(['edition_id', 'gold', 'silver', 'bronze'], ascending=[True, False, False, False])
+    return tally[TALLY_COLUMNS].reset_index(drop=True), stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Roll athlete/event-level results up into a medal tally CSV")
+    parser.add_argument('source', help="results CSV")
+    parser.add_argument('--out', required=True, help="tally CSV to write")
+    parser.add_argument('--map', nargs='*', default=[], metavar='FIELD=COLUMN',
+                        help="source column for a tally field, e.g. country_noc=NOC")
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--no-team-dedupe', action='store_true',
+                        help="count every medal row, even several athletes of one team event")
+    args = parser.parse_args(argv)
+
+    column_map = dict(item.split('=', 1) for item in args.map)
+    tally, stats = ingest_results(args.source, column_map, args.chunksize, not args.no_team_dedupe,
+                                  progress=lambda s: print(f"\r{s}", end='', file=sys.stderr))
+    print(file=sys.stderr)
+    tally.to_csv(args.out, index=False)
+    print(f"Wrote {len(tally):,} tally rows to {args.out}: {stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,311 @@
+"""Per-rerun timing spans, cache hit/miss counts and figure and download payload sizes for the dashboard.
+
+Every rerun of app.py gets a RerunTrace. Set OLYMPICS_METRICS_FILE to append one
+JSON line per rerun to that file, or, for a path ending in .prom, to keep a
+Prometheus textfile-collector file with running totals up to date.
+"""
+import functools
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import streamlit as st
+
+METRICS_FILE = os.environ.get("OLYMPICS_METRICS_FILE")
+
+_local = threading.local()
+
+# Process-wide running totals for the Prometheus sink
+_totals_lock = threading.Lock()
+_totals = {'reruns': 0, 'rerun_seconds': 0.0, 'spans': {}, 'cache': {}, 'payloads': {}}
+
+# Callables given every finished trace, e.g. export_site.py collecting the images a run showed
+_listeners = []
+
+
+class RerunTrace:
+    """Spans, cache lookups and figure and download payload sizes recorded during one script rerun"""
+
+    def __init__(self, measure_payloads=False):
+        self.started = time.perf_counter()
+        self.timestamp = datetime.now().isoformat(timespec='seconds')
+        self.measure_payloads = measure_payloads
+        self.section = None
+        self.section_started = None
+        self.sections = []
+        self.seconds = None
+        self.spans = []
+        self.cache = {}
+        self.payloads = {}
+        # (name, bytes) of the images shown, in order
+        self.images = []
+        # id() of objects returned through a Timed proxy -> the function that built them
+        self.producers = {}
+
+    def add_span(self, name, seconds):
+        self.spans.append({'name': name, 'section': self.section, 'seconds': seconds})
+
+    def count_cache(self, name, hit):
+        counts = self.cache.setdefault(name, {'hits': 0, 'misses': 0})
+        counts['hits' if hit else 'misses'] += 1
+
+    def to_dict(self):
+        return {'timestamp': self.timestamp, 'sections': self.sections, 'seconds': self.seconds,
+                'spans': self.spans, 'cache': self.cache, 'payload_bytes': self.payloads}
+
+
+def start_rerun(measure_payloads=False):
+    """Begin recording a new rerun on this script thread"""
+    _local.trace = RerunTrace(measure_payloads)
+    return _local.trace
+
+
+def current_trace():
+    """Trace of the rerun running on this thread, None outside one"""
+    return getattr(_local, 'trace', None)
+
+
+def set_section(name):
+    """Label the spans recorded from here on with a dashboard section, closing the previous one's span"""
+    trace = current_trace()
+    if trace is None:
+        return
+    now = time.perf_counter()
+    if trace.section is not None:
+        trace.add_span(f'section.{trace.section}', now - trace.section_started)
+    trace.section, trace.section_started = name, now
+    if name is not None:
+        trace.sections.append(name)
+
+
+def record_span(name, seconds):
+    """Record a span timed elsewhere, e.g. a background report build"""
+    trace = current_trace()
+    if trace is not None:
+        trace.add_span(name, seconds)
+
+
+@contextmanager
+def span(name):
+    """Time a block and record it on the current trace"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace = current_trace()
+        if trace is not None:
+            trace.add_span(name, time.perf_counter() - start)
+
+
+@contextmanager
+def fragment_trace(name):
+    """Span for a fragment; when the fragment reruns on its own it gets a trace of its own"""
+    if current_trace() is not None:
+        with span(f'fragment.{name}'):
+            yield
+        return
+    start_rerun(measure_payloads=bool(METRICS_FILE))
+    set_section(name)
+    try:
+        yield
+    finally:
+        set_section(None)
+        finish_rerun()
+
+
+def finish_rerun(path=METRICS_FILE):
+    """Close the current trace, add it to the running totals and write it to the sink"""
+    trace = current_trace()
+    if trace is None:
+        return None
+    _local.trace = None
+    trace.seconds = time.perf_counter() - trace.started
+
+    with _totals_lock:
+        _totals['reruns'] += 1
+        _totals['rerun_seconds'] += trace.seconds
+        for s in trace.spans:
+            total = _totals['spans'].setdefault(s['name'], [0, 0.0])
+            total[0] += 1
+            total[1] += s['seconds']
+        for name, counts in trace.cache.items():
+            total = _totals['cache'].setdefault(name, {'hits': 0, 'misses': 0})
+            total['hits'] += counts['hits']
+            total['misses'] += counts['misses']
+        _totals['payloads'].update(trace.payloads)
+        if path and path.endswith('.prom'):
+            _write_prometheus(path)
+        elif path:
+            with open(path, 'a') as f:
+                f.write(json.dumps(trace.to_dict()) + '\n')
+    for listener in _listeners:
+        listener(trace)
+    return trace
+
+
+def add_listener(listener):
+    """Call listener(trace) with every finished rerun's trace, from the thread that ran it"""
+    _listeners.append(listener)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+def _write_prometheus(path):
+    lines = [
+        '# TYPE olympics_reruns_total counter',
+        f"olympics_reruns_total {_totals['reruns']}",
+        '# TYPE olympics_rerun_seconds_total counter',
+        f"olympics_rerun_seconds_total {_totals['rerun_seconds']:.6f}",
+        '# TYPE olympics_span_seconds_total counter',
+    ]
+    lines += [f'olympics_span_seconds_total{{span="{_label(n)}"}} {t[1]:.6f}' for n, t in sorted(_totals['spans'].items())]
+    lines.append('# TYPE olympics_span_count_total counter')
+    lines += [f'olympics_span_count_total{{span="{_label(n)}"}} {t[0]}' for n, t in sorted(_totals['spans'].items())]
+    lines.append('# TYPE olympics_cache_requests_total counter')
+    for name, counts in sorted(_totals['cache'].items()):
+        lines.append(f'olympics_cache_requests_total{{function="{_label(name)}",result="hit"}} {counts["hits"]}')
+        lines.append(f'olympics_cache_requests_total{{function="{_label(name)}",result="miss"}} {counts["misses"]}')
+    lines.append('# TYPE olympics_figure_payload_bytes gauge')
+    lines += [f'olympics_figure_payload_bytes{{figure="{_label(n)}"}} {b}' for n, b in sorted(_totals['payloads'].items())]
+
+    # Written whole and renamed so the collector never reads a partial file
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(tmp_path, path)
+
+
+def track_cache(cache):
+    """Like the given st.cache_data/st.cache_resource decorator, also counting hits and misses
+
+    The wrapped body only runs on a miss, so a call that never reaches it was a hit.
+    Each call is also recorded as a cache.<name> span.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            _local.missed = True
+            return fn(*args, **kwargs)
+
+        cached = cache(compute)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            outer = getattr(_local, 'missed', False)
+            _local.missed = False
+            try:
+                with span(f'cache.{fn.__name__}'):
+                    result = cached(*args, **kwargs)
+                trace = current_trace()
+                if trace is not None:
+                    trace.count_cache(fn.__name__, hit=not _local.missed)
+                return result
+            finally:
+                _local.missed = outer
+
+        call.clear = cached.clear
+        return call
+    return decorate
+
+
+class Timed:
+    """Proxy recording a <prefix>.<name> span for every call, e.g. backend queries or chart builders
+
+    target may be a module name instead, imported (and timed as import.<module>) on
+    first use, so a rerun that never calls into it never loads it or its dependencies.
+    """
+
+    def __init__(self, target, prefix):
+        self._target = target
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        if isinstance(self._target, str):
+            with span(f'import.{self._target}'):
+                self._target = importlib.import_module(self._target)
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        def timed(*args, **kwargs):
+            with span(f'{self._prefix}.{name}'):
+                result = attr(*args, **kwargs)
+            trace = current_trace()
+            if trace is not None:
+                trace.producers[id(result)] = name
+            return result
+        return timed
+
+
+def _figure_name(fig, trace):
+    """Name of the builder that made fig, falling back to its title"""
+    if trace is not None and id(fig) in trace.producers:
+        return trace.producers[id(fig)]
+    return (fig.layout.title.text or 'untitled').replace('\n', ' ')
+
+
+def plotly_chart(fig, **kwargs):
+    """st.plotly_chart, timed, with the figure's JSON size recorded when payloads are measured"""
+    trace = current_trace()
+    name = _figure_name(fig, trace)
+    if trace is not None and trace.measure_payloads:
+        trace.payloads[name] = len(fig.to_json().encode('utf-8'))
+    with span(f'chart.{name}'):
+        return st.plotly_chart(fig, **kwargs)
+
+
+def image(data, name, **kwargs):
+    """st.image for pre-rendered chart bytes, timed, with the image size recorded"""
+    trace = current_trace()
+    if trace is not None:
+        trace.payloads[name] = len(data)
+        trace.images.append((name, data))
+    with span(f'chart.{name}'):
+        return st.image(data, **kwargs)
+
+
+def download_button(label, data, name, **kwargs):
+    """st.download_button, timed, with the size of the bytes offered recorded as a payload"""
+    trace = current_trace()
+    if trace is not None:
+        trace.payloads[name] = len(data)
+    with span(f'download.{name}'):
+        return st.download_button(label, data=data, **kwargs)
+
+
+def rss_bytes():
+    """Resident memory of this process, from /proc where available, else its peak"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def debug_panel(trace):
+    """Sidebar summary of a finished rerun: slowest spans, cache hits/misses and payload sizes"""
+    with st.sidebar.expander("🛠️ Performance", expanded=True):
+        st.caption(f"Rerun: {trace.seconds * 1000:.1f} ms · {' / '.join(trace.sections)} · "
+                   f"process memory: {rss_bytes() / 2**20:.0f} MB")
+        if trace.spans:
+            spans = sorted(trace.spans, key=lambda s: s['seconds'], reverse=True)
+            st.dataframe([{'span': s['name'], 'ms': round(s['seconds'] * 1000, 2)} for s in spans],
+                         hide_index=True, use_container_width=True)
+        if trace.cache:
+            st.dataframe([{'function': n, 'hits': c['hits'], 'misses': c['misses']} for n, c in trace.cache.items()],
+                         hide_index=True, use_container_width=True)
+        if trace.payloads:
+            st.dataframe([{'payload': n, 'KB': round(b / 1024, 1)} for n, b in trace.payloads.items()],
+                         hide_index=True, use_container_width=True)
+        if METRICS_FILE:
+            st.caption(f"Writing metrics to {METRICS_FILE}")
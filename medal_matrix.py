@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+MEDALS = ['gold', 'silver', 'bronze', 'total']
+
+
+@dataclass(frozen=True)
+class MedalMatrix:
+    """Dense Olympic year x country medal counts per medal type; selecting countries is a column gather
+
+    The arrays are column-major, so each country's years are contiguous and a
+    single country's counts are a view rather than a copy.
+    """
+
+    # Olympic years (rows) and country names (columns), both sorted
+    years: np.ndarray
+    countries: pd.Index
+    # country -> column position
+    columns: dict
+    # medal -> (years, countries) counts in the smallest integer dtype that holds them, 0 where nothing was won
+    counts: dict
+    # True where the country has tally rows in that year
+    won: np.ndarray
+
+    def positions(self, countries):
+        """Column positions of the known countries among the given ones, in the order given"""
+        return [self.columns[c] for c in countries if c in self.columns]
+
+    def column(self, country, medal='total'):
+        """One country's counts per year, a view into the matrix; None for an unknown country"""
+        position = self.columns.get(country)
+        return None if position is None else self.counts[medal][:, position]
+
+    def select(self, countries, medal='total'):
+        """Wide year x country frame of the given countries, NaN where a country won nothing that year"""
+        positions = self.positions(countries)
+        values = np.where(self.won[:, positions], self.counts[medal][:, positions], np.nan)
+        return pd.DataFrame(values, index=pd.Index(self.years, name='year'),
+                            columns=pd.Index(self.countries[positions], name='country'))
+
+    def frame(self, medal='total'):
+        """Every country's counts as a wide year x country frame, NaN where a country won nothing that year"""
+        return pd.DataFrame(np.where(self.won, self.counts[medal], np.nan), index=pd.Index(self.years, name='year'),
+                            columns=self.countries.rename('country'))
+
+    def add(self, other):
+        """Counts of both matrices summed over the union of their years and countries
+
+        This matrix is copied into place once; only the other's (usually few)
+        cells are summed, and a dtype is only widened if those sums need it.
+        """
+        years = np.union1d(self.years, other.years)
+        countries = self.countries.union(other.countries)
+        placed = _placement(np.searchsorted(years, self.years), countries.get_indexer(self.countries))
+        cells = np.ix_(np.searchsorted(years, other.years), countries.get_indexer(other.countries))
+        shape = (len(years), len(countries))
+
+        won = np.zeros(shape, dtype=bool, order='F')
+        won[placed] = self.won
+        won[cells] |= other.won
+        counts = {}
+        for m in MEDALS:
+            combined = np.zeros(shape, dtype=self.counts[m].dtype, order='F')
+            combined[placed] = self.counts[m]
+            summed = combined[cells].astype('int64') + other.counts[m]
+            if _compact(summed).dtype.itemsize > combined.dtype.itemsize:
+                combined = np.asfortranarray(combined, dtype=_compact(summed).dtype)
+            combined[cells] = summed
+            counts[m] = combined
+        return _matrix(years, countries, counts, won)
+
+    def equals(self, other):
+        return (np.array_equal(self.years, other.years) and self.countries.equals(other.countries)
+                and np.array_equal(self.won, other.won)
+                and all(np.array_equal(self.counts[m], other.counts[m]) for m in MEDALS))
+
+
+def _placement(rows, cols):
+    """Index of the given rows and columns, with slices for consecutive runs so that placing is a plain copy"""
+    def run(positions):
+        if len(positions) and positions[-1] - positions[0] == len(positions) - 1:
+            return slice(int(positions[0]), int(positions[-1]) + 1)
+        return positions
+
+    rows, cols = run(rows), run(cols)
+    if isinstance(rows, slice) or isinstance(cols, slice):
+        return rows, cols
+    return np.ix_(rows, cols)
+
+
+def _compact(counts):
+    """Counts in int16 when they fit (they do for real tallies), else int32 or int64"""
+    for dtype in ('int16', 'int32'):
+        if counts.size == 0 or (counts.min() >= np.iinfo(dtype).min and counts.max() <= np.iinfo(dtype).max):
+            return np.asfortranarray(counts, dtype=dtype)
+    return np.asfortranarray(counts, dtype='int64')
+
+
+def _matrix(years, countries, counts, won):
+    return MedalMatrix(years=years, countries=countries, columns={c: i for i, c in enumerate(countries)},
+                       counts=counts, won=won)
+
+
+def build_medal_matrix(df):
+    """Sum a tally's medals into year x country matrices, one per medal type"""
+    year_codes, years = pd.factorize(df['year'].to_numpy(dtype='int64'), sort=True)
+    country_codes, countries = pd.factorize(df['country'], sort=True)
+    countries = pd.Index(countries).astype(str)
+    if not countries.is_monotonic_increasing:
+        # Categorical columns factorize in category order; columns are always in name order
+        order = countries.argsort()
+        country_codes = np.argsort(order)[country_codes]
+        countries = countries[order]
+    shape = (len(years), len(countries))
+    # Column-major cell of each row: country-major flat positions reshaped and transposed
+    cells = country_codes.astype('int64') * shape[0] + year_codes
+    size = shape[0] * shape[1]
+
+    def dense(weights=None):
+        return np.bincount(cells, weights=weights, minlength=size).reshape(shape[::-1]).T
+
+    won = dense() > 0
+    counts = {m: _compact(np.rint(dense(df[m].to_numpy(dtype='float64'))).astype('int64')) for m in MEDALS}
+    return _matrix(np.asarray(years, dtype='int64'), countries, counts, np.asfortranarray(won))
@@ -0,0 +1,109 @@
+"""Check that repeated reruns of the dashboard do not grow the process's resident memory.
+
+Examples:
+    python memory_check.py
+    python memory_check.py --reruns 300 --section "🌍 Global Medal Analysis" --tolerance-mb 10
+    python memory_check.py --sessions 30
+
+Runs app.py headlessly with Streamlit's AppTest, reruns one section many times
+and compares resident memory after a warm-up with resident memory at the end.
+Exits with status 1 if it grew by more than the tolerance or if matplotlib
+figures were left open. With --sessions it instead opens that many concurrent
+sessions and reports how much memory each additional one costs.
+"""
+import argparse
+import gc
+import os
+import sys
+import threading
+
+from instrumentation import rss_bytes
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+DEFAULT_SECTION = "⚠️ Misleading vs Corrected Visualizations"
+
+
+def open_figures():
+    """Figures held in pyplot's registry (0 if pyplot was never imported)"""
+    pyplot = sys.modules.get('matplotlib.pyplot')
+    return len(pyplot.get_fignums()) if pyplot else 0
+
+
+def wait_for_warmup():
+    """Let the app's background cache warm-up finish, so its memory is part of the baseline"""
+    for thread in threading.enumerate():
+        if thread.name == 'warmup':
+            thread.join()
+
+
+def check(section=DEFAULT_SECTION, reruns=200, warmup=20, tolerance_mb=20.0):
+    """Rerun the section, returning (RSS samples in MB, open figures, whether memory stayed flat)"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=120).run()
+    wait_for_warmup()
+    at.sidebar.selectbox[0].set_value(section).run()
+    samples = []
+    for i in range(warmup + reruns):
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        if i >= warmup - 1:
+            gc.collect()
+            samples.append(rss_bytes() / 2**20)
+    growth = samples[-1] - samples[0]
+    return samples, open_figures(), growth <= tolerance_mb and open_figures() == 0
+
+
+def per_session(sessions=20, section=DEFAULT_SECTION):
+    """RSS in MB before any session and after each new session's first page view
+
+    Every session is kept open, so the increments are what one more concurrent
+    viewer costs once the shared dataset has been loaded by the first.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    gc.collect()
+    samples = [rss_bytes() / 2**20]
+    apps = []
+    for _ in range(sessions):
+        at = AppTest.from_file(APP, default_timeout=120).run()
+        wait_for_warmup()
+        at.sidebar.selectbox[0].set_value(section).run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        apps.append(at)
+        gc.collect()
+        samples.append(rss_bytes() / 2**20)
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check resident memory stays flat across dashboard reruns")
+    parser.add_argument('--section', default=DEFAULT_SECTION, help="sidebar section to rerun")
+    parser.add_argument('--reruns', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20, help="reruns before the baseline is taken")
+    parser.add_argument('--tolerance-mb', type=float, default=20.0, help="allowed growth after warm-up")
+    parser.add_argument('--sessions', type=int, help="measure memory per added concurrent session instead")
+    args = parser.parse_args(argv)
+
+    if args.sessions:
+        samples = per_session(args.sessions, args.section)
+        added = [b - a for a, b in zip(samples[1:], samples[2:])]
+        print(f"RSS before sessions {samples[0]:.1f} MB, first session +{samples[1] - samples[0]:.1f} MB "
+              f"(loads the shared dataset), {args.sessions} sessions {samples[-1]:.1f} MB")
+        if added:
+            print(f"Each additional session: {sum(added) / len(added):+.2f} MB on average, "
+                  f"{max(added):+.2f} MB at most")
+        return 0
+
+    samples, figures, ok = check(args.section, args.reruns, args.warmup, args.tolerance_mb)
+    print(f"RSS after warm-up {samples[0]:.1f} MB, after {args.reruns} reruns {samples[-1]:.1f} MB "
+          f"(growth {samples[-1] - samples[0]:+.1f} MB, peak {max(samples):.1f} MB), "
+          f"open matplotlib figures: {figures}")
+    print("OK" if ok else "FAIL: memory grew across reruns")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Query API used by the dashboard sections, backed by pandas or an embedded SQLite file.
+
+Pick the backend with OLYMPICS_BACKEND=pandas|sqlite (default pandas). Both return
+the same shapes so sections, benchmarks and reports can switch freely.
+"""
+import os
+import sqlite3
+from contextlib import closing
+
+import pandas as pd
+
+from aggregates import ALL_SEASONS
+from data_loader import CACHE_DIR, DATA_FILE, appended_rows
+
+BACKEND = os.environ.get("OLYMPICS_BACKEND", "pandas")
+
+MEDAL_SUMS = "SUM(gold) AS gold, SUM(silver) AS silver, SUM(bronze) AS bronze, SUM(total) AS total"
+
+
+class PandasBackend:
+    """Answers queries from the precomputed in-memory aggregates"""
+
+    name = 'pandas'
+
+    def __init__(self, aggregates):
+        self.aggregates = aggregates
+
+    def country_totals(self, limit=None):
+        """Total medals per country, largest first"""
+        totals = self.aggregates.country_totals
+        return totals.head(limit) if limit else totals
+
+    def country_medals(self, countries=None):
+        """Gold/silver/bronze/total per country, largest total first"""
+        medals = self.aggregates.country_medals
+        return medals if countries is None else medals.loc[[c for c in countries if c in medals.index]]
+
+    def country_year(self, countries):
+        """Year x country totals of the given countries, in the order given, NaN where one won nothing"""
+        return self.aggregates.country_year_wide(countries)
+
+    def yearly_medals(self, min_year=None, max_year=None):
+        """Gold/silver/bronze/total per year"""
+        return self.aggregates.yearly_medals.loc[min_year:max_year]
+
+
+class SQLiteBackend:
+    """Answers queries with indexed SQL over an embedded SQLite copy of the tally"""
+
+    name = 'sqlite'
+
+    def __init__(self, db_path, season=ALL_SEASONS):
+        self.db_path = db_path
+        self.season = season
+
+    def _query(self, sql, params=()):
+        with closing(sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)) as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def _where(self, conditions=(), params=()):
+        """WHERE clause for the given conditions plus the season filter"""
+        conditions, params = list(conditions), tuple(params)
+        if self.season != ALL_SEASONS:
+            conditions.append("season = ?")
+            params += (self.season,)
+        return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+    def country_totals(self, limit=None):
+        """Total medals per country, largest first"""
+        where, params = self._where()
+        sql = f"SELECT country, SUM(total) AS total FROM tally {where} GROUP BY country ORDER BY total DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self._query(sql, params).set_index('country')['total']
+
+    def country_medals(self, countries=None):
+        """Gold/silver/bronze/total per country, largest total first"""
+        conditions, params = [], ()
+        if countries is not None:
+            conditions, params = [f"country IN ({', '.join('?' * len(countries))})"], countries
+        where, params = self._where(conditions, params)
+        sql = f"SELECT country, {MEDAL_SUMS} FROM tally {where} GROUP BY country ORDER BY total DESC"
+        return self._query(sql, params).set_index('country')
+
+    def country_year(self, countries):
+        """Year x country totals of the given countries, in the order given, NaN where one won nothing"""
+        where, params = self._where()
+        years = self._query(f"SELECT DISTINCT year FROM tally {where} ORDER BY year", params)['year']
+        found = []
+        long = pd.DataFrame({'year': pd.Series(dtype='int64'), 'country': pd.Series(dtype=str),
+                             'total': pd.Series(dtype='float64')})
+        if countries:
+            where, params = self._where([f"country IN ({', '.join('?' * len(countries))})"], countries)
+            sql = f"SELECT year, country, SUM(total) AS total FROM tally {where} GROUP BY year, country"
+            long = self._query(sql, params)
+            found = [c for c in countries if c in set(long['country'])]
+        return (long.pivot(index='year', columns='country', values='total').astype('float64')
+                .reindex(index=pd.Index(years, name='year'), columns=pd.Index(found, name='country', dtype=str)))
+
+    def yearly_medals(self, min_year=None, max_year=None):
+        """Gold/silver/bronze/total per year"""
+        bounds = (min_year if min_year is not None else -1, max_year if max_year is not None else 1 << 30)
+        where, params = self._where(["year >= ?", "year <= ?"], bounds)
+        sql = f"SELECT year, {MEDAL_SUMS} FROM tally {where} GROUP BY year ORDER BY year"
+        return self._query(sql, params).set_index('year')
+
+
+def _tally_table(df):
+    return df.astype({c: str for c in ['edition', 'country', 'country_noc', 'season']})
+
+
+def build_sqlite(df, version, csv_path=DATA_FILE, cache_dir=CACHE_DIR):
+    """Load the tally into an indexed SQLite file once per dataset version and return its path"""
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    db_path = os.path.join(cache_dir, stem + '.sqlite')
+
+    if os.path.exists(db_path):
+        try:
+            with closing(sqlite3.connect(db_path)) as conn:
+                row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+                # Files written before the season column was added are rebuilt
+                if 'season' not in {column[1] for column in conn.execute("PRAGMA table_info(tally)")}:
+                    row = None
+                if row and row[0] == version:
+                    return db_path
+                appended = appended_rows(df, row[0], csv_path, cache_dir) if row else None
+                if appended is not None:
+                    # Insert just the new rows; the indexes are updated in place
+                    with conn:
+                        _tally_table(appended).to_sql('tally', conn, index=False, if_exists='append')
+                        conn.execute("UPDATE meta SET value = ? WHERE key = 'version'", (version,))
+                    return db_path
+        except sqlite3.DatabaseError:
+            pass
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f'{db_path}.{os.getpid()}.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    table = _tally_table(df)
+    with closing(sqlite3.connect(tmp_path)) as conn:
+        table.to_sql('tally', conn, index=False)
+        conn.executescript("""
+            CREATE INDEX idx_tally_country ON tally (country, year);
+            CREATE INDEX idx_tally_country_noc ON tally (country_noc);
+            CREATE INDEX idx_tally_year ON tally (year);
+            CREATE INDEX idx_tally_edition_id ON tally (edition_id);
+            CREATE INDEX idx_tally_season ON tally (season, country);
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        conn.execute("INSERT INTO meta VALUES ('version', ?)", (version,))
+        conn.commit()
+    os.replace(tmp_path, db_path)
+    return db_path
+
+
+def make_backend(name, df, aggregates, version, season=ALL_SEASONS):
+    """Query backend by name ('pandas' or 'sqlite') over one season partition's aggregates"""
+    if name == 'sqlite':
+        return SQLiteBackend(build_sqlite(df, version), season)
+    if name == 'pandas':
+        return PandasBackend(aggregates)
+    raise ValueError(f"Unknown query backend: {name}")
@@ -0,0 +1,233 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Medal-table orderings: official gold-first (ties broken by silver, then bronze) and by total medals
+ORDERINGS = {
+    'gold': ['gold', 'silver', 'bronze'],
+    'total': ['total'],
+}
+MEDALS = ['gold', 'silver', 'bronze', 'total']
+RANK_COLUMNS = ['edition_id', 'edition', 'year', 'country', 'gold', 'silver', 'bronze', 'total',
+                'gold_rank', 'total_rank']
+# Lookup keys are country code * stride + edition_id; the headroom lets new editions be added without re-keying
+KEY_STRIDE = 1 << 16
+
+
+@dataclass(frozen=True)
+class RankIndex:
+    """Every country's medal-table rank at every edition, in both orderings, with O(1) lookups"""
+
+    # One row per edition and country, sorted by edition and gold-first rank
+    table: pd.DataFrame
+    # country -> integer code, and code * key_stride + edition_id -> (gold_rank, total_rank);
+    # integer keys keep building the lookup cheap for hundreds of thousands of rows
+    country_codes: dict
+    key_stride: int
+    ranks: dict
+    # country -> row positions in table, in year order
+    country_positions: dict
+    # edition_id -> (start, stop) row range in table
+    edition_rows: dict
+    # (country, ordering) -> (best rank, edition_id of its first occurrence)
+    best: dict
+
+    def rank(self, country, edition_id, by='gold'):
+        """Rank of a country at one edition, None if it won nothing there"""
+        code = self.country_codes.get(country)
+        if code is None or not 0 <= edition_id < self.key_stride:
+            return None
+        ranks = self.ranks.get(code * self.key_stride + edition_id)
+        return None if ranks is None else ranks[0 if by == 'gold' else 1]
+
+    def best_rank(self, country, by='gold'):
+        """(best rank, edition_id where it was first reached), None for an unknown country"""
+        return self.best.get((country, by))
+
+    def trajectory(self, country):
+        """A country's ranks in year order"""
+        positions = self.country_positions.get(country)
+        if positions is None:
+            return self.table.iloc[0:0]
+        return self.table.iloc[positions]
+
+    def edition_table(self, edition_id):
+        """Medal table of one edition, gold-first"""
+        start, stop = self.edition_rows.get(edition_id, (0, 0))
+        return self.table.iloc[start:stop]
+
+    def edition_name(self, edition_id):
+        """Name of an edition, e.g. 2020 Summer Olympics"""
+        start, _ = self.edition_rows[edition_id]
+        return self.table['edition'].iat[start]
+
+    def equals(self, other):
+        return self.table.reset_index(drop=True).equals(other.table.reset_index(drop=True))
+
+
+def _competition_ranks(table, columns):
+    """1-based rank within each edition; rows with equal medals share the better rank ("1, 2, 2, 4")"""
+    order = np.lexsort([-table[c].to_numpy() for c in reversed(columns)] + [table['edition_id'].to_numpy()])
+    editions = table['edition_id'].to_numpy()[order]
+    values = np.column_stack([table[c].to_numpy()[order] for c in columns])
+
+    new_edition = np.r_[True, editions[1:] != editions[:-1]]
+    new_value = new_edition | np.r_[True, (values[1:] != values[:-1]).any(axis=1)]
+    position = np.arange(len(order))
+    edition_start = np.maximum.accumulate(np.where(new_edition, position, 0))
+    tie_start = np.maximum.accumulate(np.where(new_value, position, 0))
+
+    ranks = np.empty(len(order), dtype='int64')
+    ranks[order] = tie_start - edition_start + 1
+    return ranks
+
+
+def _medal_rows(df):
+    """One row of medal sums per edition and country"""
+    # Group on integer codes; names are only looked up for the summed rows
+    codes, names = pd.factorize(df['country'])
+    edition_ids = df['edition_id'].to_numpy(dtype='int64')
+    medals = pd.DataFrame({'edition_id': edition_ids, 'code': codes})
+    for column in MEDALS:
+        medals[column] = df[column].to_numpy(dtype='int64')
+    sums = medals.groupby(['edition_id', 'code'], as_index=False, sort=False).sum()
+
+    unique_ids, first_rows = np.unique(edition_ids, return_index=True)
+    edition_rows = np.searchsorted(unique_ids, sums['edition_id'].to_numpy())
+    sums['edition'] = np.asarray(df['edition'].iloc[first_rows].astype(str), dtype=object)[edition_rows]
+    sums['year'] = df['year'].to_numpy(dtype='int64')[first_rows][edition_rows]
+    sums['country'] = np.asarray(pd.Index(names).astype(str), dtype=object)[sums.pop('code').to_numpy()]
+    return sums
+
+
+def _ranked(table):
+    """Medal rows with both rank columns, sorted by edition and gold-first rank"""
+    table = table.copy()
+    for ordering, columns in ORDERINGS.items():
+        table[f'{ordering}_rank'] = _competition_ranks(table, columns)
+    return table.sort_values(['edition_id', 'gold_rank', 'country'], kind='stable', ignore_index=True)[RANK_COLUMNS]
+
+
+def _rank_entries(table, codes, key_stride):
+    """Lookup key -> (gold_rank, total_rank) for the rows of a ranked table"""
+    return dict(zip((codes * key_stride + table['edition_id'].to_numpy(dtype='int64')).tolist(),
+                    zip(table['gold_rank'].tolist(), table['total_rank'].tolist())))
+
+
+def _edition_rows(edition_ids):
+    starts = np.flatnonzero(np.r_[True, edition_ids[1:] != edition_ids[:-1]])
+    stops = np.r_[starts[1:], len(edition_ids)]
+    return {int(edition_ids[s]): (int(s), int(e)) for s, e in zip(starts, stops)}
+
+
+def _index(table):
+    table = _ranked(table)
+    countries = table['country'].to_numpy()
+    edition_ids = table['edition_id'].to_numpy()
+    # Sort and key on integer country codes rather than the names
+    codes, names = pd.factorize(countries)
+    key_stride = max(KEY_STRIDE, int(edition_ids.max()) + 1 if len(edition_ids) else 1)
+    ranks = _rank_entries(table, codes, key_stride)
+    edition_rows = _edition_rows(edition_ids)
+
+    years = table['year'].to_numpy()
+    by_country = np.lexsort([edition_ids, years, codes])
+    bounds = np.flatnonzero(np.r_[True, codes[by_country][1:] != codes[by_country][:-1], True])
+    group_starts = bounds[:-1]
+    first_codes = codes[by_country[group_starts]]
+    country_positions = {names[c]: by_country[s:e] for c, s, e in zip(first_codes, group_starts, bounds[1:])}
+
+    best = {}
+    for ordering in ORDERINGS:
+        column = table[f'{ordering}_rank'].to_numpy()
+        # Per country: best rank first, earliest edition among ties
+        order = np.lexsort([edition_ids, years, column, codes])
+        firsts = order[np.flatnonzero(np.r_[True, codes[order][1:] != codes[order][:-1]])]
+        best.update({(names[c], ordering): (int(r), int(e))
+                     for c, r, e in zip(codes[firsts], column[firsts], edition_ids[firsts])})
+
+    return RankIndex(table=table, country_codes={name: code for code, name in enumerate(names)},
+                     key_stride=key_stride, ranks=ranks, country_positions=country_positions,
+                     edition_rows=edition_rows, best=best)
+
+
+def build_rank_index(df):
+    """Rank every country at every edition, gold-first and by total"""
+    return _index(_medal_rows(df))
+
+
+def update_rank_index(index, rows):
+    """Rank index with new tally rows added; only the editions they touch are re-ranked
+
+    The re-ranked editions are merged into the existing table, and only their
+    lookup entries and the countries they contain (or whose rows move) are
+    updated; the rest of the index is reused as is.
+    """
+    if len(rows) == 0:
+        return index
+    new = _medal_rows(rows)
+    touched_ids = np.unique(new['edition_id'].to_numpy())
+    old_n = len(index.table)
+    touched = np.zeros(old_n, dtype=bool)
+    for edition_id in touched_ids:
+        start, stop = index.edition_rows.get(int(edition_id), (0, 0))
+        touched[start:stop] = True
+    # Edition ids beyond the lookup keys' headroom, or most editions touched: a rebuild is as cheap
+    if touched_ids.max() >= index.key_stride or touched.sum() > old_n // 2:
+        table = pd.concat([index.table[new.columns], new], ignore_index=True)
+        return _index(table.groupby(['edition_id', 'edition', 'year', 'country'], as_index=False, sort=False).sum())
+
+    # Re-sum and re-rank just the touched editions
+    combined = pd.concat([index.table.loc[touched, new.columns], new], ignore_index=True)
+    combined = _ranked(combined.groupby(['edition_id', 'edition', 'year', 'country'], as_index=False, sort=False).sum())
+
+    # Both parts are sorted by edition, so the stable sort is a merge of two runs
+    kept = np.flatnonzero(~touched)
+    table = pd.concat([index.table.iloc[kept], combined], ignore_index=True)
+    edition_ids = table['edition_id'].to_numpy(dtype='int64')
+    order = np.argsort(edition_ids, kind='stable')
+    if not np.array_equal(order, np.arange(len(order))):
+        table = table.take(order).reset_index(drop=True)
+        edition_ids = edition_ids[order]
+    # Old row position -> new one (-1 for the re-ranked rows), and the re-ranked rows' new positions
+    placed = np.empty(len(order), dtype='int64')
+    placed[order] = np.arange(len(order))
+    moved = np.full(old_n, -1, dtype='int64')
+    moved[kept] = placed[:len(kept)]
+    combined_positions = placed[len(kept):]
+
+    country_codes = dict(index.country_codes)
+    for name in combined['country'].unique():
+        country_codes.setdefault(name, len(country_codes))
+    combined_codes = np.array([country_codes[c] for c in combined['country']], dtype='int64')
+    ranks = dict(index.ranks)
+    ranks.update(_rank_entries(combined, combined_codes, index.key_stride))
+
+    # Countries in the re-ranked editions, plus those with kept rows that moved
+    shifted = kept[moved[kept] != kept]
+    affected = set(combined['country']) | set(index.table['country'].iloc[shifted])
+    re_ranked = set(combined['country'])
+    years = table['year'].to_numpy()
+    gold_ranks, total_ranks = table['gold_rank'].to_numpy(), table['total_rank'].to_numpy()
+    countries = combined['country'].to_numpy()
+    by_country = np.argsort(countries, kind='stable')
+    bounds = np.flatnonzero(np.r_[True, countries[by_country][1:] != countries[by_country][:-1], True])
+    added = {countries[by_country[s]]: combined_positions[by_country[s:e]] for s, e in zip(bounds[:-1], bounds[1:])}
+
+    country_positions = dict(index.country_positions)
+    best = dict(index.best)
+    empty = np.empty(0, dtype='int64')
+    for country in affected:
+        positions = moved[country_positions.get(country, empty)]
+        positions = np.r_[positions[positions >= 0], added.get(country, empty)]
+        positions = positions[np.lexsort([edition_ids[positions], years[positions]])]
+        country_positions[country] = positions
+        if country in re_ranked:
+            for ordering, column in [('gold', gold_ranks), ('total', total_ranks)]:
+                # Best rank first, earliest edition among ties (positions are in year order)
+                first = positions[np.argmin(column[positions])]
+                best[(country, ordering)] = (int(column[first]), int(edition_ids[first]))
+
+    return RankIndex(table=table, country_codes=country_codes, key_stride=index.key_stride, ranks=ranks,
+                     country_positions=country_positions, edition_rows=_edition_rows(edition_ids), best=best)
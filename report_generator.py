@@ -1,201 +1,521 @@
-import streamlit as st
 import pandas as pd
-import base64
+import gzip
+import html
+import re
+from dataclasses import dataclass
 from datetime import datetime
-
-def generate_olympic_report(df, country_flags):
-    """Generate a comprehensive Olympic analysis report in simple English"""
-    
-    report_content = f"""
-# 🏅 Olympic Games Data Analysis Report
-
-**Student Name:** Aryan Gupta  
-**Roll Number:** 2415800019  
-**Subject:** Data Visualization and Storytelling  
-**Teacher:** Dr. Saurabh Tewari  
-**Date:** {datetime.now().strftime('%B %d, %Y')}
-
----
-
-## 📊 Executive Summary
-
-This report shows the analysis of Olympic Games medal data. We have studied how different countries perform in Olympics and what patterns we can see over the years.
-
-### Key Numbers:
-- **Total Countries:** {df['country'].nunique()} countries have participated
-- **Total Medals:** {df['total'].sum():,} medals given in all Olympics
-- **Time Period:** From {df['year'].min()} to {df['year'].max()}
-- **Olympic Games:** {df['year'].nunique()} different Olympic games
-
----
-
-## 🏆 Top Performing Countries
-
-These are the countries that won most medals in Olympics:
-
-"""
-    
-    # Add top 10 countries
-    top_10 = df.groupby('country')['total'].sum().sort_values(ascending=False).head(10)
-    for i, (country, medals) in enumerate(top_10.items(), 1):
-        flag = country_flags.get(country, '🏳️')
-        report_content += f"{i}. {flag} **{country}** - {medals:,} medals\n"
-    
-    report_content += f"""
-
-### What This Tells Us:
-- USA is the clear winner with most medals
-- Big countries like China, Germany, and Russia also perform very well
-- These countries invest a lot of money in sports training
-- They have good facilities and coaches for athletes
-
----
-
-## 🇮🇳 India's Olympic Performance
-
-"""
-    
-    india_data = df[df['country'] == 'India']
-    if len(india_data) > 0:
-        india_total = india_data['total'].sum()
-        india_gold = india_data['gold'].sum()
-        india_games = len(india_data)
-        
-        report_content += f"""
-### India's Numbers:
-- **Total Medals:** {india_total} medals
-- **Gold Medals:** {india_gold} gold medals  
-- **Games Played:** {india_games} Olympic games
-- **Average per Game:** {india_total/india_games:.1f} medals per Olympics
-
-### India's Story:
-- India has been participating in Olympics for many years
-- Our performance is slowly getting better
-- We need more investment in sports to compete with top countries
-- Recent Olympics show improvement in India's medal count
-"""
+from io import BytesIO
+from string import Template
+
+from aggregates import build_aggregates
+
+# Country flags used in the report rankings
+COUNTRY_FLAGS = {
+    'United States': '🇺🇸', 'China': '🇨🇳', 'Germany': '🇩🇪', 'India': '🇮🇳',
+    'Japan': '🇯🇵', 'Great Britain': '🇬🇧', 'France': '🇫🇷', 'Italy': '🇮🇹',
+    'Australia': '🇦🇺', 'South Korea': '🇰🇷', 'Russia': '🇷🇺', 'Canada': '🇨🇦'
+}
+
+STUDENT_NAME = "Aryan Gupta"
+ROLL_NUMBER = "2415800019"
+SUBJECT = "Data Visualization and Storytelling"
+TEACHER = "Dr. Saurabh Tewari"
+TOOLS_USED = "Python, Streamlit, Plotly, Matplotlib, Seaborn"
+CLOSING_NOTE = "This report uses simple English to explain complex data patterns so everyone can understand the Olympic Games analysis."
+
+@dataclass(frozen=True)
+class CountrySummary:
+    """Medal summary of a single country for the report"""
+    country: str
+    flag: str
+    total: int
+    gold: int
+    games: int
+    first_year: int
+    best_year: int
+    best_total: int
+    # Medal-table ranks: best gold-first and by-total rank with the Games they came at
+    best_rank: int = None
+    best_rank_edition: str = None
+    best_total_rank: int = None
+    best_total_rank_edition: str = None
+    top10_finishes: int = 0
+    # ((edition, gold-first rank, rank by total), ...) for the most recent Games, oldest first
+    recent_ranks: tuple = ()
+
+    @property
+    def average(self):
+        return self.total / self.games
+
+@dataclass(frozen=True)
+class ReportStats:
+    """Every number the report needs, computed once and shared by all output formats"""
+    date: str
+    n_countries: int
+    total_medals: int
+    year_min: int
+    year_max: int
+    n_years: int
+    # ((country, flag, medals), ...) in ranking order
+    top_countries: tuple
+    # Country the report focuses on; its summary is None when it has no medals in the dataset
+    focus_country: str = 'India'
+    focus: CountrySummary = None
+    # Optional subtitle describing the slice of data the report covers
+    scope: str = None
+    # Next-Games forecasts: the Games, ((country, flag, forecast, low, high), ...) largest first,
+    # and (forecast, low, high, last total) for the focus country; empty without a forecast
+    forecast_games: str = None
+    top_forecasts: tuple = ()
+    focus_forecast: tuple = None
+
+def country_summary(aggregates, country, country_flags=COUNTRY_FLAGS):
+    """CountrySummary for a country, or None if it never won a medal"""
+    if country not in aggregates.country_medals.index:
+        return None
+    yearly = aggregates.country_year[country]
+    best_year = yearly.idxmax()
+    ranks = aggregates.edition_ranks
+    best_rank, best_rank_edition = ranks.best_rank(country, 'gold')
+    best_total_rank, best_total_rank_edition = ranks.best_rank(country, 'total')
+    trajectory = ranks.trajectory(country)
+    return CountrySummary(
+        country=country,
+        flag=country_flags.get(country, '🏳️'),
+        total=int(aggregates.country_medals.loc[country, 'total']),
+        gold=int(aggregates.country_medals.loc[country, 'gold']),
+        games=int(aggregates.country_editions[country]),
+        first_year=int(aggregates.country_first_year[country]),
+        best_year=int(best_year),
+        best_total=int(yearly[best_year]),
+        best_rank=best_rank,
+        best_rank_edition=ranks.edition_name(best_rank_edition),
+        best_total_rank=best_total_rank,
+        best_total_rank_edition=ranks.edition_name(best_total_rank_edition),
+        top10_finishes=int((trajectory['gold_rank'] <= 10).sum()),
+        recent_ranks=tuple((edition, int(gold), int(total)) for edition, gold, total in
+                           trajectory[['edition', 'gold_rank', 'total_rank']].tail(5).itertuples(index=False)),
+    )
+
+def compute_report_stats(aggregates, country_flags=COUNTRY_FLAGS, date=None, focus_country='India', scope=None,
+                         forecast=None):
+    """Collect all report statistics from the shared aggregates in one pass
+
+    forecast is a forecasts.MedalForecast for the Future Predictions section; without
+    one (or with too short a history to fit) that section keeps its general prose.
+    """
+    if forecast is not None and len(forecast.years) >= 3:
+        top_forecasts = tuple((country, country_flags.get(country, '🏳️'), float(row.forecast), float(row.low),
+                               float(row.high)) for country, row in forecast.forecasts.head(5).iterrows())
+        focus_row = forecast.country(focus_country)
+        focus_forecast = None if focus_row is None else (float(focus_row.forecast), float(focus_row.low),
+                                                         float(focus_row.high), int(focus_row.last_total))
+        forecast_games = forecast.games
     else:
-        report_content += "No data available for India in this dataset.\n"
-    
-    report_content += f"""
-
----
-
-## 📈 Important Trends We Found
-
-### 1. Medal Distribution Over Time
-- Number of medals given has increased over years
-- This is because more sports and events are added to Olympics
-- More countries participate now than before
-
-### 2. Country Performance Patterns
-- **Consistent Winners:** USA, Germany, and Great Britain always perform well
-- **Rising Powers:** China has improved a lot in recent Olympics
-- **Political Impact:** When Soviet Union broke up, it affected their medal count
-
-### 3. Medal Types
-- Gold, Silver, and Bronze medals are almost equally distributed
-- This shows fair competition in Olympics
-- No single country dominates all medal types
-
----
-
-## ⚠️ Common Mistakes in Data Visualization
-
-We also learned about wrong ways to show data:
-
-### Pie Charts Problems:
-- **Bad:** Using pie charts with too many countries
-- **Why Bad:** Hard to compare small slices
-- **Better:** Use bar charts to show rankings clearly
-
-### Y-Axis Tricks:
-- **Bad:** Starting Y-axis from middle instead of zero
-- **Why Bad:** Makes small differences look very big
-- **Better:** Always start from zero to show true picture
-
----
-
-## 🎯 Key Learnings
-
-### For Countries:
-1. **Investment Matters:** Countries that spend more on sports get more medals
-2. **Long-term Planning:** Success comes from years of preparation
-3. **Infrastructure:** Good training facilities are very important
-
-### For Data Analysis:
-1. **Choose Right Charts:** Bar charts are better than pie charts for rankings
-2. **Be Honest:** Don't manipulate scales to mislead people
-3. **Tell Stories:** Data should tell a clear story that everyone can understand
+        top_forecasts, focus_forecast, forecast_games = (), None, None
+    return ReportStats(
+        date=date or datetime.now().strftime('%B %d, %Y'),
+        n_countries=aggregates.n_countries,
+        total_medals=aggregates.total_medals,
+        year_min=aggregates.year_min,
+        year_max=aggregates.year_max,
+        n_years=aggregates.n_years,
+        top_countries=tuple((country, country_flags.get(country, '🏳️'), int(medals))
+                            for country, medals in aggregates.top_countries(10).items()),
+        focus_country=focus_country,
+        focus=country_summary(aggregates, focus_country, country_flags),
+        scope=scope,
+        forecast_games=forecast_games,
+        top_forecasts=top_forecasts,
+        focus_forecast=focus_forecast,
+    )
+
+# Report content shared by every backend. A section is (heading, blocks) and a block is
+# ('h', text), ('p', text), ('ul', [items]) or ('ol', [items]); text may use **bold**.
+TRENDS_SECTION = ("📈 Important Trends We Found", [
+    ('h', "1. Medal Distribution Over Time"),
+    ('ul', ["Number of medals given has increased over years",
+            "This is because more sports and events are added to Olympics",
+            "More countries participate now than before"]),
+    ('h', "2. Country Performance Patterns"),
+    ('ul', ["**Consistent Winners:** USA, Germany, and Great Britain always perform well",
+            "**Rising Powers:** China has improved a lot in recent Olympics",
+            "**Political Impact:** When Soviet Union broke up, it affected their medal count"]),
+    ('h', "3. Medal Types"),
+    ('ul', ["Gold, Silver, and Bronze medals are almost equally distributed",
+            "This shows fair competition in Olympics",
+            "No single country dominates all medal types"]),
+])
+
+MISTAKES_SECTION = ("⚠️ Common Mistakes in Data Visualization", [
+    ('p', "We also learned about wrong ways to show data:"),
+    ('h', "Pie Charts Problems:"),
+    ('ul', ["**Bad:** Using pie charts with too many countries",
+            "**Why Bad:** Hard to compare small slices",
+            "**Better:** Use bar charts to show rankings clearly"]),
+    ('h', "Y-Axis Tricks:"),
+    ('ul', ["**Bad:** Starting Y-axis from middle instead of zero",
+            "**Why Bad:** Makes small differences look very big",
+            "**Better:** Always start from zero to show true picture"]),
+])
+
+LEARNINGS_SECTION = ("🎯 Key Learnings", [
+    ('h', "For Countries:"),
+    ('ol', ["**Investment Matters:** Countries that spend more on sports get more medals",
+            "**Long-term Planning:** Success comes from years of preparation",
+            "**Infrastructure:** Good training facilities are very important"]),
+    ('h', "For Data Analysis:"),
+    ('ol', ["**Choose Right Charts:** Bar charts are better than pie charts for rankings",
+            "**Be Honest:** Don't manipulate scales to mislead people",
+            "**Tell Stories:** Data should tell a clear story that everyone can understand"]),
+])
+
+# India keeps the report's original first-person story; other focus countries get a data-driven one
+INDIA_STORY = ["India has been participating in Olympics for many years",
+               "Our performance is slowly getting better",
+               "We need more investment in sports to compete with top countries",
+               "Recent Olympics show improvement in India's medal count"]
+
+def report_sections(stats):
+    """Full list of report sections for the given statistics"""
+    summary = ("📊 Executive Summary", [
+        ('p', "This report shows the analysis of Olympic Games medal data. We have studied how different countries perform in Olympics and what patterns we can see over the years."),
+        ('h', "Key Numbers:"),
+        ('ul', [f"**Total Countries:** {stats.n_countries} countries have participated",
+                f"**Total Medals:** {stats.total_medals:,} medals given in all Olympics",
+                f"**Time Period:** From {stats.year_min} to {stats.year_max}",
+                f"**Olympic Games:** {stats.n_years} different Olympic games"]),
+    ])
+
+    top = ("🏆 Top Performing Countries", [
+        ('p', "These are the countries that won most medals in Olympics:"),
+        ('ol', [f"{flag} **{country}** - {medals:,} medals" for country, flag, medals in stats.top_countries]),
+        ('h', "What This Tells Us:"),
+        ('ul', ["USA is the clear winner with most medals",
+                "Big countries like China, Germany, and Russia also perform very well",
+                "These countries invest a lot of money in sports training",
+                "They have good facilities and coaches for athletes"]),
+    ])
+
+    country = stats.focus_country
+    focus = stats.focus
+    if focus is not None:
+        story = INDIA_STORY if country == 'India' else [
+            f"{country} has been winning Olympic medals since {focus.first_year}",
+            f"Its best Olympic year so far was {focus.best_year} with {focus.best_total} medals",
+            f"{focus.gold} of its {focus.total} medals are gold",
+            "More investment in sports is needed to compete with the top countries"]
+        focus_blocks = [
+            ('h', f"{country}'s Numbers:"),
+            ('ul', [f"**Total Medals:** {focus.total} medals",
+                    f"**Gold Medals:** {focus.gold} gold medals",
+                    f"**Games Played:** {focus.games} Olympic games",
+                    f"**Average per Game:** {focus.average:.1f} medals per Olympics"]),
+            ('h', f"{country}'s Story:"),
+            ('ul', story),
+        ]
+        flag = focus.flag
+    else:
+        focus_blocks = [('p', f"No data available for {country} in this dataset.")]
+        flag = COUNTRY_FLAGS.get(country, '🏳️')
+
+    sections = [(f"{flag} {country}'s Olympic Performance", focus_blocks)]
+    if focus is not None and focus.best_rank is not None:
+        sections.append((f"🥇 {country}'s Medal Table Ranks", [
+            ('p', "Each Games has a medal table. The official one orders countries by gold medals first, then silver, then bronze:"),
+            ('ul', [f"**Best Rank (gold-first):** #{focus.best_rank} at the {focus.best_rank_edition}",
+                    f"**Best Rank (by total medals):** #{focus.best_total_rank} at the {focus.best_total_rank_edition}",
+                    f"**Top 10 Finishes:** {focus.top10_finishes} of {focus.games} Games"]),
+            ('h', "Recent Games:"),
+            ('ul', [f"**{edition}:** #{gold} gold-first, #{total} by total medals"
+                    for edition, gold, total in focus.recent_ranks]),
+        ]))
+
+    if stats.top_forecasts:
+        if stats.focus_forecast is not None:
+            expected, low, high, last = stats.focus_forecast
+            focus_line = (f"**{country}** is expected to win about {expected:.0f} medals "
+                          f"(likely between {low:.0f} and {high:.0f}), after {last} at the last Games")
+        else:
+            focus_line = f"**{country}** has not won medals at recent Games, so no forecast is made for it"
+        predictions = ("🔮 Future Predictions", [
+            ('p', f"We fitted a trend line and exponential smoothing to every country's recent medal counts. "
+                  f"Countries expected to win the most medals at the {stats.forecast_games}:"),
+            ('ol', [f"{flag} **{name}** - about {expected:.0f} medals (likely between {low:.0f} and {high:.0f})"
+                    for name, flag, expected, low, high in stats.top_forecasts]),
+            ('h', "What We Expect:"),
+            ('ul', [focus_line,
+                    "**Medal Distribution** will become more spread across countries",
+                    "**New Sports** will be added, giving more opportunities to different countries"]),
+        ])
+    else:
+        predictions = ("🔮 Future Predictions", [
+            ('p', "Based on current trends:"),
+            ('ul', ["**Asian Countries** will likely win more medals in future Olympics",
+                    f"**{country}** has potential to improve with more investment in sports",
+                    "**Medal Distribution** will become more spread across countries",
+                    "**New Sports** will be added, giving more opportunities to different countries"]),
+        ])
+
+    conclusion = ("📝 Conclusion", [
+        ('p', "This analysis of Olympic data teaches us many things:"),
+        ('ol', ["**Sports Success Needs Investment:** Countries that spend money on sports training get better results",
+                "**Consistency Wins:** Countries like USA succeed because they consistently support their athletes",
+                "**Data Tells Stories:** When we analyze data properly, we can understand patterns and make predictions",
+                "**Visualization Matters:** How we show data is very important - it should be clear and honest",
+                f"**{country}'s Opportunity:** {country} has potential to do much better in Olympics with proper planning"]),
+        ('h', "Final Thoughts:"),
+        ('p', "Olympics is not just about winning medals. It brings countries together and shows the power of human achievement. Through data analysis, we can understand these patterns and help our country perform better in future Olympics."),
+    ])
+
+    return [summary, top, *sections,
+            TRENDS_SECTION, MISTAKES_SECTION, LEARNINGS_SECTION, predictions, conclusion]
+
+# Precompiled templates for the text backends
+BOLD_PATTERN = re.compile(r'\*\*(.+?)\*\*')
+
+MARKDOWN_TEMPLATE = Template("""
+# 🏅 Olympic Games Data Analysis Report
+$scope
+**Student Name:** $student  
+**Roll Number:** $roll  
+**Subject:** $subject  
+**Teacher:** $teacher  
+**Date:** $date
 
 ---
 
-## 🔮 Future Predictions
-
-Based on current trends:
-- **Asian Countries** will likely win more medals in future Olympics
-- **India** has potential to improve if we invest more in sports
-- **Medal Distribution** will become more spread across countries
-- **New Sports** will be added, giving more opportunities to different countries
-
+$body
 ---
 
-## 📝 Conclusion
-
-This analysis of Olympic data teaches us many things:
-
-1. **Sports Success Needs Investment:** Countries that spend money on sports training get better results
-
-2. **Consistency Wins:** Countries like USA succeed because they consistently support their athletes
-
-3. **Data Tells Stories:** When we analyze data properly, we can understand patterns and make predictions
-
-4. **Visualization Matters:** How we show data is very important - it should be clear and honest
-
-5. **India's Opportunity:** Our country has potential to do much better in Olympics with proper planning
+**Report Prepared By:** $student (Roll No: $roll)  
+**Course:** $subject  
+**Instructor:** $teacher  
+**Tools Used:** $tools
+
+*$note*
+""")
+
+HTML_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Olympic Games Data Analysis Report</title>
+<style>
+body { font-family: sans-serif; max-width: 50rem; margin: 2rem auto; line-height: 1.5; color: #222; }
+h1 { color: darkblue; text-align: center; }
+h2 { color: darkgreen; border-bottom: 1px solid #ddd; }
+.details { color: darkblue; }
+.note { color: gray; font-style: italic; font-size: 0.9rem; }
+</style>
+</head>
+<body>
+<h1>🏅 Olympic Games Data Analysis Report</h1>
+$scope
+<p class="details"><b>Student Name:</b> $student<br>
+<b>Roll Number:</b> $roll<br>
+<b>Subject:</b> $subject<br>
+<b>Teacher:</b> $teacher<br>
+<b>Date:</b> $date</p>
+$body
+<h2>📋 Report Details</h2>
+<p class="details"><b>Report Prepared By:</b> $student (Roll No: $roll)<br>
+<b>Course:</b> $subject<br>
+<b>Instructor:</b> $teacher<br>
+<b>Tools Used:</b> $tools</p>
+<p class="note">$note</p>
+</body>
+</html>
+""")
+
+def _template_fields(stats):
+    return dict(student=STUDENT_NAME, roll=ROLL_NUMBER, subject=SUBJECT, teacher=TEACHER,
+                tools=TOOLS_USED, date=stats.date, note=CLOSING_NOTE)
+
+def _scope_line(stats, markup):
+    if not stats.scope:
+        return ""
+    return f"<h2>{html.escape(stats.scope)}</h2>" if markup else f"\n## {stats.scope}\n"
+
+def _markup(text):
+    """Escape text for HTML/reportlab markup and turn **bold** into <b> tags"""
+    return BOLD_PATTERN.sub(r'<b>\1</b>', html.escape(text, quote=False))
+
+def render_markdown(stats):
+    """Render the report as Markdown"""
+    parts = []
+    for heading, blocks in report_sections(stats):
+        lines = [f"## {heading}", ""]
+        for kind, content in blocks:
+            if kind == 'h':
+                lines.append(f"### {content}")
+            elif kind == 'p':
+                lines += [content, ""]
+            elif kind == 'ul':
+                lines += [f"- {item}" for item in content] + [""]
+            else:
+                lines += [f"{i}. {item}" for i, item in enumerate(content, 1)] + [""]
+        parts.append("\n".join(lines) + "\n")
+    return MARKDOWN_TEMPLATE.substitute(_template_fields(stats), scope=_scope_line(stats, False),
+                                        body="---\n\n".join(parts))
+
+def render_html(stats):
+    """Render the report as a standalone HTML page"""
+    parts = []
+    for heading, blocks in report_sections(stats):
+        parts.append(f"<h2>{_markup(heading)}</h2>")
+        for kind, content in blocks:
+            if kind == 'h':
+                parts.append(f"<h3>{_markup(content)}</h3>")
+            elif kind == 'p':
+                parts.append(f"<p>{_markup(content)}</p>")
+            else:
+                items = "".join(f"<li>{_markup(item)}</li>" for item in content)
+                parts.append(f"<{kind}>{items}</{kind}>")
+    return HTML_TEMPLATE.substitute(_template_fields(stats), scope=_scope_line(stats, True),
+                                    body="\n".join(parts))
+
+def render_pdf(stats, on_page=None):
+    """Render the report as a styled PDF and return its bytes"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib.colors import darkblue
+
+    # Create PDF with enhanced styling
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch)
+    styles = getSampleStyleSheet()
+
+    # Custom styles
+    title_style = ParagraphStyle('CustomTitle',
+                               parent=styles['Heading1'],
+                               fontSize=20,
+                               spaceAfter=30,
+                               alignment=1,  # Center alignment
+                               textColor='darkblue')
+
+    heading_style = ParagraphStyle('CustomHeading',
+                                 parent=styles['Heading2'],
+                                 fontSize=14,
+                                 spaceAfter=12,
+                                 spaceBefore=12,
+                                 textColor='darkgreen')
+
+    normal_style = ParagraphStyle('CustomNormal',
+                                parent=styles['Normal'],
+                                fontSize=11,
+                                spaceAfter=6,
+                                leftIndent=0.2*inch)
+
+    info_style = ParagraphStyle('InfoStyle',
+                              parent=styles['Normal'],
+                              fontSize=12,
+                              spaceAfter=4,
+                              leftIndent=0.5*inch,
+                              textColor=darkblue)
+
+    footer_style = ParagraphStyle('FooterStyle',
+                                parent=styles['Normal'],
+                                fontSize=10,
+                                spaceAfter=4,
+                                textColor='darkblue')
+
+    italic_style = ParagraphStyle('ItalicStyle',
+                                parent=styles['Italic'],
+                                fontSize=9,
+                                textColor='gray')
+
+    story = []
+
+    # Title with Olympic theme
+    story.append(Paragraph("🏅 OLYMPIC GAMES DATA ANALYSIS REPORT 🏅", title_style))
+    if stats.scope:
+        story.append(Paragraph(_markup(stats.scope), heading_style))
+    story.append(Spacer(1, 20))
+
+    # Student info box
+    story.append(Paragraph("📚 <b>ASSIGNMENT DETAILS</b>", heading_style))
+    story.append(Paragraph(f"👤 <b>Student Name:</b> {STUDENT_NAME}", info_style))
+    story.append(Paragraph(f"🎓 <b>Roll Number:</b> {ROLL_NUMBER}", info_style))
+    story.append(Paragraph(f"📖 <b>Subject:</b> {SUBJECT}", info_style))
+    story.append(Paragraph(f"👨🏫 <b>Teacher:</b> {TEACHER}", info_style))
+    story.append(Paragraph(f"📅 <b>Date:</b> {stats.date}", info_style))
+    story.append(Spacer(1, 25))
+
+    # Report sections, one heading and a paragraph per block
+    for heading, blocks in report_sections(stats):
+        story.append(Paragraph(_markup(heading.upper()), heading_style))
+        for kind, content in blocks:
+            if kind == 'h':
+                story.append(Paragraph(f"<b>{_markup(content)}</b>", normal_style))
+            elif kind == 'p':
+                story.append(Paragraph(_markup(content), normal_style))
+            elif kind == 'ul':
+                story.append(Paragraph("<br/>".join(f"• {_markup(item)}" for item in content), normal_style))
+            else:
+                story.append(Paragraph("<br/>".join(f"{i}. {_markup(item)}" for i, item in enumerate(content, 1)), normal_style))
+        story.append(Spacer(1, 15))
+
+    # Footer with enhanced styling
+    story.append(Paragraph("📋 <b>REPORT DETAILS</b>", heading_style))
+    story.append(Paragraph(f"👤 <b>Report Prepared By:</b> {STUDENT_NAME} (Roll No: {ROLL_NUMBER})", footer_style))
+    story.append(Paragraph(f"📚 <b>Course:</b> {SUBJECT}", footer_style))
+    story.append(Paragraph(f"👨🏫 <b>Instructor:</b> {TEACHER}", footer_style))
+    story.append(Paragraph(f"🛠️ <b>Tools Used:</b> {TOOLS_USED}", footer_style))
+    story.append(Spacer(1, 12))
+    story.append(Paragraph(f"<i>💡 {CLOSING_NOTE}</i>", italic_style))
+
+    # Report progress as pages are laid out
+    def page_done(canvas, doc):
+        if on_page is not None:
+            on_page(doc.page)
+
+    doc.build(story, onFirstPage=page_done, onLaterPages=page_done)
+    return buffer.getvalue()
+
+def generate_olympic_report(df, country_flags, aggregates=None):
+    """Generate a comprehensive Olympic analysis report in simple English"""
+    agg = aggregates if aggregates is not None else build_aggregates(df)
+    return render_markdown(compute_report_stats(agg, country_flags))
 
-### Final Thoughts:
-Olympics is not just about winning medals. It brings countries together and shows the power of human achievement. Through data analysis, we can understand these patterns and help our country perform better in future Olympics.
+def report_bytes(report_text, compress=False):
+    """Encode a text report for download, optionally gzip-compressed"""
+    data = report_text.encode('utf-8')
+    if compress:
+        data = gzip.compress(data, mtime=0)
+    return data
 
----
+def format_size(n_bytes):
+    """Human-readable byte count"""
+    return f"{n_bytes / 1024:.1f} KB" if n_bytes >= 1024 else f"{n_bytes} B"
 
-**Report Prepared By:** Aryan Gupta (Roll No: 2415800019)  
-**Course:** Data Visualization and Storytelling  
-**Instructor:** Dr. Saurabh Tewari  
-**Tools Used:** Python, Streamlit, Plotly, Matplotlib, Seaborn
-
-*This report uses simple English to explain complex data patterns so everyone can understand the Olympic Games analysis.*
-"""
-    
-    return report_content
+def display_report_section(df, country_flags, aggregates=None):
+    """Display the report download section in Streamlit"""
+    # Imported here so headless report builds (batch_reports.py) do not load Streamlit
+    import streamlit as st
 
-def create_download_link(report_text, filename):
-    """Create a download link for the report"""
-    b64 = base64.b64encode(report_text.encode()).decode()
-    href = f'<a href="data:text/markdown;base64,{b64}" download="{filename}">📄 Click Here to Download Report</a>'
-    return href
+    from instrumentation import download_button
 
-def display_report_section(df, country_flags):
-    """Display the report download section in Streamlit"""
-    
     st.markdown("---")
     st.markdown("""
     <div style="background: linear-gradient(90deg, #0085C3 0%, #00A651 100%); padding: 1rem; border-radius: 15px; color: white; text-align: center; margin: 1rem 0; font-size: 1.3rem; font-weight: bold;">
         📄 Download Olympic Analysis Report
     </div>
     """, unsafe_allow_html=True)
-    
+
     # Download button
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        if st.button("📥 Download Olympic Analysis Report", key="download_report"):
-            report_text = generate_olympic_report(df, country_flags)
-            
-            # Create download link
-            download_link = create_download_link(report_text, "Olympic_Analysis_Report_Aryan_Gupta.md")
-            st.markdown(download_link, unsafe_allow_html=True)
-            st.success("✅ Report generated successfully! Click the link above to download.")
-            
-            # Show preview
-            with st.expander("📖 Preview Report Content"):
-                st.markdown(report_text)
\ No newline at end of file
+        report_text = generate_olympic_report(df, country_flags, aggregates)
+        data = report_bytes(report_text)
+
+        download_button("📥 Download Olympic Analysis Report", data, 'report.md',
+                        file_name="Olympic_Analysis_Report_Aryan_Gupta.md",
+                        mime="text/markdown", key="download_report")
+        st.caption(f"📦 Report size: {format_size(len(data))}")
+
+        # Show preview
+        with st.expander("📖 Preview Report Content"):
+            st.markdown(report_text)
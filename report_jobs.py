@@ -0,0 +1,101 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ReportJob:
+    """A single background report build"""
+
+    def __init__(self, job_id, key):
+        self.job_id = job_id
+        self.key = key
+        self.status = 'queued'
+        self.pages = 0
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.finished = threading.Event()
+
+    @property
+    def done(self):
+        return self.status in ('done', 'failed')
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.time()) - self.submitted_at
+
+
+class ReportQueue:
+    """Process-wide pool that builds reports off the script thread and caches the finished bytes
+
+    Results are cached by key, so any session asking for a report that was already
+    built (or is being built) for the same dataset version and parameters gets
+    the existing job instead of starting a new build.
+    """
+
+    def __init__(self, max_workers=2, max_jobs=32):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='report')
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._by_key = {}
+        self.max_jobs = max_jobs
+
+    def submit(self, key, build, *args):
+        """Queue build(*args, on_page=...) under key and return the job id"""
+        with self._lock:
+            job_id = self._by_key.get(key)
+            if job_id is not None and self._jobs[job_id].status != 'failed':
+                return job_id
+            job = ReportJob(uuid.uuid4().hex[:12], key)
+            self._jobs[job.job_id] = job
+            self._by_key[key] = job.job_id
+            self._evict()
+        self._executor.submit(self._run, job, build, args)
+        return job.job_id
+
+    def _run(self, job, build, args):
+        job.status = 'running'
+
+        def on_page(page):
+            job.pages = page
+
+        try:
+            job.result = build(*args, on_page=on_page)
+            job.status = 'done'
+        except Exception as e:
+            job.error = e
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+            job.finished.set()
+
+    def _evict(self):
+        # Drop the oldest finished jobs (and their bytes) once over the limit
+        finished = [job for job in self._jobs.values() if job.done]
+        finished.sort(key=lambda job: job.submitted_at)
+        while len(self._jobs) > self.max_jobs and finished:
+            job = finished.pop(0)
+            del self._jobs[job.job_id]
+            if self._by_key.get(job.key) == job.job_id:
+                del self._by_key[job.key]
+
+    def get(self, job_id):
+        """Look up a job by id, None if unknown"""
+        return self._jobs.get(job_id)
+
+    def wait(self, job_id, timeout=None):
+        """Block until a job has finished (or timeout seconds pass) and return it"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.finished.wait(timeout)
+        return job
+
+    def cached(self, key):
+        """Finished result for key, or None if it has not been built yet"""
+        job_id = self._by_key.get(key)
+        if job_id is None:
+            return None
+        job = self._jobs[job_id]
+        return job.result if job.status == 'done' else None
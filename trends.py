@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class ImprovementResult:
+    """Per-country before/after comparison around a split year"""
+
+    # recent_avg, historical_avg, ratio and change for every country present in both periods
+    scores: pd.DataFrame
+    # Countries whose ratio clears the threshold, best first
+    improvers: pd.DataFrame
+    # Countries whose ratio falls below 1 / threshold, worst first
+    decliners: pd.DataFrame
+
+
+def improvement_scores(aggregates, split_year=2000, window=None, ratio=2.0, normalize=False):
+    """Compare every country's average medals per Olympic year before and after split_year at once
+
+    window limits each period to that many Olympic years next to the split (None uses
+    all years). With normalize, each year's medals are taken as a share of all medals
+    awarded that year, so growth in the number of events does not count as improvement.
+    """
+    matrix = aggregates.country_year
+    years = matrix.index.to_numpy()
+    values = matrix.to_numpy(dtype=float)
+    present = ~np.isnan(values)
+    values = np.nan_to_num(values)
+
+    if normalize:
+        values = values / aggregates.yearly_medals['total'].to_numpy(dtype=float)[:, None] * 100
+
+    recent_rows = np.flatnonzero(years >= split_year)
+    historical_rows = np.flatnonzero(years < split_year)
+    if window:
+        recent_rows = recent_rows[:window]
+        historical_rows = historical_rows[-window:]
+
+    recent_avg = values[recent_rows].sum(axis=0) / max(len(recent_rows), 1)
+    historical_avg = values[historical_rows].sum(axis=0) / max(len(historical_rows), 1)
+    in_both = present[recent_rows].any(axis=0) & present[historical_rows].any(axis=0)
+
+    scores = pd.DataFrame({
+        'recent_avg': recent_avg,
+        'historical_avg': historical_avg,
+        'ratio': recent_avg / np.where(historical_avg > 0, historical_avg, np.nan),
+        'change': recent_avg - historical_avg,
+    }, index=matrix.columns)[in_both]
+
+    improvers = scores[scores['recent_avg'] > scores['historical_avg'] * ratio].sort_values('ratio', ascending=False)
+    decliners = scores[scores['recent_avg'] * ratio < scores['historical_avg']].sort_values('ratio')
+    return ImprovementResult(scores=scores, improvers=improvers, decliners=decliners)
@@ -0,0 +1,80 @@
+"""Fill the dashboard's caches with the default view of every section before visitors ask for them.
+
+The app starts one WarmUp per process and dataset version on its first run (set
+OLYMPICS_WARMUP=0 to turn it off). The steps run on a background thread, so the
+run that started them is not held up. Each step's time and the caches it filled
+are logged and kept on the WarmUp.
+"""
+import logging
+import os
+import threading
+import time
+
+from streamlit.logger import get_logger
+
+from instrumentation import set_section, start_rerun
+
+WARMUP = os.environ.get("OLYMPICS_WARMUP", "1") == "1"
+
+LOGGER = get_logger(__name__)
+
+
+class _SkipWarmUpThread(logging.Filter):
+    def filter(self, record):
+        return record.threadName != 'warmup'
+
+
+# Cached functions warn once per miss when called outside a script run; the warm-up does that on purpose
+get_logger('streamlit.runtime.scriptrunner_utils.script_run_context').addFilter(_SkipWarmUpThread())
+
+
+class WarmUp:
+    """Runs (name, step) pairs once on a background thread, recording their times and the caches they filled"""
+
+    def __init__(self, steps):
+        self.steps = steps
+        self.status = 'queued'
+        self.seconds = None
+        # step name -> seconds, in run order
+        self.timings = {}
+        # cached function name -> values it computed (cache misses) during the warm-up
+        self.filled = {}
+        # step name -> exception, for steps that failed
+        self.errors = {}
+        self._thread = threading.Thread(target=self._run, name='warmup', daemon=True)
+
+    @property
+    def done(self):
+        return self.status == 'done'
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def join(self, timeout=None):
+        """Wait for the warm-up to finish (or timeout seconds to pass) and return it"""
+        self._thread.join(timeout)
+        return self
+
+    def _run(self):
+        self.status = 'running'
+        # The thread's own trace counts the cache misses, i.e. the values the steps computed
+        trace = start_rerun()
+        for name, step in self.steps:
+            set_section(name)
+            start = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                self.errors[name] = e
+                LOGGER.warning("Warm-up step %s failed: %s", name, e)
+            self.timings[name] = time.perf_counter() - start
+            LOGGER.info("Warm-up step %s took %.2fs", name, self.timings[name])
+        set_section(None)
+
+        self.seconds = time.perf_counter() - trace.started
+        self.filled = {name: counts['misses'] for name, counts in trace.cache.items() if counts['misses']}
+        self.status = 'done'
+        LOGGER.info("Warm-up finished in %.2fs (%d steps, %d failed); filled caches: %s",
+                    self.seconds, len(self.steps), len(self.errors),
+                    ', '.join(f'{name} ×{n}' for name, n in self.filled.items()) or 'none')